@@ -2,11 +2,12 @@ import os
 import re
 import torch
 from TTS.api import TTS
-import nltk
-from nltk.tokenize import sent_tokenize
 import time
 from datetime import datetime
 
+from services.audio_assembly import concatenate_wav_files
+from services.nltk_resources import split_sentences
+
 
 class SimpleTTSGenerator:
     def __init__(self, output_dir="audio_output",
@@ -19,13 +20,6 @@ class SimpleTTSGenerator:
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
-        # Try to download NLTK tokenizers if not already present
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            print("Downloading NLTK punkt tokenizer...")
-            nltk.download('punkt')
-
         # Initialize TTS
         self._setup_tts()
 
@@ -56,13 +50,13 @@ class SimpleTTSGenerator:
     def _chunk_text(self, text, max_length=239):
         """
         Split text into chunks that respect sentence boundaries and max_length.
-        Uses NLTK's sentence tokenizer to avoid cutting sentences in the middle.
+        Uses NLTK's sentence tokenizer (or the regex fallback) to avoid cutting sentences in the middle.
         """
         # Remove excessive spaces and normalize text
         text = re.sub(r'\s+', ' ', text).strip()
 
-        # Get sentences using NLTK
-        sentences = sent_tokenize(text, language='spanish')
+        # Get sentences without touching the network
+        sentences = split_sentences(text, language='spanish')
 
         chunks = []
         current_chunk = ""
@@ -106,26 +100,17 @@ class SimpleTTSGenerator:
 
         return chunks
 
-    def _combine_audio_files(self, input_files, output_file):
+    def _combine_audio_files(self, input_files, output_file, gap_seconds=0.0, crossfade_seconds=0.0):
         """
-        Combine multiple WAV files into one.
-        Requires pydub library (pip install pydub).
+        Combine multiple WAV files into one, streaming the frames block by block
+        (optionally with silence or a crossfade between them).
         """
         try:
-            from pydub import AudioSegment
             print(f"🔄 Combining {len(input_files)} audio files...")
-
-            combined = AudioSegment.empty()
-            for file in input_files:
-                audio = AudioSegment.from_wav(file)
-                combined += audio
-
-            combined.export(output_file, format="wav")
-            print(f"✅ Combined audio saved to: {output_file}")
+            duration = concatenate_wav_files(input_files, output_file, gap_seconds=gap_seconds,
+                                             crossfade_seconds=crossfade_seconds)
+            print(f"✅ Combined audio saved to: {output_file} ({duration:.1f}s)")
             return True
-        except ImportError:
-            print("⚠️ pydub library not found. Install with: pip install pydub")
-            return False
         except Exception as e:
             print(f"❌ Error combining audio files: {e}")
             return False
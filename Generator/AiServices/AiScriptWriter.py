@@ -1,5 +1,5 @@
 # Generator/AiServices/AiScriptWriter.py
-import ollama
+from services.llm_client import get_llm_client, PRIORITY_SCRIPT
 
 from Generator.Models.Script import Script
 import json
@@ -9,6 +9,7 @@ class AIScriptWriter:
     def __init__(self, model_name: str, context_window: int = 8192):
         self.model_name = model_name
         self.context_window = context_window
+        self.llm = get_llm_client()
 
     def create_script(self, query: str) -> Script:
 
@@ -31,7 +32,9 @@ class AIScriptWriter:
                 'num_predict': 8192,  # Máximo de tokens en la respuesta
             }
 
-            response = ollama.chat(
+            response = self.llm.chat(
+                use_cache=True,
+                priority=PRIORITY_SCRIPT,
                 model=self.model_name,
                 messages=[{"role": "user", "content": prompt}],
                 format=Script.model_json_schema(),
@@ -58,7 +61,7 @@ class AIScriptWriter:
     def get_model_info(self):
         """Obtiene información del modelo incluyendo la ventana de contexto actual"""
         try:
-            model_info = ollama.show(self.model_name)
+            model_info = self.llm.show(self.model_name)
             return {
                 'model': self.model_name,
                 'context_window': self.context_window,
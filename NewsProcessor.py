@@ -1,7 +1,8 @@
 import sqlite3
 import json
 from datetime import datetime
-import ollama
+from services.llm_client import (get_llm_client, PRIORITY_INTERACTIVE, PRIORITY_SCRIPT,
+                                 PRIORITY_EVALUATION, PRIORITY_BACKGROUND)
 
 # --- Nuevas importaciones para Structured Output ---
 from pydantic import BaseModel, Field, conint, ValidationError
@@ -44,6 +45,7 @@ class NewsProcessor:
         self.processor_db_name = processor_db
         self.scraper_db_name = scraper_db
         self.model_name = model
+        self.llm = get_llm_client()
 
         # Instancias de los nuevos componentes
         self.init_database()
@@ -158,7 +160,8 @@ class NewsProcessor:
         Enfócate en términos que produzcan resultados de alta calidad y relevancia internacional, dando el resultado en español.
         """
         try:
-            response = ollama.chat(
+            response = self.llm.chat(
+                priority=PRIORITY_INTERACTIVE,
                 model=self.model_name,
                 messages=[{"role": "user", "content": prompt}],
                 format=ImprovedQuery.model_json_schema()
@@ -183,7 +186,8 @@ class NewsProcessor:
         Si es válido y relevante, asígnale una calificación de 1 (poco relevante) a 10 (muy relevante e importante).
         """
         try:
-            response = ollama.chat(
+            response = self.llm.chat(
+                priority=PRIORITY_EVALUATION,
                 model=self.model_name,
                 messages=[{"role": "user", "content": prompt}],
                 format=NewsEvaluation.model_json_schema()
@@ -208,7 +212,8 @@ class NewsProcessor:
         Es muy importante que reemplaces siglas como NASA por N A S A y unidades como km/h por kilómetros por hora para facilitar la locución.
         """
         try:
-            response = ollama.chat(
+            response = self.llm.chat(
+                priority=PRIORITY_SCRIPT,
                 model=self.model_name,
                 messages=[{'role': 'user', 'content': prompt}],
                 format=ScriptFragment.model_json_schema()
@@ -330,7 +335,8 @@ class NewsProcessor:
         resumenes = "\n---\n".join([f"Título: {t}\nFuente: {f}\nContenido: {c[:300]}..." for t, f, c in articles])
         prompt = f"Genera un resumen conciso de los puntos más importantes de estas noticias:\n{resumenes}"
         try:
-            response = ollama.chat(model=self.model_name, messages=[{"role": "user", "content": prompt}])
+            response = self.llm.chat(priority=PRIORITY_BACKGROUND, model=self.model_name,
+                                     messages=[{"role": "user", "content": prompt}])
             print("\n🧠 Top noticias relevantes:\n")
             print(response['message']['content'])
         except Exception as e:
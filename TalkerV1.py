@@ -3,24 +3,17 @@ import sqlite3
 import re
 import torch
 from TTS.api import TTS
-import nltk
-from nltk.tokenize import sent_tokenize
 import time
 from datetime import datetime
 
-# Try to download NLTK tokenizers if not already present
-try:
-    nltk.download('punkt')
-    nltk.download('punkt_tab')
-    print("inicia la app")
-    nltk.data.find('tokenizers/punkt')
-except Exception:
-    nltk.download('punkt')
-    nltk.download('punkt_tab')
+from services.audio_assembly import concatenate_wav_files
+from services.nltk_resources import split_sentences
+from services.speaker_latents import SpeakerLatentsCache, supports_speaker_latents
 
 class ScriptAudioGenerator:
     def __init__(self, db_name="data.db", output_dir="audio_output",
-                 model="tts_models/multilingual/multi-dataset/xtts_v2", voice_sources=None):
+                 model="tts_models/multilingual/multi-dataset/xtts_v2", voice_sources=None,
+                 speaker_latents_dir="data/speaker_latents"):
         """Initialize the audio generator with database settings."""
         self.db_name = db_name
         self.output_dir = output_dir
@@ -41,6 +34,11 @@ class ScriptAudioGenerator:
         # Initialize TTS
         self._setup_tts()
 
+        # XTTS voices are conditioned once per reference file instead of on every chunk
+        self.speaker_latents = None
+        if speaker_latents_dir and supports_speaker_latents(self.tts):
+            self.speaker_latents = SpeakerLatentsCache(self.tts, speaker_latents_dir)
+
     def _setup_tts(self):
         """Setup TTS model with proper configurations."""
         print("⏳ Setting up TTS model...")
@@ -79,13 +77,13 @@ class ScriptAudioGenerator:
     def _chunk_text(self, text, max_length=239):
         """
         Split text into chunks that respect sentence boundaries and max_length.
-        Uses NLTK's sentence tokenizer to avoid cutting sentences in the middle.
+        Uses NLTK's sentence tokenizer (or the regex fallback) to avoid cutting sentences in the middle.
         """
         # Remove excessive spaces and normalize text
         text = re.sub(r'\s+', ' ', text).strip()
 
-        # Get sentences using NLTK
-        sentences = sent_tokenize(text, language='spanish')
+        # Get sentences without touching the network
+        sentences = split_sentences(text, language='spanish')
 
         chunks = []
         current_chunk = ""
@@ -129,6 +127,19 @@ class ScriptAudioGenerator:
 
         return chunks
 
+    def _synthesize(self, text, speaker_wav, output_file):
+        """Synthesize one chunk to a WAV file, reusing the cached speaker latents when available."""
+        if self.speaker_latents is not None:
+            wav = self.speaker_latents.synthesize(text, speaker_wav, language="es")
+            self.tts.synthesizer.save_wav(wav=wav, path=output_file)
+        else:
+            self.tts.tts_to_file(
+                text=text,
+                speaker_wav=speaker_wav,
+                language="es",
+                file_path=output_file
+            )
+
     def _generate_audio_for_script(self, script_id, title, text, voice_idx=0):
         """Generate audio for a script, chunking it if necessary."""
         print(f"\n🎬 Processing script ID {script_id}: {title}")
@@ -151,12 +162,7 @@ class ScriptAudioGenerator:
             cleaned_text = re.sub(r'(?<!\d)\.(?!\d)', '', text)
 
             # Generate audio
-            self.tts.tts_to_file(
-                text=cleaned_text,
-                speaker_wav=self.voice_sources,
-                language="es",
-                file_path=output_file
-            )
+            self._synthesize(cleaned_text, self.voice_sources, output_file)
             print(f"✅ Audio saved to: {output_file}")
             return [output_file]
 
@@ -172,12 +178,7 @@ class ScriptAudioGenerator:
             print(f"🔊 Generating chunk {i + 1}/{len(chunks)} ({len(chunk)} chars)")
 
             cleaned_chunk = re.sub(r'(?<!\d)\.(?!\d)', ',', chunk)
-            self.tts.tts_to_file(
-                text=cleaned_chunk,
-                speaker_wav=speaker_wav,
-                language="es",
-                file_path=chunk_file
-            )
+            self._synthesize(cleaned_chunk, speaker_wav, chunk_file)
 
             chunk_files.append(chunk_file)
 
@@ -187,27 +188,17 @@ class ScriptAudioGenerator:
         print(f"✅ Generated {len(chunk_files)} audio files for script {script_id}")
         return chunk_files
 
-    def _combine_audio_files(self, input_files, output_file):
+    def _combine_audio_files(self, input_files, output_file, gap_seconds=0.0, crossfade_seconds=0.0):
         """
-        Combine multiple WAV files into one.
-        Requires pydub library (pip install pydub).
+        Combine multiple WAV files into one, streaming the frames block by block
+        (optionally with silence or a crossfade between them).
         """
         try:
-            from pydub import AudioSegment
-
             print(f"🔄 Combining {len(input_files)} audio files...")
-            combined = AudioSegment.empty()
-
-            for file in input_files:
-                audio = AudioSegment.from_wav(file)
-                combined += audio
-
-            combined.export(output_file, format="wav")
-            print(f"✅ Combined audio saved to: {output_file}")
+            duration = concatenate_wav_files(input_files, output_file, gap_seconds=gap_seconds,
+                                             crossfade_seconds=crossfade_seconds)
+            print(f"✅ Combined audio saved to: {output_file} ({duration:.1f}s)")
             return True
-        except ImportError:
-            print("⚠️ pydub library not found. Install with: pip install pydub")
-            return False
         except Exception as e:
             print(f"❌ Error combining audio files: {e}")
             return False
@@ -239,20 +230,15 @@ class ScriptAudioGenerator:
                 audio_files = self._generate_audio_for_script(script_id, title, text, voice_idx)
 
                 if len(audio_files) > 1 and combine_chunks:
-                    try:
-                        import pydub
-                        combined_file = os.path.join(self.output_dir,
-                                                     f"{script_id}_{title[:30].replace(' ', '_')}_combined.wav")
-                        success = self._combine_audio_files(audio_files, combined_file)
-
-                        if success:
-                            log.write(f"Combined audio: {combined_file}\n")
-                            all_audio_files.append(combined_file)
-                        else:
-                            log.write(f"Failed to combine audio chunks\n")
-                            all_audio_files.extend(audio_files)
-                    except ImportError:
-                        log.write("pydub not installed, cannot combine chunks\n")
+                    combined_file = os.path.join(self.output_dir,
+                                                 f"{script_id}_{title[:30].replace(' ', '_')}_combined.wav")
+                    success = self._combine_audio_files(audio_files, combined_file)
+
+                    if success:
+                        log.write(f"Combined audio: {combined_file}\n")
+                        all_audio_files.append(combined_file)
+                    else:
+                        log.write(f"Failed to combine audio chunks\n")
                         all_audio_files.extend(audio_files)
                 else:
                     log.write(f"Audio file(s): {', '.join(audio_files)}\n")
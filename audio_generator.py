@@ -1,21 +1,30 @@
 import os
 import sqlite3
 import re
-import torch
-from TTS.api import TTS
-import nltk
-from nltk.tokenize import sent_tokenize
-import time
 from datetime import datetime
+from functools import cached_property
+
+from services.audio_assembly import concatenate_wav_files
+from services.nltk_resources import split_sentences
+from services.speaker_latents import SpeakerLatentsCache, supports_speaker_latents
+from services.tts_daemon import TTSDaemonClient
+from services.tts_engine import TTSEngine, load_tts_model, write_wav
+from services.tts_worker_pool import TTSWorkerPool
 
 
 class ScriptAudioGenerator:
     def __init__(self, db_name="data.db", output_dir="audio_output",
-                 model="tts_models/multilingual/multi-dataset/xtts_v2", voice_sources=None):
+                 model="tts_models/multilingual/multi-dataset/xtts_v2", voice_sources=None,
+                 speaker_latents_dir="data/speaker_latents", num_workers=1, threads_per_worker=None,
+                 tts_daemon_url=None):
         """Initialize the audio generator with database settings."""
         self.db_name = db_name
         self.output_dir = output_dir
         self.model_name = model
+        self.speaker_latents_dir = speaker_latents_dir
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        self.tts_daemon_url = tts_daemon_url
         # Default voice sources if none provided
         self.voice_sources = voice_sources or [
             "./voice_sources/vocal_1.wav",
@@ -27,45 +36,47 @@ class ScriptAudioGenerator:
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
-        # Try to download NLTK tokenizers if not already present
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            print("Downloading NLTK punkt tokenizer...")
-            nltk.download('punkt')
-
-        # Initialize TTS
-        self._setup_tts()
+    # The model is loaded on first use: with worker processes only the workers load it
+    @cached_property
+    def tts(self):
+        return self._setup_tts()
+
+    @cached_property
+    def speaker_latents(self):
+        # XTTS voices are conditioned once per reference file instead of on every chunk
+        if self.speaker_latents_dir and supports_speaker_latents(self.tts):
+            return SpeakerLatentsCache(self.tts, self.speaker_latents_dir)
+        return None
+
+    @cached_property
+    def daemon_client(self):
+        """Client for the TTS daemon, or None when it is not configured or not reachable."""
+        if not self.tts_daemon_url:
+            return None
+        client = TTSDaemonClient(self.tts_daemon_url, language="es")
+        status = client.health()
+        if status is None:
+            print(f"⚠️ TTS daemon not reachable at {self.tts_daemon_url}, loading the model locally")
+            return None
+        print(f"🔌 Using TTS daemon at {self.tts_daemon_url} ({status['model']})")
+        return client
+
+    @cached_property
+    def engine(self):
+        # A running daemon already has the model warm, so nothing is loaded here
+        if self.daemon_client is not None:
+            return self.daemon_client
+        return TTSEngine(self.tts, self.speaker_latents, language="es")
 
     def _setup_tts(self):
         """Setup TTS model with proper configurations."""
-        print("⏳ Setting up TTS model...")
-        # Apply the torch.load patch to avoid weights_only issue
-        torch_load = torch.load  # Save the original reference
-
-        def safe_torch_load(*args, **kwargs):
-            kwargs["weights_only"] = False  # Disable weights_only
-            return torch_load(*args, **kwargs)
-
-        # Replace torch.load temporarily
-        torch.load = safe_torch_load
-
-        # Get device
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        print(f"🖥️ Using device: {device}")
-
-        # Initialize TTS model
-        self.tts = TTS(self.model_name).to(device)
+        return load_tts_model(self.model_name)
 
-        # Restore torch.load to its original state
-        torch.load = torch_load
-        print("✅ TTS model loaded successfully!")
-
-    def _get_scripts_from_db(self):
-        """Fetch all scripts from the database."""
+    def _get_scripts_from_db(self, min_script_id=0):
+        """Fetch scripts from the database (only those with id > min_script_id)."""
         conn = sqlite3.connect(self.db_name)
         cursor = conn.cursor()
-        cursor.execute("SELECT id, titulo, guion FROM scripts")
+        cursor.execute("SELECT id, titulo, guion FROM scripts WHERE id > ? ORDER BY id", (min_script_id,))
         scripts = cursor.fetchall()
         conn.close()
         return scripts
@@ -73,13 +84,14 @@ class ScriptAudioGenerator:
     def _chunk_text(self, text, max_length=239):
         """
         Split text into chunks that respect sentence boundaries and max_length.
-        Uses NLTK's sentence tokenizer to avoid cutting sentences in the middle.
+        Uses NLTK's sentence tokenizer (or the regex fallback when its data is not
+        on disk) to avoid cutting sentences in the middle.
         """
         # Remove excessive spaces and normalize text
         text = re.sub(r'\s+', ' ', text).strip()
 
-        # Get sentences using NLTK
-        sentences = sent_tokenize(text, language='spanish')
+        # Get sentences without touching the network
+        sentences = split_sentences(text, language='spanish')
 
         chunks = []
         current_chunk = ""
@@ -123,15 +135,10 @@ class ScriptAudioGenerator:
 
         return chunks
 
-    def _generate_audio_for_script(self, script_id, title, text, voice_idx=0):
-        """Generate audio for a script, chunking it if necessary."""
+    def _prepare_script(self, script_id, title, text, voice_idx=0):
+        """Pick the voice for a script and split it into cleaned chunks ready for synthesis."""
         print(f"\n🎬 Processing script ID {script_id}: {title}")
 
-        # Create a unique filename for this script
-        safe_title = re.sub(r'[^\w\s-]', '', title).strip().lower()
-        safe_title = re.sub(r'[-\s]+', '-', safe_title)
-        base_filename = f"{script_id}_{safe_title[:30]}"
-
         # Select voice to use (cycling through available voices)
         speaker_wav = self.voice_sources[voice_idx % len(self.voice_sources)]
         print(f"🎙️ Using voice source: {os.path.basename(speaker_wav)}")
@@ -139,77 +146,72 @@ class ScriptAudioGenerator:
         # Check if text needs chunking
         if len(text) <= 239:
             print(f"📝 Text is within limit ({len(text)} chars)")
-            output_file = os.path.join(self.output_dir, f"{base_filename}.wav")
-
-            # Clean periods
-            cleaned_text = re.sub(r'(?<!\d)\.(?!\d)', ',', text)
-
-            # Generate audio
-            self.tts.tts_to_file(
-                text=cleaned_text,
-                speaker_wav=speaker_wav,
-                language="es",
-                file_path=output_file
-            )
+            chunks = [text]
+        else:
+            print(f"📏 Text exceeds limit ({len(text)} chars), chunking...")
+            chunks = self._chunk_text(text)
+            print(f"🧩 Split into {len(chunks)} chunks")
 
-            print(f"✅ Audio saved to: {output_file}")
-            return [output_file]
+        # Clean periods
+        return [re.sub(r'(?<!\d)\.(?!\d)', ',', chunk) for chunk in chunks], speaker_wav
 
-        # If text is too long, chunk it
-        print(f"📏 Text exceeds limit ({len(text)} chars), chunking...")
-        chunks = self._chunk_text(text)
-        print(f"🧩 Split into {len(chunks)} chunks")
-
-        # Generate audio for each chunk
-        chunk_files = []
-        for i, chunk in enumerate(chunks):
-            chunk_file = os.path.join(self.output_dir, f"{base_filename}_part{i + 1}.wav")
-            print(f"🔊 Generating chunk {i + 1}/{len(chunks)} ({len(chunk)} chars)")
-
-            cleaned_chunk = re.sub(r'(?<!\d)\.(?!\d)', ',', chunk)
-
-            self.tts.tts_to_file(
-                text=cleaned_chunk,
-                speaker_wav=speaker_wav,
-                language="es",
-                file_path=chunk_file
-            )
-
-            chunk_files.append(chunk_file)
+    def _save_script_audio(self, script_id, title, waveform):
+        """Write the whole script as a single WAV, named so VideoGenerator finds it."""
+        safe_title = re.sub(r'[^\w\s-]', '', title).strip().lower()
+        safe_title = re.sub(r'[-\s]+', '-', safe_title)
+        output_file = os.path.join(self.output_dir, f"{script_id}_{safe_title[:30]}_combined.wav")
 
-            # Small pause between processing to avoid overloading
-            time.sleep(0.5)
+        write_wav(output_file, waveform, self.engine.sample_rate, peak=1.0)
+        print(f"✅ Audio saved to: {output_file} ({len(waveform) / self.engine.sample_rate:.1f}s)")
+        return output_file
 
-        print(f"✅ Generated {len(chunk_files)} audio files for script {script_id}")
-        return chunk_files
+    def _generate_audio_for_script(self, script_id, title, text, voice_idx=0):
+        """Generate the audio for one script; the chunks stay in memory and one WAV is written."""
+        chunks, speaker_wav = self._prepare_script(script_id, title, text, voice_idx)
+        waveform = self.engine.synthesize_chunks(chunks, speaker_wav)
+        return [self._save_script_audio(script_id, title, waveform)]
 
-    def _combine_audio_files(self, input_files, output_file):
+    def _combine_audio_files(self, input_files, output_file, gap_seconds=0.0, crossfade_seconds=0.0):
         """
-        Combine multiple WAV files into one.
-        Requires pydub library (pip install pydub).
+        Combine multiple WAV files into one, streaming the frames block by block
+        (optionally with silence or a crossfade between them).
         """
         try:
-            from pydub import AudioSegment
             print(f"🔄 Combining {len(input_files)} audio files...")
-
-            combined = AudioSegment.empty()
-            for file in input_files:
-                audio = AudioSegment.from_wav(file)
-                combined += audio
-
-            combined.export(output_file, format="wav")
-            print(f"✅ Combined audio saved to: {output_file}")
+            duration = concatenate_wav_files(input_files, output_file, gap_seconds=gap_seconds,
+                                             crossfade_seconds=crossfade_seconds)
+            print(f"✅ Combined audio saved to: {output_file} ({duration:.1f}s)")
             return True
-        except ImportError:
-            print("⚠️ pydub library not found. Install with: pip install pydub")
-            return False
         except Exception as e:
             print(f"❌ Error combining audio files: {e}")
             return False
 
-    def process_all_scripts(self, combine_chunks=True):
-        """Process all scripts in the database and generate audio for each."""
-        scripts = self._get_scripts_from_db()
+    def _synthesize_scripts(self, scripts):
+        """Yield (script_id, title, text, audio_file) in script order, in-process or across worker processes."""
+        num_workers = min(self.num_workers, len(scripts))
+        if num_workers <= 1 or self.daemon_client is not None:
+            def jobs():
+                for i, (script_id, title, text) in enumerate(scripts):
+                    chunks, speaker_wav = self._prepare_script(script_id, title, text, i)
+                    yield (script_id, title, text), chunks, speaker_wav
+
+            # All scripts go through the model in one session; each is written as soon as it is done
+            for (script_id, title, text), waveform in self.engine.synthesize_scripts(jobs()):
+                yield script_id, title, text, self._save_script_audio(script_id, title, waveform)
+            return
+
+        # Each worker loads its own model and writes its scripts; results come back in order
+        worker_kwargs = dict(db_name=self.db_name, output_dir=self.output_dir, model=self.model_name,
+                             voice_sources=self.voice_sources, speaker_latents_dir=self.speaker_latents_dir)
+        jobs = [(script_id, title, text, i) for i, (script_id, title, text) in enumerate(scripts)]
+        with TTSWorkerPool(type(self), worker_kwargs, num_workers=num_workers,
+                           threads_per_worker=self.threads_per_worker) as pool:
+            for (script_id, title, text, _), audio_files in zip(jobs, pool.map("_generate_audio_for_script", jobs)):
+                yield script_id, title, text, audio_files[0]
+
+    def process_all_scripts(self, combine_chunks=True, min_script_id=0):
+        """Process the scripts in the database (id > min_script_id) and generate audio for each."""
+        scripts = self._get_scripts_from_db(min_script_id)
 
         if not scripts:
             print("⚠️ No scripts found in the database.")
@@ -226,32 +228,11 @@ class ScriptAudioGenerator:
             log.write(f"Audio Generation Log - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             log.write(f"{'=' * 80}\n\n")
 
-            for i, (script_id, title, text) in enumerate(scripts):
+            for script_id, title, text, audio_file in self._synthesize_scripts(scripts):
                 log.write(f"Script {script_id}: {title}\n")
                 log.write(f"Text: {text}\n")
-
-                voice_idx = i % len(self.voice_sources)
-                audio_files = self._generate_audio_for_script(script_id, title, text, voice_idx)
-
-                if len(audio_files) > 1 and combine_chunks:
-                    try:
-                        import pydub
-                        combined_file = os.path.join(self.output_dir,
-                                                     f"{script_id}_{title[:30].replace(' ', '_')}_combined.wav")
-                        success = self._combine_audio_files(audio_files, combined_file)
-
-                        if success:
-                            log.write(f"Combined audio: {combined_file}\n")
-                            all_audio_files.append(combined_file)
-                        else:
-                            log.write(f"Failed to combine audio chunks\n")
-                            all_audio_files.extend(audio_files)
-                    except ImportError:
-                        log.write("pydub not installed, cannot combine chunks\n")
-                        all_audio_files.extend(audio_files)
-                else:
-                    log.write(f"Audio file(s): {', '.join(audio_files)}\n")
-                    all_audio_files.extend(audio_files)
+                log.write(f"Audio file: {audio_file}\n")
+                all_audio_files.append(audio_file)
 
                 log.write(f"{'-' * 80}\n\n")
 
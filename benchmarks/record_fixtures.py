@@ -0,0 +1,76 @@
+# benchmarks/record_fixtures.py
+# ==============================================================================
+# == GRABACIÓN DE PÁGINAS REALES PARA LOS BENCHMARKS
+# ==============================================================================
+"""
+Vuelve a grabar las páginas de resultados de Google, Yahoo y DuckDuckGo y
+los artículos usados por los benchmarks. Necesita red y Chrome; los
+benchmarks después se ejecutan sin ninguno de los dos.
+
+    python -m benchmarks.record_fixtures "exploración espacial"
+    python -m benchmarks.record_fixtures "exploración espacial" --articles URL1 URL2 URL3
+
+Las páginas se guardan tal cual las ve el scraper (driver.page_source), con
+los mismos nombres de fichero que usa benchmarks/run.py.
+"""
+
+import argparse
+import os
+import time
+from urllib.parse import quote_plus
+
+from benchmarks.run import ARTICLE_FIXTURES, FIXTURES_DIR
+
+SEARCH_PAGES = {
+    "google_results.html": ("google", "https://www.google.com/search?q={query}&tbm=nws&tbs=qdr:w"),
+    "yahoo_results.html": ("yahoo", "https://co.search.yahoo.com/search?p={query}&fr=uh3_news_web&fr2=time&btf=w"),
+    "duckduckgo_results.html": ("duckduckgo", "https://duckduckgo.com/?q={query}&t=h_&iar=news&ndf=w"),
+}
+
+
+def record_search_pages(query: str, headless: bool, wait: float):
+    from modules.search.NewsFinder import ChromeDriverProvider, GoogleChromeDriverProvider
+
+    for filename, (engine, template) in SEARCH_PAGES.items():
+        provider = GoogleChromeDriverProvider() if engine == "google" else ChromeDriverProvider()
+        driver = provider.get_driver(headless)
+        try:
+            driver.get(template.format(query=quote_plus(query)))
+            time.sleep(wait)
+            _save(filename, driver.page_source.encode("utf-8"))
+        finally:
+            driver.quit()
+
+
+def record_articles(urls):
+    from modules.extraction.NewsContentExtractor import NewsContentExtractor
+
+    extractor = NewsContentExtractor(db_path=None)
+    for filename, url in zip(ARTICLE_FIXTURES, urls):
+        # Se guardan los bytes originales: la detección de codificación también se mide
+        _save(filename, extractor.fetch_document(url).content)
+
+
+def _save(filename: str, content: bytes):
+    path = os.path.join(FIXTURES_DIR, filename)
+    with open(path, "wb") as f:
+        f.write(content)
+    print(f"💾 {filename}: {len(content) / 1024:.0f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grabar las páginas que usan los benchmarks.")
+    parser.add_argument("query", help="Consulta de búsqueda para las páginas de resultados.")
+    parser.add_argument("--articles", nargs=len(ARTICLE_FIXTURES), metavar="URL",
+                        help=f"URLs de artículos ({', '.join(ARTICLE_FIXTURES)}).")
+    parser.add_argument("--window", action="store_true", help="Abrir el navegador con ventana.")
+    parser.add_argument("--wait", type=float, default=5.0, help="Segundos de espera para que cargue cada página.")
+    args = parser.parse_args()
+
+    record_search_pages(args.query, headless=not args.window, wait=args.wait)
+    if args.articles:
+        record_articles(args.articles)
+
+
+if __name__ == "__main__":
+    main()
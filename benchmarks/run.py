@@ -0,0 +1,506 @@
+# benchmarks/run.py
+# ==============================================================================
+# == BENCHMARKS REPRODUCIBLES SIN RED
+# ==============================================================================
+"""
+Mide las partes del pipeline que no dependen de servicios externos usando
+páginas grabadas (benchmarks/fixtures), un Ollama simulado y un TTS simulado.
+
+    python -m benchmarks.run                       # todos los benchmarks
+    python -m benchmarks.run -k extract -r 10      # solo los que contienen 'extract'
+    python -m benchmarks.run --compare benchmarks/results/anterior.json
+
+Los resultados se guardan en JSON (benchmarks/results/ por defecto) para
+comparar versiones; --compare marca como regresión cualquier mediana que
+empeore más que --threshold.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.stub_ollama import StubOllamaServer
+from benchmarks.stub_tts import StubTTS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+ARTICLE_FIXTURES = ("article_short.html", "article_long.html", "article_boilerplate.html")
+
+
+class SkipBenchmark(Exception):
+    """El benchmark no puede ejecutarse en este entorno (falta una dependencia o un binario)"""
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable
+    repeat: Optional[int] = None  # None: el valor de --repeat
+
+
+@dataclass
+class Context:
+    """Estado compartido por los benchmarks de una ejecución"""
+    workdir: str
+    ollama: StubOllamaServer
+    args: argparse.Namespace
+
+    def tempdir(self, name: str) -> str:
+        path = os.path.join(self.workdir, name)
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+        return path
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, repeat: Optional[int] = None):
+    """
+    Registrar un benchmark. La función decorada prepara los datos (sin medir)
+    y devuelve (operación, elementos procesados por operación).
+    """
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, setup, repeat))
+        return setup
+    return register
+
+
+def read_fixture(name: str, binary: bool = False):
+    with open(os.path.join(FIXTURES_DIR, name), "rb" if binary else "r", encoding=None if binary else "utf-8") as f:
+        return f.read()
+
+
+def _require(module: str):
+    try:
+        __import__(module)
+    except ImportError as e:
+        raise SkipBenchmark(f"falta el módulo '{e.name}'")
+
+
+# ============================================================================
+# BÚSQUEDA: PARSEO DE PÁGINAS DE RESULTADOS
+# ============================================================================
+
+class _NoBrowser:
+    """Proveedor de drivers que no abre navegador: el parseo no lo necesita"""
+
+    def get_pool(self, headless=True):
+        return None
+
+
+def _search_parser(scraper_class: str, fixture: str, extract: Callable):
+    _require("selenium")
+    from bs4 import BeautifulSoup
+    from modules.search import NewsFinder
+
+    scraper = getattr(NewsFinder, scraper_class)(_NoBrowser(), use_pool=True)
+    html = read_fixture(fixture)
+    results = extract(scraper, BeautifulSoup(html, "html.parser"))
+    # Como en search_news: el parseo del HTML forma parte de lo medido
+    return (lambda: extract(scraper, BeautifulSoup(html, "html.parser"))), len(results)
+
+
+@benchmark("search.parse_google")
+def bench_parse_google(ctx):
+    return _search_parser("GoogleNewsScraper", "google_results.html",
+                          lambda scraper, soup: scraper._extract_google_results(soup, 20))
+
+
+@benchmark("search.parse_yahoo")
+def bench_parse_yahoo(ctx):
+    return _search_parser("YahooNewsScraper", "yahoo_results.html",
+                          lambda scraper, soup: scraper._extract_yahoo_results(soup))
+
+
+@benchmark("search.parse_duckduckgo")
+def bench_parse_duckduckgo(ctx):
+    return _search_parser("DuckDuckGoNewsScraper", "duckduckgo_results.html",
+                          lambda scraper, soup: scraper._extract_duckduckgo_results(soup))
+
+
+# ============================================================================
+# EXTRACCIÓN DE CONTENIDO
+# ============================================================================
+
+def _extractor():
+    _require("selenium")
+    from modules.extraction.NewsContentExtractor import NewsContentExtractor
+    return NewsContentExtractor(db_path=None)
+
+
+def _article_documents():
+    from modules.extraction.NewsContentExtractor import FetchedDocument
+    documents = []
+    for name in ARTICLE_FIXTURES:
+        url = f"https://www.diario.example/ciencia/{name[:-5]}"
+        documents.append(FetchedDocument(url=url, content=read_fixture(name, binary=True), final_url=url,
+                                         status_code=200, headers={'Content-Type': 'text/html; charset=utf-8'}))
+    return documents
+
+
+def _extraction_method(method_name: str):
+    method = getattr(_extractor(), method_name)
+
+    def run():
+        # Documentos nuevos en cada vuelta: el soup se cachea en el documento
+        for document in _article_documents():
+            method(document.url, document=document)
+
+    return run, len(ARTICLE_FIXTURES)
+
+
+@benchmark("extraction.newspaper")
+def bench_extract_newspaper(ctx):
+    _require("newspaper")
+    return _extraction_method("extract_with_newspaper")
+
+
+@benchmark("extraction.trafilatura")
+def bench_extract_trafilatura(ctx):
+    _require("trafilatura")
+    return _extraction_method("extract_with_trafilatura")
+
+
+@benchmark("extraction.requests_bs4")
+def bench_extract_requests_bs4(ctx):
+    return _extraction_method("extract_with_requests_bs4")
+
+
+@benchmark("extraction.from_document")
+def bench_extract_from_document(ctx):
+    _require("newspaper")
+    _require("trafilatura")
+    extractor = _extractor()
+    return (lambda: [extractor.extract_from_document(document) for document in _article_documents()]), \
+        len(ARTICLE_FIXTURES)
+
+
+@benchmark("extraction.clean_text")
+def bench_clean_text(ctx):
+    extractor = _extractor()
+    texts = [extractor.extract_with_requests_bs4(document.url, document=document).content
+             for document in _article_documents()]
+    # Texto con el ruido habitual (espacios, saltos) que clean_text normaliza
+    noisy = ["\n\n   ".join(text.split(". ")) for text in texts]
+    return (lambda: [extractor.clean_text(text) for text in noisy]), len(noisy)
+
+
+# ============================================================================
+# AUDIO: TROCEADO Y SÍNTESIS SIMULADA
+# ============================================================================
+
+def _script_texts() -> List[str]:
+    responses = json.loads(read_fixture("ollama_responses.json"))
+    base = responses["ScriptFragment"]["guion"]
+    # Guiones de longitud creciente, como los que devuelve el modelo
+    return [" ".join([base] * n) for n in (1, 2, 4)]
+
+
+def _audio_generator(output_dir: str, voice_sources: List[str]):
+    try:
+        from audio_generator import ScriptAudioGenerator
+        from services.tts_engine import TTSEngine
+    except ImportError as e:
+        raise SkipBenchmark(f"audio_generator no se puede importar: falta '{e.name}'")
+    # Sin __init__: no se carga el modelo; la síntesis la hace StubTTS
+    generator = ScriptAudioGenerator.__new__(ScriptAudioGenerator)
+    generator.output_dir = output_dir
+    generator.voice_sources = voice_sources
+    generator.tts = StubTTS()
+    generator.speaker_latents = None
+    generator.engine = TTSEngine(generator.tts)
+    return generator
+
+
+@benchmark("audio.chunk_text")
+def bench_chunk_text(ctx):
+    generator = _audio_generator(ctx.tempdir("audio_chunks"), ["voz.wav"])
+    texts = _script_texts()
+    return (lambda: [generator._chunk_text(text) for text in texts]), len(texts)
+
+
+@benchmark("audio.generate_script_stub_tts", repeat=3)
+def bench_generate_audio(ctx):
+    output_dir = ctx.tempdir("audio_scripts")
+    generator = _audio_generator(output_dir, ["voz.wav"])
+    texts = _script_texts()
+
+    def run():
+        for i, text in enumerate(texts):
+            generator._generate_audio_for_script(i + 1, f"guion {i + 1}", text)
+
+    return run, len(texts)
+
+
+# ============================================================================
+# BASE DE DATOS: INGESTA
+# ============================================================================
+
+INGESTION_ROWS = 2000
+
+
+def _populated_database(path: str):
+    from services.database_manager import DatabaseManager
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    db = DatabaseManager(path)
+    db.initialize_databases()
+    text = read_fixture("article_short.html")
+    with db.transaction() as conn:
+        search_id = conn.execute("INSERT INTO searches (query) VALUES ('benchmark')").lastrowid
+        for i in range(INGESTION_ROWS):
+            url = f"https://www.diario.example/ciencia/{i}"
+            news_id = conn.execute(
+                "INSERT INTO news_results (search_id, engine, title, url, source) VALUES (?, 'google', ?, ?, 'Diario')",
+                (search_id, f"Noticia {i}", url)).lastrowid
+            # Una de cada diez extracciones falla o es demasiado corta, como en una ejecución real
+            success = i % 10 != 0
+            conn.execute(
+                "INSERT INTO extracted_content (news_result_id, url, title, content, word_count, success) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (news_id, url, f"Noticia {i}", text[:4000], 600 if success else 20, success))
+    return db
+
+
+@benchmark("database.ingest_extracted_news", repeat=5)
+def bench_ingestion(ctx):
+    path = os.path.join(ctx.workdir, "ingestion.db")
+    state = {}
+
+    def run():
+        # Cada vuelta parte de una base de datos recién poblada (la preparación no se mide)
+        state['db'].ingest_extracted_news(min_words=50)
+        state['db'].close()
+
+    def prepare():
+        state['db'] = _populated_database(path)
+
+    return run, INGESTION_ROWS, prepare
+
+
+# ============================================================================
+# MODELO DE LENGUAJE (OLLAMA SIMULADO)
+# ============================================================================
+
+def _ai_service(ctx):
+    from services.ai_service import AIService
+    from services.llm_client import LLMClient
+    client = LLMClient(host=ctx.ollama.host, max_parallel=2, timeout=30, max_retries=0)
+    return AIService(model_name="stub", context_window=8192, llm_client=client)
+
+
+def _articles(count: int) -> List[dict]:
+    extractor = _extractor()
+    texts = [extractor.extract_with_requests_bs4(document.url, document=document).content
+             for document in _article_documents()]
+    return [{"id": i + 1, "titulo": f"Noticia {i + 1}", "contenido": texts[i % len(texts)]} for i in range(count)]
+
+
+@benchmark("llm.evaluate_news_batch", repeat=3)
+def bench_evaluate_batch(ctx):
+    service = _ai_service(ctx)
+    articles = _articles(32)
+    return (lambda: service.evaluate_news_batch(articles, "exploración espacial", 16)), len(articles)
+
+
+@benchmark("llm.generate_script_fragments", repeat=3)
+def bench_script_fragments(ctx):
+    service = _ai_service(ctx)
+    articles = [(article["titulo"], article["contenido"]) for article in _articles(5)]
+    return (lambda: list(service.generate_script_fragments(articles))), len(articles)
+
+
+# ============================================================================
+# VIDEO: MONTAJE CON FFMPEG
+# ============================================================================
+
+@benchmark("video.create_video", repeat=1)
+def bench_create_video(ctx):
+    if shutil.which("ffmpeg") is None:
+        raise SkipBenchmark("no se encontró el binario ffmpeg")
+    _require("ffmpeg")
+    _require("PIL")
+    try:
+        from video_generator import VideoGenerator
+    except ImportError as e:
+        raise SkipBenchmark(f"video_generator no se puede importar: falta '{e.name}'")
+
+    workdir = ctx.tempdir("video")
+    audio_dir = os.path.join(workdir, "audio")
+    os.makedirs(audio_dir)
+    generator = _audio_generator(audio_dir, ["voz.wav"])
+    text = _script_texts()[1]
+    audio_files = generator._generate_audio_for_script(1, "guion", text)
+
+    from services.llm_client import configure_llm_client
+    configure_llm_client(host=ctx.ollama.host, max_retries=0)
+    video = VideoGenerator(db_name=os.path.join(workdir, "video.db"), output_dir=os.path.join(workdir, "out"),
+                           audio_dir=audio_dir, images_dir=os.path.join(workdir, "images"), model="stub")
+    # Imágenes generadas localmente en lugar de descargarlas
+    video._search_images = lambda query, num_images=5: video._generate_placeholder_images(
+        query, num_images, video.images_dir)
+    output_file = os.path.join(workdir, "out", "video.mp4")
+    return (lambda: video._create_video(1, "Guion de prueba", text, audio_files, output_file)), 1
+
+
+# ============================================================================
+# EJECUCIÓN
+# ============================================================================
+
+def _measure(run: Callable, repeat: int, prepare: Optional[Callable] = None) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        if prepare is not None:
+            prepare()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_benchmark(bench: Benchmark, ctx: Context) -> Dict:
+    # La salida por consola del pipeline no se mide (salvo con --verbose)
+    output = contextlib.nullcontext() if ctx.args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        return _run_benchmark(bench, ctx)
+
+
+def _run_benchmark(bench: Benchmark, ctx: Context) -> Dict:
+    try:
+        prepared = bench.setup(ctx)
+    except SkipBenchmark as e:
+        return {"status": "skipped", "reason": str(e)}
+
+    run, items, prepare = (prepared + (None,))[:3]
+    repeat = bench.repeat if bench.repeat is not None else ctx.args.repeat
+    repeat = min(repeat, ctx.args.repeat) if ctx.args.quick else repeat
+    try:
+        # Una vuelta de calentamiento (imports perezosos, cachés de selectores)
+        if not ctx.args.quick and prepare is None:
+            run()
+        timings = _measure(run, repeat, prepare)
+    except Exception as e:
+        return {"status": "error", "error": f"{type(e).__name__}: {e}"}
+
+    median = statistics.median(timings)
+    return {
+        "status": "ok",
+        "repeat": repeat,
+        "items": items,
+        "min": min(timings),
+        "median": median,
+        "mean": statistics.mean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "items_per_second": items / median if median else None,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict, baseline_path: str, threshold: float) -> int:
+    """Imprime la variación de cada mediana frente a otro JSON; devuelve el número de regresiones"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["benchmarks"]
+
+    print(f"\n==== COMPARACIÓN CON {baseline_path} ====")
+    regressions = 0
+    for name, result in current.items():
+        before = baseline.get(name, {})
+        if result.get("status") != "ok" or before.get("status") != "ok":
+            continue
+        change = (result["median"] - before["median"]) / before["median"]
+        mark = "🔺" if change > threshold else ("🟢" if change < -threshold else "  ")
+        regressions += change > threshold
+        print(f"{mark} {name:<40}{before['median'] * 1000:>10.2f} ms → {result['median'] * 1000:>10.2f} ms "
+              f"({change:+.1%})")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del pipeline sin red ni modelos.")
+    parser.add_argument("-k", "--filter", default="", help="Ejecutar solo los benchmarks cuyo nombre contenga el texto.")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Repeticiones por benchmark.")
+    parser.add_argument("--quick", action="store_true", help="Sin calentamiento y con --repeat como máximo.")
+    parser.add_argument("--llm-latency", type=float, default=0.0,
+                        help="Segundos de espera del Ollama simulado por petición.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostrar la salida del pipeline.")
+    parser.add_argument("-o", "--output", help="Fichero JSON de salida (por defecto en benchmarks/results/).")
+    parser.add_argument("--compare", metavar="JSON", help="Resultados anteriores con los que comparar.")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Empeoramiento relativo de la mediana que cuenta como regresión.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Las métricas del pipeline no interesan aquí y solo añadirían ruido
+    from services.metrics import get_metrics_recorder
+    get_metrics_recorder().enabled = False
+
+    selected = [bench for bench in BENCHMARKS if args.filter in bench.name]
+    results: Dict[str, Dict] = {}
+    workdir = tempfile.mkdtemp(prefix="videogen-bench-")
+    try:
+        with StubOllamaServer(latency=args.llm_latency) as ollama_stub:
+            ctx = Context(workdir=workdir, ollama=ollama_stub, args=args)
+            for bench in selected:
+                print(f"⏱️ {bench.name}...", end=" ", flush=True)
+                result = run_benchmark(bench, ctx)
+                results[bench.name] = result
+                if result["status"] == "ok":
+                    print(f"mediana {result['median'] * 1000:.2f} ms ({result['items_per_second']:.1f} elementos/s)")
+                elif result["status"] == "skipped":
+                    print(f"omitido: {result['reason']}")
+                else:
+                    print(f"❌ {result['error']}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {"repeat": args.repeat, "quick": args.quick, "llm_latency": args.llm_latency},
+        "benchmarks": results,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{report['git_commit'] or 'local'}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Resultados guardados en {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"🔺 {regressions} benchmarks empeoraron más de un {args.threshold:.0%}.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
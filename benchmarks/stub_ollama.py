@@ -0,0 +1,107 @@
+# benchmarks/stub_ollama.py
+# ==============================================================================
+# == SERVIDOR OLLAMA SIMULADO CON RESPUESTAS GRABADAS
+# ==============================================================================
+
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESPONSES_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "ollama_responses.json")
+
+
+class StubOllamaServer:
+    """
+    Servidor HTTP local que imita /api/chat y /api/show de Ollama.
+
+    La respuesta se elige por el título del esquema pedido en 'format'
+    (ImprovedQuery, NewsEvaluation, ScriptFragment...) o la entrada 'text'
+    si no se pide salida estructurada. Para BatchNewsEvaluation se devuelve
+    una evaluación por cada artículo '[n]' del prompt.
+
+    - latency: segundos de espera por petición para simular el modelo.
+    """
+
+    def __init__(self, responses_path: str = RESPONSES_PATH, latency: float = 0.0, context_length: int = 8192):
+        with open(responses_path, encoding="utf-8") as f:
+            self.responses = json.load(f)
+        self.latency = latency
+        self.context_length = context_length
+        self.requests = 0
+        self._server = None
+
+    @property
+    def host(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b"{}")
+                if self.path == "/api/chat":
+                    payload = stub._chat(body)
+                elif self.path == "/api/show":
+                    payload = {"modelinfo": {"stub.context_length": stub.context_length}}
+                else:
+                    self.send_error(404)
+                    return
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="stub-ollama", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _chat(self, body: dict) -> dict:
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        prompt = " ".join(message.get("content", "") for message in body.get("messages", []))
+        schema = body.get("format")
+        title = schema.get("title") if isinstance(schema, dict) else None
+
+        if title == "BatchNewsEvaluation":
+            numbers = [int(n) for n in re.findall(r"^\[(\d+)\]", prompt, re.MULTILINE)]
+            item = self.responses["BatchNewsEvaluationItem"]
+            content = json.dumps({"evaluaciones": [dict(item, id=n) for n in numbers]}, ensure_ascii=False)
+        elif title in self.responses:
+            content = json.dumps(self.responses[title], ensure_ascii=False)
+        else:
+            content = self.responses["text"]
+
+        return {
+            "model": body.get("model"),
+            "created_at": "2024-01-01T00:00:00Z",
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+            "done_reason": "stop",
+            # Recuentos aproximados para que las métricas de tokens tengan valores
+            "prompt_eval_count": len(prompt) // 4,
+            "eval_count": len(content) // 4,
+        }
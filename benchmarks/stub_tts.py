@@ -0,0 +1,48 @@
+# benchmarks/stub_tts.py
+# ==============================================================================
+# == TTS SIMULADO: MISMA INTERFAZ QUE TTS.api.TTS, SIN MODELO
+# ==============================================================================
+
+import wave
+
+SAMPLE_RATE = 24000
+SECONDS_PER_CHAR = 0.06  # Ritmo aproximado de la voz de XTTS en español
+
+
+class _Synthesizer:
+    output_sample_rate = SAMPLE_RATE
+
+
+class StubTTS:
+    """
+    Sustituto de TTS.api.TTS para los benchmarks: genera silencio con la
+    duración que tendría el audio real, de modo que se mide todo lo que
+    rodea a la síntesis (troceado, ficheros, concatenación, video) sin el
+    coste del modelo.
+    """
+
+    synthesizer = _Synthesizer()
+
+    def __init__(self, *args, **kwargs):
+        self.calls = 0
+
+    def to(self, device):
+        return self
+
+    def tts(self, text, speaker_wav=None, language=None, **kwargs):
+        """Muestras en float como devuelve XTTS"""
+        self.calls += 1
+        return [0.0] * self._num_samples(text)
+
+    def tts_to_file(self, text, speaker_wav=None, language=None, file_path="output.wav", **kwargs):
+        self.calls += 1
+        with wave.open(file_path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes(b"\x00\x00" * self._num_samples(text))
+        return file_path
+
+    @staticmethod
+    def _num_samples(text) -> int:
+        return int(len(text) * SECONDS_PER_CHAR * SAMPLE_RATE)
@@ -9,18 +9,109 @@ DB_PATH = "data/pipeline.db"
 
 # --- Configuración del Modelo de IA ---
 OLLAMA_MODEL = "qwen3:0.6b"
+# Ventana de contexto usada para dimensionar los lotes (None: consultarla al modelo)
+OLLAMA_CONTEXT_WINDOW = 8192
+# Servidor de Ollama (None: el de la variable OLLAMA_HOST o localhost)
+OLLAMA_HOST = None
+# Peticiones simultáneas al servidor (debe coincidir con OLLAMA_NUM_PARALLEL)
+OLLAMA_MAX_PARALLEL = 2
+# Tiempo máximo (segundos) por petición al modelo
+OLLAMA_REQUEST_TIMEOUT = 180
+# Reintentos ante errores de red o del servidor y espera base entre ellos
+OLLAMA_MAX_RETRIES = 2
+OLLAMA_RETRY_BACKOFF = 2.0
+# Caché persistente de respuestas del modelo (None la desactiva)
+LLM_CACHE_PATH = "data/llm_cache.db"
+# Segundos que una respuesta cacheada sigue siendo válida
+LLM_CACHE_TTL_SECONDS = 30 * 24 * 3600
+# Número máximo de respuestas guardadas
+LLM_CACHE_MAX_ENTRIES = 20000
 
 # --- Configuración del Pipeline ---
 # Número máximo de resultados a buscar por motor
 MAX_SEARCH_RESULTS = 25
+# Ejecutar los motores de búsqueda en paralelo
+CONCURRENT_SEARCH = True
+# Tiempo máximo (segundos) por motor de búsqueda
+SEARCH_ENGINE_TIMEOUT = 60
+# Tiempo máximo (segundos) para toda la fase de búsqueda
+SEARCH_GLOBAL_TIMEOUT = 90
 # Límite de artículos a extraer
 EXTRACTION_LIMIT = 50
+# Intentos de extracción por URL: las que fallan se reintentan en ejecuciones posteriores hasta este límite
+EXTRACTION_MAX_ATTEMPTS = 3
 # Número de hilos para la extracción
 EXTRACTION_WORKERS = 5
+# Motor de extracción: "async" (asyncio + pool de procesos) o "threads"
+EXTRACTION_ENGINE = "async"
+# Descargas simultáneas del motor asíncrono
+ASYNC_FETCH_CONCURRENCY = 32
+# Descargas simultáneas por host
+ASYNC_FETCH_PER_HOST = 4
+# Procesos dedicados a parsear HTML
+PARSER_WORKERS = 4
+# Caché HTTP persistente de artículos (None para desactivarla)
+HTTP_CACHE_DIR = "data/http_cache"
+# Segundos durante los que una página cacheada se usa sin revalidar
+HTTP_CACHE_FRESH_SECONDS = 6 * 3600
+# Segundos tras los que una entrada no revalidada se elimina
+HTTP_CACHE_TTL_SECONDS = 7 * 24 * 3600
+# Tamaño máximo de la caché en MB
+HTTP_CACHE_MAX_MB = 512
+# Reutilizar navegadores Chrome desde un pool compartido
+USE_WEBDRIVER_POOL = True
+# Navegadores simultáneos por pool
+WEBDRIVER_POOL_SIZE = 2
+# Páginas servidas antes de reciclar un navegador
+WEBDRIVER_MAX_PAGES = 50
+# Segundos de inactividad antes de cerrar un navegador libre
+WEBDRIVER_IDLE_TIMEOUT = 300
+# Palabras mínimas para que un artículo extraído pase a 'noticias'
+INGESTION_MIN_WORDS = 50
+# Agrupar noticias casi duplicadas y evaluar solo una por grupo
+NEAR_DUPLICATE_DETECTION = True
+# Similitud (Jaccard estimada) a partir de la cual dos noticias son duplicadas
+NEAR_DUPLICATE_THRESHOLD = 0.8
+# Tamaño de la firma MinHash y número de bandas LSH (debe dividir a la firma)
+MINHASH_NUM_PERM = 64
+MINHASH_BANDS = 16
+# Máximo de noticias evaluadas por llamada al modelo (1 desactiva los lotes)
+EVALUATION_BATCH_SIZE = 16
+# Noticias evaluadas entre dos checkpoints de la fase de evaluación
+EVALUATION_CHECKPOINT_SIZE = 32
 # Calificación mínima para resumir noticias
 MIN_RATING_FOR_SUMMARY = 8
 # Calificación mínima para generar guiones
 MIN_RATING_FOR_SCRIPT = 9
 # Límite de noticias para resumir/guionizar
 TOP_NEWS_LIMIT = 5
+# Conservar el histórico y procesar solo lo nuevo en cada ejecución
+INCREMENTAL_MODE = False
+# Solapar búsqueda, extracción, evaluación y guiones con colas acotadas
+STREAMING_PIPELINE = False
+# Hilos por fase del pipeline en streaming
+STREAM_EXTRACTION_WORKERS = 6
+STREAM_EVALUATION_WORKERS = 2
+STREAM_SCRIPT_WORKERS = 1
+# Capacidad de cada cola; al llenarse frena a la fase anterior
+STREAM_EXTRACTION_QUEUE_SIZE = 100
+STREAM_EVALUATION_QUEUE_SIZE = 50
+STREAM_SCRIPT_QUEUE_SIZE = 10
+# Segundos que la evaluación espera para juntar un lote antes de llamar al modelo
+STREAM_EVALUATION_BATCH_WAIT = 2.0
+# Registrar tiempos, CPU, memoria y tokens por operación en la tabla metrics
+METRICS_ENABLED = True
+# Directorio local de los datos del tokenizador de NLTK (python -m services.nltk_resources los descarga)
+NLTK_DATA_DIR = "data/nltk_data"
+# Caché en disco de las latentes de voz de XTTS (vacío para recalcularlas en cada fragmento)
+SPEAKER_LATENTS_DIR = "data/speaker_latents"
+# Procesos de síntesis en paralelo (cada uno carga su propio modelo XTTS, ~2 GB de RAM)
+TTS_WORKERS = 1
+# Hilos de torch por proceso de síntesis (0 = repartir los núcleos entre los procesos)
+TTS_THREADS_PER_WORKER = 0
+# URL del daemon de TTS (python -m services.tts_daemon); vacío para cargar el modelo en cada ejecución
+TTS_DAEMON_URL = ""
+# Directorios de salida de audio y video
+AUDIO_OUTPUT_DIR = "audio_output"
+VIDEO_OUTPUT_DIR = "video_output"
 
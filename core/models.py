@@ -4,7 +4,7 @@
 # ==============================================================================
 
 from pydantic import BaseModel, Field, conint, ValidationError
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 
 class ImprovedQuery(BaseModel):
     """Define la estructura para la consulta de búsqueda mejorada por la IA."""
@@ -18,6 +18,16 @@ class NewsEvaluation(BaseModel):
         description="Calificación de relevancia de 1 a 10, solo si la acción es 'mantener'."
     )
 
+class BatchNewsEvaluationItem(NewsEvaluation):
+    """Evaluación de una noticia dentro de un lote, identificada por su número."""
+    id: int = Field(description="Número del artículo evaluado, tal como aparece en la lista.")
+
+class BatchNewsEvaluation(BaseModel):
+    """Define la estructura para la evaluación de varias noticias en una sola llamada."""
+    evaluaciones: List[BatchNewsEvaluationItem] = Field(
+        description="Una evaluación por cada artículo de la lista."
+    )
+
 class ScriptFragment(BaseModel):
     """Define la estructura para el guion generado por la IA."""
     guion: str = Field(description="Fragmento de guion corto, directo, en minúsculas y en un solo párrafo, no incluyas hace cuanto fue la noticia, solo el guion")
\ No newline at end of file
@@ -4,12 +4,13 @@
 # ==============================================================================
 
 from datetime import datetime
+from functools import cached_property
 
-from NewsProcessor import NewsDatabase
 from services.database_manager import DatabaseManager
 from services.ai_service import AIService
-from modules.search.NewsFinder import NewsScraperFactory, NewsScraperManager
-from modules.extraction.NewsContentExtractor import NewsContentExtractor
+from modules.search.UrlCanonicalizer import NewsUrlDeduplicator
+from services.near_duplicates import cluster_news
+from services.metrics import get_metrics_recorder, print_metrics_report
 
 
 class NewsPipeline:
@@ -17,18 +18,76 @@ class NewsPipeline:
         self.db_manager = db_manager
         self.ai_service = ai_service
         self.config = config
-        self.scraper_manager = NewsScraperManager()
+        self.incremental = False
+        self.resuming = False
+        self.run_id = None
+        self.headless_browser = True
+        # Los scrapers y el extractor toman sus navegadores de un mismo pool compartido
+        self.use_driver_pool = config.get('USE_WEBDRIVER_POOL', False)
+        self.driver_pool_options = {
+            'max_size': config.get('WEBDRIVER_POOL_SIZE', 2),
+            'max_pages': config.get('WEBDRIVER_MAX_PAGES', 50),
+            'idle_timeout': config.get('WEBDRIVER_IDLE_TIMEOUT', 300),
+        }
+
+    # Los scrapers y el extractor se crean al primer uso: sus módulos importan
+    # Selenium, newspaper3k y trafilatura, que una ejecución que solo reanuda
+    # la evaluación o genera audio y video no necesita.
+
+    @cached_property
+    def scraper_manager(self):
+        from modules.search.NewsFinder import NewsScraperManager
+        return NewsScraperManager()
+
+    @cached_property
+    def content_extractor(self):
+        from modules.extraction.NewsContentExtractor import NewsContentExtractor
+        from modules.extraction.HttpCache import HttpCache
+
+        http_cache = None
+        if self.config.get('HTTP_CACHE_DIR'):
+            http_cache = HttpCache(
+                cache_dir=self.config['HTTP_CACHE_DIR'],
+                fresh_for=self.config.get('HTTP_CACHE_FRESH_SECONDS', 6 * 3600),
+                ttl=self.config.get('HTTP_CACHE_TTL_SECONDS', 7 * 24 * 3600),
+                max_bytes=self.config.get('HTTP_CACHE_MAX_MB', 512) * 1024 * 1024
+            )
         # Asegúrate que el extractor puede recibir el path de la BD del scraper
-        self.content_extractor = NewsContentExtractor(db_path=config['DB_PATH'])
+        return NewsContentExtractor(
+            db_path=self.config['DB_PATH'],
+            headless=self.headless_browser,
+            max_attempts=self.config.get('EXTRACTION_MAX_ATTEMPTS', 3),
+            driver_pool_options=self.driver_pool_options,
+            http_cache=http_cache
+        )
+
+    def _close_scrapers(self):
+        # Solo si se llegaron a crear
+        if 'scraper_manager' in self.__dict__:
+            self.scraper_manager.close_all()
+        self._release_browsers()
+
+    def _release_browsers(self):
+        """Cerrar los navegadores libres del pool compartido al terminar las fases que los usan"""
+        from modules.browser.WebDriverPool import close_idle_shared_pools
+        close_idle_shared_pools()
 
     def _setup_scrapers(self, headless=True):
         """Configura los scrapers que se usarán en el gestor."""
+        from modules.search.NewsFinder import NewsScraperFactory
+
         print("⚙️ Setting up scrapers...")
+        self.headless_browser = headless
+        # Google se registra primero: el pool compartido usa su configuración anti-detección
+        pool_kwargs = {'use_pool': self.use_driver_pool, 'pool_options': self.driver_pool_options}
         self.scraper_manager.add_scraper("duckduckgo_api", NewsScraperFactory.create_scraper("duckduckgo_api"))
-        self.scraper_manager.add_scraper("google", NewsScraperFactory.create_scraper("google", headless=headless))
+        self.scraper_manager.add_scraper("google",
+                                         NewsScraperFactory.create_scraper("google", headless=headless, **pool_kwargs))
         self.scraper_manager.add_scraper("duckduckgo",
-                                         NewsScraperFactory.create_scraper("duckduckgo", headless=headless))
-        self.scraper_manager.add_scraper("yahoo", NewsScraperFactory.create_scraper("yahoo", headless=headless))
+                                         NewsScraperFactory.create_scraper("duckduckgo", headless=headless,
+                                                                           **pool_kwargs))
+        self.scraper_manager.add_scraper("yahoo",
+                                         NewsScraperFactory.create_scraper("yahoo", headless=headless, **pool_kwargs))
 
         print("✅ Scrapers ready.")
 
@@ -59,16 +118,30 @@ class NewsPipeline:
 
         all_results = self.scraper_manager.search_all(
             improved_query,
+            concurrent=self.config.get('CONCURRENT_SEARCH', False),
+            engine_timeout=self.config.get('SEARCH_ENGINE_TIMEOUT'),
+            global_timeout=self.config.get('SEARCH_GLOBAL_TIMEOUT'),
             time_filter="w",
             max_results=self.config['EXTRACTION_LIMIT']
         )
 
+        # Canonicalizar URLs y quedarse con una aparición por artículo entre motores
+        raw_count = sum(len(results) for results in all_results.values())
+        deduplicator = NewsUrlDeduplicator(engine_priority=["duckduckgo_api", "google", "yahoo", "duckduckgo"])
+        all_results, duplicates = deduplicator.deduplicate(all_results)
+        print(f"🔗 {duplicates} de {raw_count} resultados eran variantes de un mismo artículo.")
+
         total_found = 0
         for engine, results in all_results.items():
-            print(f"📰 {engine.capitalize()} encontró {len(results)} resultados.")
             if results:
-                self.db_manager.save_news_results(search_id, engine, results)
-                total_found += len(results)
+                new_results = self.db_manager.save_news_results(search_id, engine, results)
+                print(f"📰 {engine.capitalize()} encontró {len(results)} resultados ({new_results} nuevos).")
+                total_found += new_results
+            else:
+                print(f"📰 {engine.capitalize()} encontró 0 resultados.")
+
+        for engine in self.scraper_manager.timed_out_engines:
+            print(f"⏱️ {engine.capitalize()} no respondió a tiempo; se continúa sin sus resultados.")
 
         # CAMBIO: Se obtiene la ruta única de la base de datos desde el gestor.
         db_path = self.db_manager.db_path
@@ -76,31 +149,87 @@ class NewsPipeline:
             f"💾 Total de {total_found} resultados guardados en '{db_path}' para la búsqueda ID {search_id}.")
 
         # --- FIN DE LA CORRECCIÓN ---
+        return raw_count, total_found
 
     def _run_extraction_phase(self):
         print("\n==== FASE 2: EXTRACCIÓN DE CONTENIDO ====")
-        self.content_extractor.process_all_urls(
-            limit=self.config['EXTRACTION_LIMIT'],
-            max_workers=self.config['EXTRACTION_WORKERS']
-        )
+        if self.config.get('EXTRACTION_ENGINE') == "async":
+            counts = self.content_extractor.process_all_urls_async(
+                limit=self.config['EXTRACTION_LIMIT'],
+                max_concurrency=self.config.get('ASYNC_FETCH_CONCURRENCY', 32),
+                per_host_limit=self.config.get('ASYNC_FETCH_PER_HOST', 4),
+                parser_workers=self.config.get('PARSER_WORKERS', 4)
+            )
+        else:
+            counts = self.content_extractor.process_all_urls(
+                limit=self.config['EXTRACTION_LIMIT'],
+                max_workers=self.config['EXTRACTION_WORKERS']
+            )
+        return counts['processed'], counts['successful']
 
     def _ingest_extracted_news(self):
         print("\n==== FASE 3: INGESTA DE NOTICIAS CURADAS ====")
-        articles = self.db_manager.get_extracted_articles_for_ingestion()
-        for title, source, date, url, content in articles:
-            self.db_manager.save_curated_news(title, source, date, url, content)
-        print(f"✅ Ingesta completa. {len(articles)} artículos transferidos.")
+        counts = self.db_manager.ingest_extracted_news(min_words=self.config.get('INGESTION_MIN_WORDS', 50))
+        print(f"✅ Ingesta completa. {counts['inserted']} artículos transferidos "
+              f"({counts['skipped']} ya existentes o duplicados).")
+        return counts['candidates'], counts['inserted']
 
     def _evaluate_all_news(self, target_search):
         print("\n==== FASE 4: EVALUACIÓN CON IA ====")
         news_list = self.db_manager.get_unevaluated_news()
-        for id, title, content in news_list:
-            news_dict = {"id": id, "titulo": title, "contenido": content}
-            evaluation = self.ai_service.evaluate_news_article(news_dict, target_search)
-            if evaluation.accion == "eliminar":
-                self.db_manager.delete_news(id)
+        clusters = self._group_near_duplicates(news_list)
+
+        # Las evaluaciones se guardan por tandas junto con el checkpoint; si el
+        # proceso se interrumpe, las noticias ya calificadas no se repiten
+        chunk_size = self.config.get('EVALUATION_CHECKPOINT_SIZE', 32)
+        batch_size = self.config.get('EVALUATION_BATCH_SIZE', 1)
+        rated = deleted = 0
+        for start in range(0, len(clusters), chunk_size):
+            chunk = clusters[start:start + chunk_size]
+            representatives = [{"id": id, "titulo": title, "contenido": content}
+                               for (id, title, content), _ in chunk]
+            if batch_size > 1:
+                evaluations = self.ai_service.evaluate_news_batch(representatives, target_search, batch_size)
             else:
-                self.db_manager.update_news_evaluation(id, evaluation.calificacion or 5)
+                evaluations = self.ai_service.evaluate_news_articles(representatives, target_search)
+
+            to_delete, ratings = [], []
+            for (id, _, _), members in chunk:
+                evaluation = evaluations[id]
+                # La evaluación del representante se aplica a todo su grupo
+                for member_id, _, _ in members:
+                    if evaluation.accion == "eliminar":
+                        to_delete.append(member_id)
+                    else:
+                        ratings.append((member_id, evaluation.calificacion or 5))
+
+            rated += len(ratings)
+            deleted += len(to_delete)
+            with self.db_manager.transaction():
+                self.db_manager.reject_news_many(to_delete)
+                self.db_manager.update_news_evaluations(ratings)
+                self._checkpoint_progress("evaluation", len(news_list), rated + deleted,
+                                          last_row_id=max(id for (id, _, _), _ in chunk))
+
+        print(f"✅ Evaluación completa: {rated} noticias calificadas, {deleted} eliminadas.")
+        return len(news_list), rated
+
+    def _group_near_duplicates(self, news_list):
+        """Agrupar noticias casi duplicadas; devuelve (representante, miembros)"""
+        if not self.config.get('NEAR_DUPLICATE_DETECTION', False) or len(news_list) < 2:
+            return [(news, [news]) for news in news_list]
+
+        clusters = cluster_news(
+            news_list,
+            threshold=self.config.get('NEAR_DUPLICATE_THRESHOLD', 0.8),
+            num_perm=self.config.get('MINHASH_NUM_PERM', 64),
+            bands=self.config.get('MINHASH_BANDS', 16)
+        )
+        duplicates = len(news_list) - len(clusters)
+        if duplicates:
+            print(f"🧬 {duplicates} noticias casi duplicadas agrupadas: "
+                  f"{len(clusters)} evaluaciones en lugar de {len(news_list)}")
+        return clusters
 
     def _summarize_top_news(self):
         print("\n==== FASE 5: RESUMEN DE NOTICIAS DESTACADAS ====")
@@ -108,50 +237,218 @@ class NewsPipeline:
             self.config['MIN_RATING_FOR_SUMMARY'],
             self.config['TOP_NEWS_LIMIT']
         )
-        if not articles: return
+        if not articles:
+            return 0, 0
         summary = self.ai_service.summarize_top_news(articles)
         print("\n🧠 Top noticias relevantes:\n", summary)
+        return len(articles), 1
 
     def _generate_scripts(self):
         print("\n==== FASE 6: GENERACIÓN DE GUIONES ====")
+        # En modo incremental (o al reanudar) solo se guionizan las noticias que aún no tienen guion
         articles = self.db_manager.get_top_rated_news(
             self.config['MIN_RATING_FOR_SCRIPT'],
-            self.config['TOP_NEWS_LIMIT']
+            self.config['TOP_NEWS_LIMIT'],
+            only_without_script=self.incremental or self.resuming
         )
 
         if not articles:
             print("No hay noticias con calificación suficiente para generar guiones.")
-            return
+            return 0, 0
 
-        for title, _, content in articles:
-            script_obj = self.ai_service.generate_script_fragment(title, content)
-            # Esta llamada ya es correcta y funcionará con el DBManager modificado
-            self.db_manager.save_script(title, script_obj.guion)
+        # Los guiones se generan en paralelo y cada uno se guarda en cuanto está listo
+        script_objs = self.ai_service.generate_script_fragments([(title, content) for title, _, content in articles])
+        saved = 0
+        for (title, _, _), script_obj in zip(articles, script_objs):
+            with self.db_manager.transaction():
+                self.db_manager.save_script(title, script_obj.guion)
+                saved += 1
+                self._checkpoint_progress("scripts", len(articles), saved)
             print(f"   ✍️ Guion guardado para: {title}")
+        return len(articles), saved
+
+    def run_media_phase(self, incremental=False):
+        """
+        Genera audio y video para los guiones. En modo incremental solo se
+        procesan los guiones con id posterior a la última marca de agua.
+        """
+        # Importaciones perezosas: TTS/torch y las dependencias de video son pesadas
+        from audio_generator import ScriptAudioGenerator
+        from video_generator import VideoGenerator
 
-    def run_complete_pipeline(self, search_query, target_search=None, clear_existing=True, headless_browser=True):
+        print("\n==== FASE 7: AUDIO Y VIDEO ====")
+        latest_script_id = self.db_manager.get_max_script_id()
+        audio_from = self.db_manager.get_watermark('scripts_audio') if incremental else 0
+        video_from = self.db_manager.get_watermark('scripts_video') if incremental else 0
+
+        if audio_from < latest_script_id:
+            audio_generator = ScriptAudioGenerator(
+                db_name=self.config['DB_PATH'],
+                output_dir=self.config.get('AUDIO_OUTPUT_DIR', 'audio_output'),
+                speaker_latents_dir=self.config.get('SPEAKER_LATENTS_DIR', 'data/speaker_latents'),
+                num_workers=self.config.get('TTS_WORKERS', 1),
+                threads_per_worker=self.config.get('TTS_THREADS_PER_WORKER') or None,
+                tts_daemon_url=self.config.get('TTS_DAEMON_URL') or None
+            )
+            audio_generator.process_all_scripts(combine_chunks=True, min_script_id=audio_from)
+            self.db_manager.set_watermark('scripts_audio', latest_script_id)
+        else:
+            print("🔊 No hay guiones nuevos para generar audio.")
+
+        if video_from < latest_script_id:
+            video_generator = VideoGenerator(
+                db_name=self.config['DB_PATH'],
+                output_dir=self.config.get('VIDEO_OUTPUT_DIR', 'video_output'),
+                audio_dir=self.config.get('AUDIO_OUTPUT_DIR', 'audio_output'),
+                model=self.config['OLLAMA_MODEL']
+            )
+            video_generator.process_scripts_to_videos(min_script_id=video_from)
+            # La marca solo avanza hasta el último guion con video sin huecos: los fallidos se reintentan
+            completed = set(video_generator.completed_script_ids)
+            watermark = video_from
+            for script_id in self.db_manager.get_script_ids_after(video_from):
+                if script_id > latest_script_id or script_id not in completed:
+                    break
+                watermark = script_id
+            if watermark > video_from:
+                self.db_manager.set_watermark('scripts_video', watermark)
+            if watermark < latest_script_id:
+                print(f"⚠️ Guiones sin video desde el id {watermark + 1}: se reintentarán en la próxima ejecución.")
+        else:
+            print("🎬 No hay guiones nuevos para generar video.")
+
+        # Las métricas de audio y video se suman a las de la ejecución que generó los guiones
+        self.report_metrics()
+
+    # ==========================================================================
+    # == EJECUCIÓN POR FASES CON CHECKPOINTS
+    # ==========================================================================
+
+    STAGES = ("search", "extraction", "ingestion", "evaluation", "summary", "scripts")
+
+    def _checkpoint_progress(self, stage, items_in, items_out, last_row_id=None):
+        if self.run_id is not None:
+            self.db_manager.update_stage_progress(self.run_id, stage, items_in, items_out, last_row_id)
+
+    def _run_stage(self, stage, phase, *args):
+        """Ejecuta una fase registrando su inicio, resultado y duración."""
+        self.db_manager.start_stage(self.run_id, stage)
+        try:
+            # Las fases reparten trabajo entre hilos: se mide la CPU de todo el proceso
+            with get_metrics_recorder().measure("stage", stage, cpu='process') as sample:
+                counts = phase(*args)
+                items_in, items_out = counts or (None, None)
+                sample.items_in, sample.items_out = items_in or 0, items_out or 0
+        except BaseException as e:
+            self.db_manager.finish_stage(self.run_id, stage, status="failed", error_message=str(e))
+            raise
+        self.db_manager.finish_stage(self.run_id, stage, items_in=items_in, items_out=items_out)
+
+    def report_metrics(self):
+        """Guarda las métricas pendientes en la ejecución actual e imprime su resumen."""
+        get_metrics_recorder().flush(self.db_manager, self.run_id)
+        print_metrics_report(self.db_manager.get_metrics_summary(self.run_id),
+                             title=f"MÉTRICAS DE LA EJECUCIÓN {self.run_id or ''}".rstrip())
+
+    def _run_stages(self, search_query, target_search, headless_browser, completed=()):
+        phases = {
+            "search": (self._run_search_phase, search_query),
+            "extraction": (self._run_extraction_phase,),
+            "ingestion": (self._ingest_extracted_news,),
+            "evaluation": (self._evaluate_all_news, target_search),
+            "summary": (self._summarize_top_news,),
+            "scripts": (self._generate_scripts,),
+        }
+        # También al reanudar sin búsqueda: el extractor toma los navegadores del mismo pool
+        self.headless_browser = headless_browser
+        try:
+            if "search" not in completed:
+                self._setup_scrapers(headless=headless_browser)
+            for stage in self.STAGES:
+                if stage in completed:
+                    print(f"⏭️ Fase '{stage}' ya completada en la ejecución {self.run_id}; se omite.")
+                    continue
+                phase, *args = phases[stage]
+                self._run_stage(stage, phase, *args)
+                if stage in ("search", "extraction"):
+                    self._release_browsers()
+        except BaseException:
+            self.db_manager.finish_pipeline_run(self.run_id, status="failed")
+            print(f"\n❌ Pipeline interrumpido. Reanudar con resume({self.run_id}).")
+            raise
+        finally:
+            self._close_scrapers()
+            self.report_metrics()
+
+        self.db_manager.finish_pipeline_run(self.run_id)
+        print("\n✅ Pipeline finalizado con éxito.")
+
+    def run_complete_pipeline(self, search_query, target_search=None, clear_existing=True, headless_browser=True,
+                              incremental=False):
+        """
+        Ejecuta todas las fases. Con incremental=True se conserva el histórico:
+        no se limpia la base de datos, las URLs ya extraídas y las noticias ya
+        calificadas se saltan, y solo se generan guiones para noticias nuevas.
+        Devuelve el id de la ejecución, que sirve para reanudarla con resume().
+        """
         if target_search is None:
             target_search = search_query
-        
+        self.incremental = incremental
+        self.resuming = False
+
         # Se llama a initialize_databases para asegurar que todas las tablas existen
         self.db_manager.initialize_databases()
 
-        if clear_existing:
+        if clear_existing and not incremental:
             self.db_manager.clear_all_databases()
 
-        # El resto del método no necesita cambios
+        self.run_id = self.db_manager.create_pipeline_run(
+            search_query, target_search, {'incremental': incremental, 'headless_browser': headless_browser}
+        )
+
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"🚀 Iniciando pipeline completo a las {timestamp}")
+        print(f"🚀 Iniciando pipeline completo a las {timestamp} (ejecución {self.run_id})")
         print(f"🔎 Consulta: {search_query}")
         print(f"🎯 Objetivo de evaluación: {target_search}")
+        print(f"🔁 Modo: {'incremental' if incremental else 'completo'}")
+
+        self._run_stages(search_query, target_search, headless_browser)
+        return self.run_id
+
+    def resume(self, run_id=None, headless_browser=None):
+        """
+        Reanuda una ejecución interrumpida (por defecto, la última sin completar)
+        desde la primera fase que no terminó. Dentro de una fase se continúa
+        por la última fila procesada: las noticias ya calificadas y los guiones
+        ya guardados no se repiten.
+        """
+        self.db_manager.initialize_databases()
+        run = self.db_manager.get_pipeline_run(run_id)
+        if run is None:
+            print("⚠️ No hay ninguna ejecución que reanudar.")
+            return None
+        if run['status'] == "completed":
+            print(f"✅ La ejecución {run['id']} ya se completó; no hay nada que reanudar.")
+            return run['id']
+
+        self.run_id = run['id']
+        self.incremental = run['options'].get('incremental', False)
+        self.resuming = True
+        if headless_browser is None:
+            headless_browser = run['options'].get('headless_browser', True)
+
+        checkpoints = self.db_manager.get_stage_checkpoints(self.run_id)
+        # Solo se saltan las fases completadas antes de la primera pendiente: las posteriores dependen de ella
+        completed = set()
+        for stage in self.STAGES:
+            if checkpoints.get(stage, {}).get('status') != "completed":
+                break
+            completed.add(stage)
+        print(f"🔄 Reanudando ejecución {self.run_id}: '{run['search_query']}'")
+        for stage in self.STAGES:
+            checkpoint = checkpoints.get(stage)
+            if checkpoint:
+                print(f"   {stage}: {checkpoint['status']} ({checkpoint['items_out'] or 0}/{checkpoint['items_in'] or 0})")
 
-        self._setup_scrapers(headless=headless_browser)
-        self._run_search_phase(search_query)
-        self._run_extraction_phase()
-        self._ingest_extracted_news()
-        self._evaluate_all_news(target_search)
-        self._summarize_top_news()
-        self._generate_scripts()
-        
-        self.scraper_manager.close_all()
-        print("\n✅ Pipeline finalizado con éxito.")
\ No newline at end of file
+        self._run_stages(run['search_query'], run['target_search'], headless_browser, completed)
+        return self.run_id
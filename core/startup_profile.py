@@ -0,0 +1,74 @@
+# core/startup_profile.py
+# ==============================================================================
+# == PERFIL DE ARRANQUE: TIEMPO DE IMPORTACIÓN POR PAQUETE
+# ==============================================================================
+
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Variable de entorno que indica al proceso hijo que está siendo perfilado
+PROFILE_ENV = "VIDEOGEN_PROFILE_STARTUP"
+# Línea que el hijo escribe en stderr cuando termina de arrancar
+READY_MARKER = "videogen-startup-ready"
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def mark_ready():
+    """Señalar que la aplicación terminó de arrancar y empieza a trabajar"""
+    if os.environ.get(PROFILE_ENV):
+        print(READY_MARKER, file=sys.stderr, flush=True)
+
+
+def run_profiled(argv: List[str], top: int = 15) -> int:
+    """
+    Ejecuta `python -X importtime <argv>` en un proceso hijo e imprime cuánto
+    tarda en arrancar (hasta mark_ready()) y qué paquetes importa antes y
+    después de ese punto. Devuelve el código de salida del hijo.
+    """
+    env = dict(os.environ, **{PROFILE_ENV: "1"})
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-X", "importtime", *argv], stderr=subprocess.PIPE,
+                               text=True, env=env)
+
+    ready_after = None
+    before: Dict[str, int] = {}
+    after: Dict[str, int] = {}
+    for line in process.stderr:
+        if line.strip() == READY_MARKER:
+            ready_after = time.perf_counter() - started
+            continue
+        match = _IMPORTTIME_LINE.match(line)
+        if not match and line.startswith("import time:"):
+            continue  # Cabecera de -X importtime
+        if not match:
+            # El resto de stderr (errores, avisos) se muestra tal cual
+            sys.stderr.write(line)
+            continue
+        self_us, package = int(match.group(1)), match.group(4).split('.')[0]
+        # Se suma el tiempo propio de cada módulo a su paquete raíz: no cuenta dos veces los anidados
+        totals = before if ready_after is None else after
+        totals[package] = totals.get(package, 0) + self_us
+    returncode = process.wait()
+    total = time.perf_counter() - started
+
+    print("\n==== PERFIL DE ARRANQUE ====")
+    if ready_after is not None:
+        print(f"⏱️ Listo para trabajar a los {ready_after:.2f}s (intérprete, imports y configuración)")
+    else:
+        print("⏱️ La ejecución terminó sin llegar al punto de arranque")
+    _print_packages("📦 Importado durante el arranque", before, top)
+    _print_packages("📦 Importado después, al usarse", after, top)
+    print(f"🏁 Ejecución completa en {total:.2f}s")
+    return returncode
+
+
+def _print_packages(title: str, totals: Dict[str, int], top: int):
+    ranking: List[Tuple[str, int]] = sorted(totals.items(), key=lambda item: -item[1])
+    print(f"\n{title}: {sum(totals.values()) / 1e6:.2f}s en {len(totals)} paquetes")
+    for package, microseconds in ranking[:top]:
+        print(f"   {package:<30}{microseconds / 1000:>9.1f} ms")
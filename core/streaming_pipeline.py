@@ -0,0 +1,393 @@
+# core/streaming_pipeline.py
+# ==============================================================================
+# == PIPELINE EN STREAMING: BÚSQUEDA → EXTRACCIÓN → EVALUACIÓN → GUION
+# ==============================================================================
+
+import queue
+import threading
+import time
+from datetime import datetime
+
+from core.pipeline import NewsPipeline
+from modules.search.UrlCanonicalizer import NewsUrlDeduplicator
+from services.near_duplicates import NearDuplicateIndex
+from services.metrics import get_metrics_recorder
+
+# Marca de fin de flujo que se propaga por las colas
+_END = object()
+
+
+class _StageWorkers:
+    """
+    Grupo de hilos que consume una cola. Cuando el último hilo recibe la marca
+    de fin, se ejecuta on_finish(errores) y la marca pasa a la cola siguiente.
+    """
+
+    def __init__(self, name, count, process, inbox, outbox=None, on_finish=None):
+        self.name = name
+        self.count = max(1, count)
+        self.process = process
+        self.inbox = inbox
+        self.outbox = outbox
+        self.on_finish = on_finish
+        self.errors = 0
+        self._alive = self.count
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._loop, name=f"{name}-{i}", daemon=True)
+                         for i in range(self.count)]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+    def _loop(self):
+        while True:
+            item = self.inbox.get()
+            if item is _END:
+                self.inbox.put(_END)  # Para que la vean los demás hilos de la fase
+                break
+            try:
+                self.process(item)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                print(f"❌ Error en la fase '{self.name}': {e}")
+
+        with self._lock:
+            self._alive -= 1
+            last = self._alive == 0
+        if last:
+            if self.on_finish:
+                self.on_finish(self.errors)
+            if self.outbox is not None:
+                self.outbox.put(_END)
+
+
+class StreamingNewsPipeline(NewsPipeline):
+    """
+    Variante de NewsPipeline con las fases solapadas. Colas acotadas unen
+    las fases: los resultados de cada motor pasan a extracción en cuanto ese
+    motor termina, y cada artículo extraído pasa a evaluación sin esperar al
+    resto. Las colas llenas frenan a la fase anterior (backpressure).
+
+    Solo se generan guiones para las primeras TOP_NEWS_LIMIT noticias que
+    alcanzan MIN_RATING_FOR_SCRIPT, en orden de llegada, lo que prioriza la
+    latencia hasta el primer guion frente al ranking global.
+    """
+
+    def __init__(self, db_manager, ai_service, config: dict):
+        super().__init__(db_manager, ai_service, config)
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._scripts_queued = 0
+        self._first_script_at = None
+        self._started_at = None
+        self._near_duplicates = None
+        self._evaluated = {}
+        self._waiting_duplicates = {}
+        self._failed_evaluations = set()
+        self._partial_stages = []
+
+    # --------------------------------------------------------------------------
+    # Contadores
+    # --------------------------------------------------------------------------
+
+    def _count(self, stage, key, amount=1):
+        with self._lock:
+            stage_counts = self._counts.setdefault(stage, {'in': 0, 'out': 0})
+            stage_counts[key] += amount
+
+    def _finish_stage(self, stage, errors=0):
+        counts = self._counts.get(stage, {'in': 0, 'out': 0})
+        # Con errores la fase queda parcial: resume() la vuelve a ejecutar
+        status, error_message = ("partial", f"{errors} elementos con error") if errors else ("completed", None)
+        self.db_manager.finish_stage(self.run_id, stage, status=status, items_in=counts['in'],
+                                     items_out=counts['out'], error_message=error_message)
+        if errors:
+            self._partial_stages.append(stage)
+        # Las fases se solapan: el tiempo es desde el arranque del flujo y la CPU no es separable por fase
+        get_metrics_recorder().record("stage", stage, wall_time=time.monotonic() - self._started_at,
+                                      items_in=counts['in'], items_out=counts['out'])
+        print(f"🏁 Fase '{stage}' terminada: {counts['out']}/{counts['in']}"
+              + (f" ({errors} con error)" if errors else ""))
+
+    # --------------------------------------------------------------------------
+    # Fase 1: búsqueda
+    # --------------------------------------------------------------------------
+
+    def _stream_search(self, query, extract_queue):
+        print("\n==== STREAMING: BÚSQUEDA ====")
+        improved_query = self.ai_service.improve_search_query(query).titulo_mejorado
+        print(f"🔍 Búsqueda mejorada: '{improved_query}'")
+        search_id = self.db_manager.save_search(improved_query, time_filter="w",
+                                                max_results=self.config['EXTRACTION_LIMIT'])
+        # Sin prioridad entre motores: se queda la primera aparición de cada artículo
+        deduplicator = NewsUrlDeduplicator()
+
+        def on_results(engine, results):
+            unique = [result for result in results if deduplicator.accept(result)]
+            self._count("search", 'in', len(results))
+            if not unique:
+                return
+            self.db_manager.save_news_results(search_id, engine, unique)
+            pending = self.db_manager.get_pending_news_results([result.url for result in unique],
+                                                               self.config.get('EXTRACTION_MAX_ATTEMPTS', 3))
+            print(f"📰 {engine.capitalize()}: {len(pending)} URLs nuevas a extracción")
+            for item in pending:
+                extract_queue.put(item)  # Bloquea si extracción va retrasada
+            self._count("search", 'out', len(pending))
+
+        self.scraper_manager.search_all_concurrent(
+            improved_query,
+            engine_timeout=self.config.get('SEARCH_ENGINE_TIMEOUT'),
+            global_timeout=self.config.get('SEARCH_GLOBAL_TIMEOUT'),
+            on_results=on_results,
+            time_filter="w",
+            max_results=self.config['EXTRACTION_LIMIT']
+        )
+        for engine in self.scraper_manager.timed_out_engines:
+            print(f"⏱️ {engine.capitalize()} no respondió a tiempo; se continúa sin sus resultados.")
+
+    # --------------------------------------------------------------------------
+    # Fase 2: extracción + ingesta
+    # --------------------------------------------------------------------------
+
+    def _stream_extract(self, item, evaluate_queue):
+        news_id, url = item
+        self._count("extraction", 'in')
+        result = self.content_extractor.process_single_url(news_id, url)
+        if not result.success:
+            return
+        self._count("extraction", 'out')
+
+        self._count("ingestion", 'in')
+        article = self.db_manager.ingest_extracted_article(news_id, self.config.get('INGESTION_MIN_WORDS', 50))
+        if article is not None:
+            self._count("ingestion", 'out')
+            evaluate_queue.put(article)
+
+    # --------------------------------------------------------------------------
+    # Fase 3: evaluación
+    # --------------------------------------------------------------------------
+
+    def _collect_batch(self, first, inbox, size, wait_seconds):
+        """Juntar hasta size artículos esperando como mucho wait_seconds por los siguientes"""
+        batch = [first]
+        deadline = time.monotonic() + wait_seconds
+        while len(batch) < size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = inbox.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _END:
+                inbox.put(_END)
+                break
+            batch.append(item)
+        return batch
+
+    def _stream_evaluate(self, first, evaluate_queue, script_queue, target_search):
+        batch_size = self.config.get('EVALUATION_BATCH_SIZE', 1)
+        batch = self._collect_batch(first, evaluate_queue, batch_size,
+                                    self.config.get('STREAM_EVALUATION_BATCH_WAIT', 2.0))
+        self._count("evaluation", 'in', len(batch))
+
+        # Los casi duplicados de una noticia ya vista heredan su evaluación
+        to_evaluate = []
+        for news_id, title, content in batch:
+            article = {"id": news_id, "titulo": title, "contenido": content}
+            representative = None
+            if self._near_duplicates is not None:
+                with self._lock:
+                    representative = self._near_duplicates.add_or_match(news_id, f"{title or ''} {content or ''}")
+                    if representative in self._failed_evaluations:
+                        representative = None  # Su original no se pudo evaluar: se evalúa por sí misma
+                    elif representative is not None and representative not in self._evaluated:
+                        self._waiting_duplicates.setdefault(representative, []).append(article)
+                        continue
+            if representative is not None:
+                self._record_evaluation(article, self._evaluated[representative])
+            else:
+                to_evaluate.append(article)
+
+        if not to_evaluate:
+            return
+        try:
+            if batch_size > 1 and len(to_evaluate) > 1:
+                evaluations = self.ai_service.evaluate_news_batch(to_evaluate, target_search, batch_size)
+            else:
+                evaluations = {article["id"]: self.ai_service.evaluate_news_article(article, target_search)
+                               for article in to_evaluate}
+        except Exception:
+            self._evaluate_orphans([article["id"] for article in to_evaluate], target_search, script_queue)
+            raise
+
+        for article in to_evaluate:
+            self._record_evaluation(article, evaluations[article["id"]], script_queue)
+
+    def _record_evaluation(self, article, evaluation, script_queue=None):
+        """Aplicar la evaluación a una noticia y, sin guion, a los casi duplicados que esperaban por ella"""
+        with self._lock:
+            self._evaluated[article["id"]] = evaluation
+            duplicates = self._waiting_duplicates.pop(article["id"], [])
+        self._apply_evaluation(article["id"], evaluation, article, script_queue)
+        for duplicate in duplicates:
+            self._record_evaluation(duplicate, evaluation)
+
+    def _evaluate_orphans(self, failed_ids, target_search, script_queue):
+        """
+        Si falla la evaluación de una noticia, los casi duplicados que esperaban
+        por ella se evalúan uno a uno por su cuenta para no quedarse sin nota.
+        """
+        with self._lock:
+            self._failed_evaluations.update(failed_ids)
+            orphans = [duplicate for news_id in failed_ids
+                       for duplicate in self._waiting_duplicates.pop(news_id, [])]
+        for article in orphans:
+            try:
+                evaluation = self.ai_service.evaluate_news_article(article, target_search)
+            except Exception as e:
+                print(f"❌ Error evaluando la noticia {article['id']}: {e}")
+                self._evaluate_orphans([article["id"]], target_search, script_queue)
+                continue
+            self._record_evaluation(article, evaluation, script_queue)
+
+    def _apply_evaluation(self, news_id, evaluation, article=None, script_queue=None):
+        if evaluation.accion == "eliminar":
+            self.db_manager.reject_news(news_id)
+            self._count("evaluation", 'out')
+            return
+
+        rating = evaluation.calificacion or 5
+        self.db_manager.update_news_evaluation(news_id, rating)
+        self._count("evaluation", 'out')
+
+        if article is None or script_queue is None or rating < self.config['MIN_RATING_FOR_SCRIPT']:
+            return
+        with self._lock:
+            if self._scripts_queued >= self.config['TOP_NEWS_LIMIT']:
+                return
+            self._scripts_queued += 1
+        script_queue.put((article["titulo"], article["contenido"]))
+
+    # --------------------------------------------------------------------------
+    # Fase 4: guiones
+    # --------------------------------------------------------------------------
+
+    def _stream_script(self, item):
+        title, content = item
+        self._count("scripts", 'in')
+        script_obj = self.ai_service.generate_script_fragment(title, content)
+        self.db_manager.save_script(title, script_obj.guion)
+        self._count("scripts", 'out')
+        with self._lock:
+            if self._first_script_at is None:
+                self._first_script_at = time.monotonic()
+                print(f"⚡ Primer guion listo a los {self._first_script_at - self._started_at:.1f}s")
+        print(f"   ✍️ Guion guardado para: {title}")
+
+    # --------------------------------------------------------------------------
+    # Orquestación
+    # --------------------------------------------------------------------------
+
+    def run_streaming_pipeline(self, search_query, target_search=None, clear_existing=True,
+                               headless_browser=True, incremental=False):
+        """
+        Ejecuta búsqueda, extracción, evaluación y guiones solapados. Registra
+        los checkpoints de cada fase igual que run_complete_pipeline, así que
+        una ejecución interrumpida se puede continuar con resume().
+        """
+        if target_search is None:
+            target_search = search_query
+        self.incremental = incremental
+        self.resuming = False
+
+        self.db_manager.initialize_databases()
+        if clear_existing and not incremental:
+            self.db_manager.clear_all_databases()
+
+        self.run_id = self.db_manager.create_pipeline_run(
+            search_query, target_search,
+            {'incremental': incremental, 'headless_browser': headless_browser, 'streaming': True}
+        )
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"🚀 Iniciando pipeline en streaming a las {timestamp} (ejecución {self.run_id})")
+        print(f"🔎 Consulta: {search_query}")
+        print(f"🎯 Objetivo de evaluación: {target_search}")
+
+        self._counts = {}
+        self._scripts_queued = 0
+        self._first_script_at = None
+        self._evaluated = {}
+        self._waiting_duplicates = {}
+        self._failed_evaluations = set()
+        self._partial_stages = []
+        self._near_duplicates = None
+        if self.config.get('NEAR_DUPLICATE_DETECTION', False):
+            self._near_duplicates = NearDuplicateIndex(
+                threshold=self.config.get('NEAR_DUPLICATE_THRESHOLD', 0.8),
+                num_perm=self.config.get('MINHASH_NUM_PERM', 64),
+                bands=self.config.get('MINHASH_BANDS', 16)
+            )
+
+        extract_queue = queue.Queue(maxsize=self.config.get('STREAM_EXTRACTION_QUEUE_SIZE', 100))
+        evaluate_queue = queue.Queue(maxsize=self.config.get('STREAM_EVALUATION_QUEUE_SIZE', 50))
+        script_queue = queue.Queue(maxsize=self.config.get('STREAM_SCRIPT_QUEUE_SIZE', 10))
+
+        for stage in ("search", "extraction", "ingestion", "evaluation", "scripts"):
+            self.db_manager.start_stage(self.run_id, stage)
+
+        stages = [
+            _StageWorkers("extraction", self.config.get('STREAM_EXTRACTION_WORKERS', 6),
+                          lambda item: self._stream_extract(item, evaluate_queue),
+                          extract_queue, evaluate_queue,
+                          on_finish=lambda errors: (self._finish_stage("extraction", errors),
+                                                    self._finish_stage("ingestion", errors),
+                                                    self._release_browsers())),
+            _StageWorkers("evaluation", self.config.get('STREAM_EVALUATION_WORKERS', 2),
+                          lambda item: self._stream_evaluate(item, evaluate_queue, script_queue, target_search),
+                          evaluate_queue, script_queue,
+                          on_finish=lambda errors: self._finish_stage("evaluation", errors)),
+            _StageWorkers("scripts", self.config.get('STREAM_SCRIPT_WORKERS', 1),
+                          self._stream_script, script_queue,
+                          on_finish=lambda errors: self._finish_stage("scripts", errors)),
+        ]
+
+        self._started_at = time.monotonic()
+        try:
+            self._setup_scrapers(headless=headless_browser)
+            for stage in stages:
+                stage.start()
+            try:
+                self._stream_search(search_query, extract_queue)
+                self._finish_stage("search")
+            finally:
+                # Cerrar el flujo también si la búsqueda falla, para que terminen los hilos
+                extract_queue.put(_END)
+            for stage in stages:
+                stage.join()
+
+            self._run_stage("summary", self._summarize_top_news)
+        except BaseException:
+            self.db_manager.finish_pipeline_run(self.run_id, status="failed")
+            print(f"\n❌ Pipeline interrumpido. Reanudar con resume({self.run_id}).")
+            raise
+        finally:
+            self._close_scrapers()
+            self.report_metrics()
+
+        if self._partial_stages:
+            # Sin marcar la ejecución como completada, para que resume() rehaga las fases con errores
+            self.db_manager.finish_pipeline_run(self.run_id, status="partial")
+            print(f"\n⚠️ Pipeline en streaming finalizado con errores en: {', '.join(self._partial_stages)}. "
+                  f"Reintentar con resume({self.run_id}).")
+            return self.run_id
+        self.db_manager.finish_pipeline_run(self.run_id)
+        print(f"\n✅ Pipeline en streaming finalizado en {time.monotonic() - self._started_at:.1f}s.")
+        return self.run_id
@@ -4,27 +4,90 @@
 # ==============================================================================
 
 # Importar configuraciones y componentes
+import argparse
+import sys
+
 import config
 from services.database_manager import DatabaseManager
 from services.ai_service import AIService
+from services.llm_client import configure_llm_client
+from services.llm_cache import LLMResponseCache
+from services.metrics import get_metrics_recorder, print_metrics_report
+from services.nltk_resources import configure_nltk_data_dir
 from core.pipeline import NewsPipeline
+from core.streaming_pipeline import StreamingNewsPipeline
+from core import startup_profile
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Pipeline de noticias: búsqueda, evaluación y guiones.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--incremental", dest="incremental", action="store_true",
+                      help="Conservar el histórico y procesar solo lo nuevo.")
+    mode.add_argument("--full", dest="incremental", action="store_false",
+                      help="Limpiar la base de datos y rehacer todo.")
+    parser.set_defaults(incremental=config.INCREMENTAL_MODE)
+    parser.add_argument("--streaming", action="store_true", default=config.STREAMING_PIPELINE,
+                        help="Solapar las fases: cada artículo avanza en cuanto está listo.")
+    parser.add_argument("--media", action="store_true",
+                        help="Generar también audio y video de los guiones.")
+    parser.add_argument("--resume", nargs="?", type=int, const=0, metavar="RUN_ID",
+                        help="Reanudar una ejecución interrumpida (sin id, la última sin completar).")
+    parser.add_argument("--metrics", type=int, metavar="RUN_ID",
+                        help="Mostrar el informe de métricas de una ejecución y salir.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Ejecutar con -X importtime e informar del tiempo de arranque por paquete.")
+    return parser.parse_args()
 
 
 def main():
     """Configura e inicia el pipeline de procesamiento de noticias."""
+    args = parse_args()
+    if args.profile_startup:
+        argv = [arg for arg in sys.argv if arg != "--profile-startup"]
+        sys.exit(startup_profile.run_profiled(argv))
+    get_metrics_recorder().enabled = config.METRICS_ENABLED
+    configure_nltk_data_dir(config.NLTK_DATA_DIR)
 
     # 1. Crear instancias de los servicios
+    llm_cache = None
+    if config.LLM_CACHE_PATH:
+        llm_cache = LLMResponseCache(
+            db_path=config.LLM_CACHE_PATH,
+            ttl=config.LLM_CACHE_TTL_SECONDS,
+            max_entries=config.LLM_CACHE_MAX_ENTRIES
+        )
+        llm_cache.evict()
+
+    configure_llm_client(
+        host=config.OLLAMA_HOST,
+        max_parallel=config.OLLAMA_MAX_PARALLEL,
+        timeout=config.OLLAMA_REQUEST_TIMEOUT,
+        max_retries=config.OLLAMA_MAX_RETRIES,
+        backoff=config.OLLAMA_RETRY_BACKOFF,
+        cache=llm_cache
+    )
+
     db_manager = DatabaseManager(
         db_path=config.DB_PATH
     )
 
-    ai_service = AIService(model_name=config.OLLAMA_MODEL)
+    if args.metrics is not None:
+        db_manager.initialize_databases()
+        startup_profile.mark_ready()
+        print_metrics_report(db_manager.get_metrics_summary(args.metrics),
+                             title=f"MÉTRICAS DE LA EJECUCIÓN {args.metrics}")
+        db_manager.close()
+        return
+
+    ai_service = AIService(model_name=config.OLLAMA_MODEL, context_window=config.OLLAMA_CONTEXT_WINDOW)
 
     # 2. Convertir el módulo de config en un diccionario para pasarlo fácilmente
     app_config = {key: getattr(config, key) for key in dir(config) if not key.startswith('__')}
 
     # 3. Inyectar los servicios y la configuración en el pipeline
-    pipeline = NewsPipeline(
+    pipeline_class = StreamingNewsPipeline if args.streaming else NewsPipeline
+    pipeline = pipeline_class(
         db_manager=db_manager,
         ai_service=ai_service,
         config=app_config
@@ -32,12 +95,23 @@ def main():
 
     # 4. Definir la consulta y ejecutar el pipeline
     query = "ultimas noticias sobre exploracion espacial y noticias de ciencia del espacio"
+    startup_profile.mark_ready()
 
-    pipeline.run_complete_pipeline(
-        search_query=query,
-        clear_existing=True,
-        headless_browser=False
-    )
+    try:
+        if args.resume is not None:
+            pipeline.resume(run_id=args.resume or None)
+        else:
+            run = pipeline.run_streaming_pipeline if args.streaming else pipeline.run_complete_pipeline
+            run(
+                search_query=query,
+                clear_existing=True,
+                headless_browser=False,
+                incremental=args.incremental
+            )
+        if args.media:
+            pipeline.run_media_phase(incremental=args.incremental)
+    finally:
+        db_manager.close()
 
 
 if __name__ == "__main__":
@@ -3,10 +3,8 @@ import sys
 import argparse
 from datetime import datetime
 
-# Import our modules
-from news_processor import NewsProcessor
-from audio_generator import ScriptAudioGenerator
-from video_generator import VideoGenerator
+# The generator modules (Selenium, newspaper, torch/TTS, ffmpeg...) are imported inside
+# each option so the menu shows up at once and every option only loads what it uses
 
 
 def print_header():
@@ -52,6 +50,8 @@ def get_yes_no_input(prompt):
 
 def search_news_and_generate_scripts():
     """Function to search news and generate scripts"""
+    from news_processor import NewsProcessor
+
     print("\n📰 NEWS SEARCH AND SCRIPT GENERATION")
     print("-" * 60)
 
@@ -79,6 +79,8 @@ def search_news_and_generate_scripts():
 
 def generate_audio():
     """Function to generate audio from existing scripts"""
+    from audio_generator import ScriptAudioGenerator
+
     print("\n🔊 AUDIO GENERATION")
     print("-" * 60)
 
@@ -131,6 +133,8 @@ def generate_audio():
 
 def generate_videos():
     """Function to generate videos from existing scripts and audio"""
+    from video_generator import VideoGenerator
+
     print("\n🎬 VIDEO GENERATION")
     print("-" * 60)
 
@@ -176,6 +180,10 @@ def generate_videos():
 
 def run_full_pipeline():
     """Function to run the complete pipeline: news → scripts → audio → video"""
+    from news_processor import NewsProcessor
+    from audio_generator import ScriptAudioGenerator
+    from video_generator import VideoGenerator
+
     print("\n🚀 FULL PIPELINE (NEWS → SCRIPTS → AUDIO → VIDEO)")
     print("-" * 60)
 
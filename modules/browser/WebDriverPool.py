@@ -0,0 +1,254 @@
+"""
+Pool compartido de instancias de Chrome (Selenium)
+Permite reutilizar navegadores entre scrapers y el extractor de contenido
+"""
+
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+
+class PoolTimeoutError(Exception):
+    """No se pudo obtener un driver del pool en el tiempo indicado"""
+    pass
+
+
+class PooledDriver:
+    """Envoltorio con la contabilidad de uso de un driver del pool"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.pages_served = 0
+
+
+class WebDriverPool:
+    """
+    Pool acotado de WebDrivers con semántica de préstamo/devolución.
+
+    - max_size: número máximo de navegadores vivos a la vez.
+    - max_pages: tras servir este número de préstamos el driver se recicla.
+    - idle_timeout: los drivers sin uso durante más de estos segundos se cierran,
+      aunque nadie vuelva a pedir un driver (un hilo los revisa cada reap_interval).
+    - health_check: antes de prestar un driver se comprueba que sigue respondiendo.
+    """
+
+    def __init__(self, driver_factory: Callable[[], object], max_size: int = 2, max_pages: int = 50,
+                 idle_timeout: float = 300, health_check: bool = True, name: str = "default",
+                 reap_interval: Optional[float] = None):
+        self.driver_factory = driver_factory
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.idle_timeout = idle_timeout
+        self.health_check = health_check
+        self.name = name
+        # Por defecto se revisa a la mitad de idle_timeout: un driver ocioso vive como mucho 1,5 veces ese tiempo
+        self.reap_interval = reap_interval or (idle_timeout / 2 if idle_timeout else None)
+
+        self._idle: List[PooledDriver] = []
+        self._leased: Dict[int, PooledDriver] = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._reaper: Optional[threading.Thread] = None
+        self._stop_reaper = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Préstamo y devolución
+    # ------------------------------------------------------------------
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Prestar un driver; bloquea si el pool está lleno"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError(f"El pool '{self.name}' está cerrado")
+
+                self._evict_idle_locked()
+
+                while self._idle:
+                    pooled = self._idle.pop()
+                    if self._is_healthy(pooled):
+                        return self._lease_locked(pooled)
+                    self._quit(pooled)
+
+                if self._size_locked() < self.max_size:
+                    # Reservar el hueco mientras se arranca el navegador fuera del lock
+                    placeholder = PooledDriver(None)
+                    self._leased[id(placeholder)] = placeholder
+                    break
+
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(f"Sin drivers disponibles en el pool '{self.name}'")
+                self._condition.wait(remaining)
+
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self._condition:
+                del self._leased[id(placeholder)]
+                self._condition.notify()
+            raise
+
+        pooled = PooledDriver(driver)
+        with self._condition:
+            del self._leased[id(placeholder)]
+            self._start_reaper_locked()
+            return self._lease_locked(pooled)
+
+    def release(self, driver, discard: bool = False):
+        """Devolver un driver al pool; discard=True lo cierra en lugar de reutilizarlo"""
+        with self._condition:
+            pooled = self._leased.pop(id(driver), None)
+            if pooled is None:
+                return
+
+            pooled.pages_served += 1
+            pooled.last_used = time.monotonic()
+
+            if discard or self._closed or pooled.pages_served >= self.max_pages:
+                self._quit(pooled)
+            else:
+                self._idle.append(pooled)
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """Context manager que presta un driver y lo devuelve al salir"""
+        driver = self.acquire(timeout)
+        discard = False
+        try:
+            yield driver
+        except Exception:
+            # Un error puede dejar el navegador en un estado inconsistente
+            discard = not self._is_healthy(PooledDriver(driver))
+            raise
+        finally:
+            self.release(driver, discard=discard)
+
+    # ------------------------------------------------------------------
+    # Mantenimiento
+    # ------------------------------------------------------------------
+
+    def evict_idle(self):
+        """Cerrar los drivers que llevan más de idle_timeout sin usarse"""
+        with self._condition:
+            self._evict_idle_locked()
+
+    def close_idle(self):
+        """Cerrar ya todos los drivers libres sin cerrar el pool (p. ej. al terminar una fase)"""
+        with self._condition:
+            while self._idle:
+                self._quit(self._idle.pop())
+
+    def close_all(self):
+        """Cerrar todos los drivers libres; los prestados se cierran al devolverse"""
+        self._stop_reaper.set()
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                self._quit(self._idle.pop())
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return {'idle': len(self._idle), 'leased': len(self._leased), 'max_size': self.max_size}
+
+    def _size_locked(self) -> int:
+        return len(self._idle) + len(self._leased)
+
+    def _lease_locked(self, pooled: PooledDriver):
+        self._leased[id(pooled.driver)] = pooled
+        return pooled.driver
+
+    def _start_reaper_locked(self):
+        if self._reaper is None and self.reap_interval:
+            self._reaper = threading.Thread(target=self._reap_loop, name=f"webdriver-pool-{self.name}", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        # Sin este hilo los drivers ociosos solo se cerraban dentro de acquire()
+        while not self._stop_reaper.wait(self.reap_interval):
+            self.evict_idle()
+
+    def _evict_idle_locked(self):
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        keep = []
+        for pooled in self._idle:
+            if now - pooled.last_used > self.idle_timeout:
+                self._quit(pooled)
+            else:
+                keep.append(pooled)
+        self._idle = keep
+
+    def _is_healthy(self, pooled: PooledDriver) -> bool:
+        if not self.health_check:
+            return True
+        try:
+            # Cualquier comando ligero sirve para saber si la sesión sigue viva
+            pooled.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(pooled: PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+
+# ============================================================================
+# POOLS COMPARTIDOS
+# ============================================================================
+
+_shared_pools: Dict[str, WebDriverPool] = {}
+_shared_lock = threading.Lock()
+
+
+def browser_pool_name(headless: bool = True) -> str:
+    """
+    Nombre del pool de Chrome que comparten scrapers y extractor. Hay uno por
+    modo de ventana; la configuración de los drivers la fija quien lo crea.
+    """
+    return f"chrome:{'headless' if headless else 'window'}"
+
+
+def get_shared_pool(name: str, driver_factory: Callable[[], object], **kwargs) -> WebDriverPool:
+    """Obtener (o crear) el pool compartido registrado con ese nombre"""
+    with _shared_lock:
+        pool = _shared_pools.get(name)
+        if pool is None or pool._closed:
+            pool = WebDriverPool(driver_factory, name=name, **kwargs)
+            _shared_pools[name] = pool
+        return pool
+
+
+def close_idle_shared_pools():
+    """Cerrar los drivers libres de todos los pools compartidos, que siguen abiertos"""
+    with _shared_lock:
+        pools = list(_shared_pools.values())
+    for pool in pools:
+        pool.close_idle()
+
+
+def close_shared_pools():
+    """Cerrar todos los pools compartidos"""
+    with _shared_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.close_all()
+
+
+atexit.register(close_shared_pools)
@@ -0,0 +1,85 @@
+"""
+Motor de descarga asíncrono para la extracción de contenido
+Programa las descargas con asyncio limitando la concurrencia global y por host
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+from urllib.parse import urlparse
+
+T = TypeVar('T')
+
+
+class AsyncFetcher:
+    """
+    Planificador asyncio de descargas HTTP.
+
+    fetch_fn es una función bloqueante que descarga una URL (por ejemplo
+    NewsContentExtractor.fetch_document, que reutiliza una única requests.Session
+    con pool de conexiones). Cada descarga se ejecuta en un hilo del executor
+    propio mientras asyncio controla cuántas hay en vuelo en total y por host,
+    de modo que un dominio lento no acapara todas las conexiones.
+    """
+
+    def __init__(self, fetch_fn: Callable[[str], T], max_concurrency: int = 32, per_host_limit: int = 4):
+        self.fetch_fn = fetch_fn
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self._global_semaphore: Optional[asyncio.Semaphore] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def __aenter__(self):
+        self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._host_semaphores = {}
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="fetch")
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = self.host_of(url)
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_semaphores[host]
+
+    async def fetch(self, url: str) -> T:
+        """Descargar una URL respetando los límites de concurrencia"""
+        if self._executor is None:
+            raise RuntimeError("AsyncFetcher debe usarse con 'async with'")
+
+        loop = asyncio.get_running_loop()
+        # Primero el hueco del host: si está saturado, la espera no ocupa una conexión global
+        async with self._host_semaphore(url), self._global_semaphore:
+            return await loop.run_in_executor(self._executor, self.fetch_fn, url)
+
+    async def map(self, items: Iterable[Tuple[object, str]],
+                  handler: Callable[[object, str, Optional[T], Optional[Exception]], Awaitable[object]]) -> List[object]:
+        """
+        Descargar todas las URLs de items (pares clave, url) y pasar cada
+        respuesta a handler en cuanto llega. Devuelve los resultados de handler
+        en el mismo orden que items; si handler falla para un elemento, su
+        resultado es None y el resto de la tanda continúa.
+        """
+
+        async def run_one(key, url):
+            try:
+                response = await self.fetch(url)
+            except Exception as e:
+                response, error = None, e
+            else:
+                error = None
+            try:
+                return await handler(key, url, response, error)
+            except Exception as e:
+                print(f"❌ Error procesando {url}: {e}")
+                return None
+
+        return await asyncio.gather(*(run_one(key, url) for key, url in items))
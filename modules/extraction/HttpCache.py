@@ -0,0 +1,252 @@
+"""
+Caché HTTP persistente para las descargas de artículos
+Cuerpos direccionados por contenido en disco e índice SQLite con revalidación condicional
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+@dataclass
+class CachedResponse:
+    """Entrada de la caché tal y como se sirvió la última vez"""
+    url: str
+    final_url: str
+    status_code: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+
+def normalize_cache_url(url: str) -> str:
+    """Clave estable para una URL: esquema y host en minúsculas, sin fragmento y con la query ordenada"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+
+class HttpCache:
+    """
+    Caché en disco de respuestas HTTP.
+
+    - fresh_for: segundos durante los que una entrada se sirve sin tocar la red.
+    - ttl: pasado este tiempo desde la última descarga/revalidación la entrada se elimina.
+    - max_bytes: tamaño máximo de los cuerpos; al superarlo se expulsan las
+      entradas usadas hace más tiempo (LRU).
+
+    Las entradas que ya no están frescas se revalidan con If-None-Match /
+    If-Modified-Since; una respuesta 304 reutiliza el cuerpo guardado.
+    """
+
+    def __init__(self, cache_dir: str = "data/http_cache", fresh_for: float = 6 * 3600,
+                 ttl: float = 7 * 24 * 3600, max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.fresh_for = fresh_for
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                url_key TEXT PRIMARY KEY,
+                url TEXT,
+                final_url TEXT,
+                status_code INTEGER,
+                body_hash TEXT,
+                size INTEGER,
+                headers TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL,
+                last_access REAL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)')
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """Devolver la entrada de la URL (fresca o no) o None si no existe o expiró"""
+        key = normalize_cache_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('''
+                SELECT url, final_url, status_code, body_hash, headers, etag, last_modified, fetched_at
+                FROM entries WHERE url_key = ?
+            ''', (key,)).fetchone()
+            if row is None:
+                return None
+
+            if now - row[7] > self.ttl:
+                self._delete_locked(key)
+                return None
+
+            content = self._read_body(row[3])
+            if content is None:
+                # El cuerpo desapareció del disco: la entrada ya no sirve
+                self._delete_locked(key)
+                return None
+
+            self._conn.execute('UPDATE entries SET last_access = ? WHERE url_key = ?', (now, key))
+            self._conn.commit()
+
+        return CachedResponse(
+            url=row[0], final_url=row[1], status_code=row[2], content=content,
+            headers=json.loads(row[4] or '{}'), etag=row[5], last_modified=row[6], fetched_at=row[7]
+        )
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return time.time() - entry.fetched_at <= self.fresh_for
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CachedResponse]) -> Dict[str, str]:
+        """Cabeceras para revalidar una entrada con el servidor"""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def store(self, url: str, content: bytes, headers: Dict[str, str], final_url: str = "",
+              status_code: int = 200) -> CachedResponse:
+        """Guardar (o sustituir) la respuesta de una URL"""
+        body_hash = hashlib.sha256(content).hexdigest()
+        headers = dict(headers)
+        etag = self._header(headers, 'ETag')
+        last_modified = self._header(headers, 'Last-Modified')
+        now = time.time()
+
+        with self._lock:
+            # Dentro del lock para que evict() no borre el cuerpo antes de indexarlo
+            self._write_body(body_hash, content)
+            self._conn.execute('''
+                INSERT OR REPLACE INTO entries
+                (url_key, url, final_url, status_code, body_hash, size, headers, etag, last_modified,
+                 fetched_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (normalize_cache_url(url), url, final_url or url, status_code, body_hash, len(content),
+                  json.dumps(headers), etag, last_modified, now, now))
+            self._conn.commit()
+
+        return CachedResponse(url=url, final_url=final_url or url, status_code=status_code, content=content,
+                              headers=headers, etag=etag, last_modified=last_modified, fetched_at=now)
+
+    def refresh(self, entry: CachedResponse, headers: Dict[str, str]) -> CachedResponse:
+        """Marcar como revalidada una entrada tras un 304 Not Modified"""
+        etag = self._header(headers, 'ETag') or entry.etag
+        last_modified = self._header(headers, 'Last-Modified') or entry.last_modified
+        now = time.time()
+        with self._lock:
+            self._conn.execute('''
+                UPDATE entries SET etag = ?, last_modified = ?, fetched_at = ?, last_access = ?
+                WHERE url_key = ?
+            ''', (etag, last_modified, now, now, normalize_cache_url(entry.url)))
+            self._conn.commit()
+        entry.etag, entry.last_modified, entry.fetched_at = etag, last_modified, now
+        return entry
+
+    # ------------------------------------------------------------------
+    # Mantenimiento
+    # ------------------------------------------------------------------
+
+    def evict(self) -> Dict[str, int]:
+        """Eliminar entradas expiradas y, si se supera max_bytes, las menos usadas"""
+        expired = evicted = 0
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM entries WHERE fetched_at < ?', (time.time() - self.ttl,))
+            expired = cursor.rowcount
+
+            total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total > self.max_bytes:
+                for key, size in self._conn.execute(
+                        'SELECT url_key, size FROM entries ORDER BY last_access ASC').fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    self._conn.execute('DELETE FROM entries WHERE url_key = ?', (key,))
+                    total -= size
+                    evicted += 1
+            self._conn.commit()
+
+            removed_bodies = self._remove_orphan_bodies_locked()
+
+        return {'expired': expired, 'evicted': evicted, 'removed_bodies': removed_bodies}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries, total = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        return {'entries': entries, 'bytes': total}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _delete_locked(self, key: str):
+        self._conn.execute('DELETE FROM entries WHERE url_key = ?', (key,))
+        self._conn.commit()
+
+    def _remove_orphan_bodies_locked(self) -> int:
+        referenced = {row[0] for row in self._conn.execute('SELECT DISTINCT body_hash FROM entries')}
+        removed = 0
+        for root, _, files in os.walk(self.objects_dir):
+            for name in files:
+                if name not in referenced and not name.endswith('.tmp'):
+                    try:
+                        os.remove(os.path.join(root, name))
+                        removed += 1
+                    except OSError:
+                        pass
+        return removed
+
+    def _body_path(self, body_hash: str) -> str:
+        return os.path.join(self.objects_dir, body_hash[:2], body_hash)
+
+    def _write_body(self, body_hash: str, content: bytes):
+        path = self._body_path(body_hash)
+        if os.path.exists(path):
+            return  # Mismo contenido ya guardado por otra URL
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def _read_body(self, body_hash: str) -> Optional[bytes]:
+        try:
+            with open(self._body_path(body_hash), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _header(headers: Dict[str, str], name: str) -> Optional[str]:
+        for key, value in headers.items():
+            if key.lower() == name.lower():
+                return value
+        return None
@@ -6,22 +6,21 @@ from datetime import datetime
 from urllib.parse import urljoin, urlparse
 from typing import Dict, List, Optional, Tuple
 import re
-from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+from dataclasses import dataclass, field
+from functools import cached_property
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 
-# Librerías para web scraping
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+# Librerías para parsing HTML. Selenium, newspaper3k y trafilatura se importan
+# dentro de los métodos que las usan: son pesadas y no todas las ejecuciones las necesitan
+from bs4 import BeautifulSoup
 
-# Librerías para parsing HTML
-from bs4 import BeautifulSoup, Comment
-import readability
-from newspaper import Article
-import trafilatura
+from modules.browser.WebDriverPool import WebDriverPool, browser_pool_name, get_shared_pool
+from modules.extraction.AsyncFetcher import AsyncFetcher
+from modules.extraction.HttpCache import HttpCache, CachedResponse
+from modules.search.UrlCanonicalizer import canonicalize_url, dedup_key
+from services.metrics import get_metrics_recorder
 
 
 @dataclass
@@ -38,11 +37,74 @@ class ExtractedContent:
     extraction_time: float = 0.0
 
 
+@dataclass
+class FetchedDocument:
+    """
+    Página descargada una sola vez y compartida por todas las estrategias de
+    extracción: bytes crudos, texto decodificado y árbol HTML, estos dos
+    últimos calculados de forma perezosa la primera vez que se piden.
+    """
+    url: str
+    content: bytes
+    final_url: str = ""
+    status_code: int = 200
+    headers: Dict[str, str] = field(default_factory=dict)
+    encoding: Optional[str] = None
+    from_cache: bool = False
+
+    @classmethod
+    def from_html(cls, url: str, html: str) -> "FetchedDocument":
+        """Crear un documento a partir de HTML ya decodificado (p. ej. page_source de Selenium)"""
+        document = cls(url=url, content=html.encode('utf-8'), final_url=url, encoding='utf-8')
+        document.__dict__['text'] = html
+        return document
+
+    @cached_property
+    def text(self) -> str:
+        """HTML decodificado con la codificación declarada (cabeceras o <meta charset>)"""
+        encoding = self.encoding or self._sniff_encoding()
+        try:
+            return self.content.decode(encoding, errors='replace')
+        except LookupError:
+            return self.content.decode('utf-8', errors='replace')
+
+    @cached_property
+    def soup(self) -> BeautifulSoup:
+        """Árbol BeautifulSoup; las estrategias lo limpian in situ de forma idempotente"""
+        return BeautifulSoup(self.text, 'html.parser')
+
+    @cached_property
+    def canonical_url(self) -> str:
+        """URL canónica declarada por la página (<link rel=canonical> u og:url), o la URL final"""
+        head = self.text[:20000]
+        for pattern in (r'<link[^>]+rel=["\']canonical["\'][^>]*>', r'<meta[^>]+property=["\']og:url["\'][^>]*>'):
+            tag = re.search(pattern, head, re.IGNORECASE)
+            if tag:
+                href = re.search(r'(?:href|content)=["\']([^"\']+)["\']', tag.group(0), re.IGNORECASE)
+                if href:
+                    # Las canónicas relativas (/ruta) se resuelven contra la URL descargada
+                    canonical = urljoin(self.final_url or self.url, href.group(1))
+                    if canonical.startswith(('http://', 'https://')):
+                        return canonicalize_url(canonical)
+        return canonicalize_url(self.final_url or self.url)
+
+    def _sniff_encoding(self) -> str:
+        match = re.search(rb'<meta[^>]+charset=["\']?([\w-]+)', self.content[:4096], re.IGNORECASE)
+        return match.group(1).decode('ascii') if match else 'utf-8'
+
+
 class NewsContentExtractor:
-    def __init__(self, db_path="news_search.db", headless=True, timeout=30):
+    def __init__(self, db_path="news_search.db", headless=True, timeout=30, driver_pool_options=None,
+                 http_cache: Optional[HttpCache] = None, max_attempts: int = 3):
         self.db_path = db_path
         self.headless = headless
         self.timeout = timeout
+        # Intentos por URL antes de dejar de reintentarla (paywalls, 403, enlaces rotos)
+        self.max_attempts = max_attempts
+        # Caché HTTP persistente opcional para no volver a descargar artículos
+        self.http_cache = http_cache
+        # Opciones del pool de navegadores para el fallback de Selenium
+        self.driver_pool_options = driver_pool_options or {}
 
         # Headers para requests HTTP
         self.headers = {
@@ -54,6 +116,9 @@ class NewsContentExtractor:
             'Upgrade-Insecure-Requests': '1'
         }
 
+        # Sesión HTTP compartida: reutiliza conexiones keep-alive entre URLs y hilos
+        self.session = self._build_session()
+
         # Selectores CSS comunes para contenido principal
         self.content_selectors = [
             'article', '[role="main"]', '.article-content', '.post-content',
@@ -72,6 +137,69 @@ class NewsContentExtractor:
             '[class*="consent"]', '[id*="consent"]', '.floating-bar'
         ]
 
+    def _build_session(self, pool_size: int = 32) -> requests.Session:
+        """Crear la sesión HTTP con un pool de conexiones dimensionado para concurrencia"""
+        session = requests.Session()
+        session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def fetch_document(self, url: str) -> FetchedDocument:
+        """Descargar una URL con la sesión compartida (pasando por la caché HTTP si existe)"""
+        with get_metrics_recorder().measure("extraction", "fetch", items_in=1) as sample:
+            document = self._fetch_document(url)
+            sample.items_out = 1
+            if document.from_cache:
+                sample.name = "fetch (caché)"
+        return document
+
+    def _fetch_document(self, url: str) -> FetchedDocument:
+        cached = self.http_cache.lookup(url) if self.http_cache else None
+        if cached is not None and self.http_cache.is_fresh(cached):
+            return self._document_from_cache(url, cached)
+
+        response = self.session.get(url, timeout=self.timeout, allow_redirects=True,
+                                    headers=HttpCache.conditional_headers(cached))
+
+        if response.status_code == 304 and cached is not None:
+            self.http_cache.refresh(cached, dict(response.headers))
+            return self._document_from_cache(url, cached)
+
+        response.raise_for_status()
+
+        if self.http_cache:
+            self.http_cache.store(url, response.content, dict(response.headers),
+                                  final_url=response.url, status_code=response.status_code)
+
+        return FetchedDocument(
+            url=url,
+            content=response.content,
+            final_url=response.url,
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            encoding=self._declared_encoding(dict(response.headers))
+        )
+
+    def _document_from_cache(self, url: str, cached: CachedResponse) -> FetchedDocument:
+        return FetchedDocument(
+            url=url,
+            content=cached.content,
+            final_url=cached.final_url,
+            status_code=cached.status_code,
+            headers=cached.headers,
+            encoding=self._declared_encoding(cached.headers),
+            from_cache=True
+        )
+
+    @staticmethod
+    def _declared_encoding(headers: Dict[str, str]) -> Optional[str]:
+        """Codificación solo si el servidor la declara explícitamente en Content-Type"""
+        content_type = next((v for k, v in headers.items() if k.lower() == 'content-type'), '')
+        match = re.search(r'charset=["\']?([\w-]+)', content_type, re.IGNORECASE)
+        return match.group(1) if match else None
+
     def init_database(self):
         """Inicializar tabla para contenido extraído"""
         with sqlite3.connect(self.db_path) as conn:
@@ -91,27 +219,43 @@ class NewsContentExtractor:
                     error_message TEXT,
                     extraction_time REAL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    attempts INTEGER NOT NULL DEFAULT 1,
                     FOREIGN KEY (news_result_id) REFERENCES news_results (id)
                 )
             ''')
+            # Tablas creadas antes de contar los intentos
+            columns = [row[1] for row in cursor.execute("PRAGMA table_info(extracted_content)")]
+            if 'attempts' not in columns:
+                cursor.execute("ALTER TABLE extracted_content ADD COLUMN attempts INTEGER NOT NULL DEFAULT 1")
             conn.commit()
 
     def get_unprocessed_urls(self, limit=None) -> List[Tuple[int, str]]:
-        """Obtener URLs que no han sido procesadas"""
+        """
+        Obtener URLs sin extracción o cuya extracción falló menos de
+        max_attempts veces. Las nuevas van primero, para que los reintentos no
+        ocupen el límite.
+        """
         with sqlite3.connect(self.db_path) as conn:
+            # Los duplicados no se reintentan: su contenido ya está en la URL original
             query = '''
                 SELECT nr.id, nr.url
                 FROM news_results nr
                 LEFT JOIN extracted_content ec ON nr.id = ec.news_result_id
-                WHERE nr.url IS NOT NULL AND nr.url != '' AND ec.id IS NULL
+                WHERE nr.url IS NOT NULL AND nr.url != ''
+                  AND (ec.id IS NULL
+                       OR (ec.success = 0 AND ec.method_used != 'duplicate' AND ec.attempts < ?))
+                ORDER BY ec.id IS NOT NULL, ec.attempts, nr.id
             '''
             if limit:
                 query += f' LIMIT {limit}'
-            return conn.execute(query).fetchall()
+            return conn.execute(query, (self.max_attempts,)).fetchall()
 
     
-    def create_selenium_driver(self) -> webdriver.Chrome:
+    def create_selenium_driver(self) -> "webdriver.Chrome":
         """Crear driver de Selenium con configuración anti-detección"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
         options = Options()
         if self.headless:
             options.add_argument('--headless')
@@ -137,47 +281,63 @@ class NewsContentExtractor:
 
         return webdriver.Chrome(options=options)
 
-    def extract_with_requests_bs4(self, url: str) -> ExtractedContent:
+    @property
+    def driver_pool(self) -> WebDriverPool:
+        """Pool de Chrome compartido con los scrapers; si aún no existe se crea con create_selenium_driver"""
+        return get_shared_pool(browser_pool_name(self.headless), self.create_selenium_driver,
+                               **self.driver_pool_options)
+
+    def _extract_main_content(self, soup: BeautifulSoup) -> Tuple[str, str]:
+        """Obtener (título, contenido) de un árbol HTML eliminando los elementos no deseados"""
+        # Eliminar elementos no deseados
+        for selector in self.remove_selectors:
+            for element in soup.select(selector):
+                element.decompose()
+
+        # Extraer contenido principal
+        content = ""
+        title = ""
+
+        # Intentar extraer título
+        title_elem = soup.find(['h1', 'title'])
+        if title_elem:
+            title = title_elem.get_text().strip()
+
+        # Intentar extraer contenido principal
+        for selector in self.content_selectors:
+            content_elem = soup.select_one(selector)
+            if content_elem:
+                content = content_elem.get_text().strip()
+                break
+
+        # Si no encuentra contenido específico, usar el body completo
+        if not content:
+            body = soup.find('body')
+            if body:
+                content = body.get_text().strip()
+
+        # Limpiar contenido
+        return title, self.clean_text(content)
+
+    @staticmethod
+    def _measured(method, url: str, **kwargs) -> ExtractedContent:
+        """Ejecutar un método de extracción registrando tiempo, CPU y si obtuvo contenido"""
+        with get_metrics_recorder().measure("extraction", method.__name__, items_in=1) as sample:
+            result = method(url, **kwargs)
+            sample.name = result.method_used
+            sample.items_out = 1 if result.success else 0
+            sample.success = result.success
+            sample.error = result.error_message
+        return result
+
+    def extract_with_requests_bs4(self, url: str, document: Optional[FetchedDocument] = None) -> ExtractedContent:
         """Método 1: Requests + BeautifulSoup (más rápido)"""
         start_time = time.time()
         try:
-            session = requests.Session()
-            session.headers.update(self.headers)
-
-            response = session.get(url, timeout=self.timeout, allow_redirects=True)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Eliminar elementos no deseados
-            for selector in self.remove_selectors:
-                for element in soup.select(selector):
-                    element.decompose()
-
-            # Extraer contenido principal
-            content = ""
-            title = ""
-
-            # Intentar extraer título
-            title_tags = soup.find_all(['h1', 'title'])
-            if title_tags:
-                title = title_tags[0].get_text().strip()
-
-            # Intentar extraer contenido principal
-            for selector in self.content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    content = content_elem.get_text().strip()
-                    break
+            if document is None:
+                document = self.fetch_document(url)
 
-            # Si no encuentra contenido específico, usar el body completo
-            if not content:
-                body = soup.find('body')
-                if body:
-                    content = body.get_text().strip()
-
-            # Limpiar contenido
-            content = self.clean_text(content)
+            title, content = self._extract_main_content(document.soup)
 
             return ExtractedContent(
                 url=url,
@@ -198,12 +358,17 @@ class NewsContentExtractor:
                 error_message=str(e), extraction_time=time.time() - start_time
             )
 
-    def extract_with_newspaper(self, url: str) -> ExtractedContent:
+    def extract_with_newspaper(self, url: str, document: Optional[FetchedDocument] = None) -> ExtractedContent:
         """Método 2: Newspaper3k (mejor para artículos de noticias)"""
         start_time = time.time()
         try:
+            if document is None:
+                document = self.fetch_document(url)
+
+            from newspaper import Article
             article = Article(url)
-            article.download()
+            # Con el HTML ya descargado newspaper solo parsea, sin tocar la red
+            article.download(input_html=document.text)
             article.parse()
 
             return ExtractedContent(
@@ -225,23 +390,27 @@ class NewsContentExtractor:
                 error_message=str(e), extraction_time=time.time() - start_time
             )
 
-    def extract_with_trafilatura(self, url: str) -> ExtractedContent:
+    def extract_with_trafilatura(self, url: str, document: Optional[FetchedDocument] = None) -> ExtractedContent:
         """Método 3: Trafilatura (excelente para contenido limpio)"""
         start_time = time.time()
         try:
-            downloaded = trafilatura.fetch_url(url)
-            if not downloaded:
-                raise Exception("No se pudo descargar la página")
+            if document is None:
+                document = self.fetch_document(url)
 
-            content = trafilatura.extract(downloaded, include_comments=False, include_tables=False)
-            title = trafilatura.extract_metadata(downloaded).title if trafilatura.extract_metadata(downloaded) else ""
+            # Una sola pasada obtiene el texto y los metadatos
+            import trafilatura
+            extracted = trafilatura.bare_extraction(
+                document.content, url=url, include_comments=False, include_tables=False, with_metadata=True
+            )
+            content = extracted.text if extracted else ""
+            title = extracted.title if extracted else ""
 
             return ExtractedContent(
                 url=url,
                 title=title or "",
                 content=self.clean_text(content or ""),
-                author="",
-                publish_date="",
+                author=(extracted.author or "") if extracted else "",
+                publish_date=(extracted.date or "") if extracted else "",
                 method_used="trafilatura",
                 success=bool(content),
                 word_count=len(content.split()) if content else 0,
@@ -258,15 +427,19 @@ class NewsContentExtractor:
     def extract_with_selenium(self, url: str) -> ExtractedContent:
         """Método 4: Selenium (para sitios con mucho JavaScript)"""
         start_time = time.time()
+        pool = self.driver_pool
         driver = None
         try:
-            driver = self.create_selenium_driver()
+            driver = pool.acquire()
             driver.set_page_load_timeout(self.timeout)
 
             # Cargar página
             driver.get(url)
 
             # Esperar a que cargue el contenido
+            from selenium.webdriver.common.by import By
+            from selenium.webdriver.support import expected_conditions as EC
+            from selenium.webdriver.support.ui import WebDriverWait
             WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
@@ -275,35 +448,8 @@ class NewsContentExtractor:
             self.close_cookie_modals(driver)
 
             # Obtener HTML procesado
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-
-            # Eliminar elementos no deseados
-            for selector in self.remove_selectors:
-                for element in soup.select(selector):
-                    element.decompose()
-
-            # Extraer contenido
-            content = ""
-            title = ""
-
-            # Título
-            title_elem = soup.find('h1') or soup.find('title')
-            if title_elem:
-                title = title_elem.get_text().strip()
-
-            # Contenido principal
-            for selector in self.content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    content = content_elem.get_text().strip()
-                    break
-
-            if not content:
-                body = soup.find('body')
-                if body:
-                    content = body.get_text().strip()
-
-            content = self.clean_text(content)
+            document = FetchedDocument.from_html(url, driver.page_source)
+            title, content = self._extract_main_content(document.soup)
 
             return ExtractedContent(
                 url=url,
@@ -324,11 +470,14 @@ class NewsContentExtractor:
                 error_message=str(e), extraction_time=time.time() - start_time
             )
         finally:
+            # Se devuelve al pool; si quedó inutilizable lo detecta el health check
             if driver:
-                driver.quit()
+                pool.release(driver)
 
     def close_cookie_modals(self, driver):
         """Cerrar modales de cookies y consentimiento"""
+        from selenium.webdriver.common.by import By
+
         cookie_selectors = [
             '[class*="cookie"] button',
             '[class*="consent"] button',
@@ -354,42 +503,75 @@ class NewsContentExtractor:
             except:
                 continue
 
-    def extract_with_multiple_methods(self, news_id: int, url: str) -> ExtractedContent:
-        """Intentar extracción con múltiples métodos hasta encontrar contenido"""
+    def extract_with_multiple_methods(self, news_id: int, url: str,
+                                      document: Optional[FetchedDocument] = None) -> ExtractedContent:
+        """Intentar extracción con múltiples métodos hasta encontrar contenido
+
+        La página se descarga una sola vez y el mismo documento pasa por todas
+        las estrategias de parseo; Selenium solo se usa si ninguna obtiene
+        contenido sustancial.
+        """
+        best_result = None
+
+        if document is None:
+            try:
+                document = self.fetch_document(url)
+            except Exception as e:
+                print(f"Error descargando {url}: {e}")
+
+        if document is not None:
+            best_result = self.extract_from_document(document)
+            # Si encontramos contenido sustancial, no necesitamos el navegador
+            if best_result.success and best_result.word_count > 100:
+                return best_result
+
+        selenium_result = self._measured(self.extract_with_selenium, url)
+        if selenium_result.success and (best_result is None or not best_result.success
+                                        or selenium_result.word_count > best_result.word_count):
+            best_result = selenium_result
+
+        # Si no encontramos nada bueno, devolver un resultado fallido
+        if not best_result or not best_result.success:
+            best_result = ExtractedContent(
+                url=url, title="", content="", author="", publish_date="",
+                method_used="all_failed", success=False,
+                error_message="Todos los métodos fallaron"
+            )
+
+        return best_result
+
+    def extract_from_document(self, document: FetchedDocument) -> ExtractedContent:
+        """Aplicar los parsers sin red (newspaper, trafilatura, bs4) a un documento ya descargado"""
         methods = [
             self.extract_with_newspaper,
             self.extract_with_trafilatura,
-            self.extract_with_requests_bs4,
-            self.extract_with_selenium
+            self.extract_with_requests_bs4
         ]
 
         best_result = None
-        max_words = 0
-
         for method in methods:
             try:
-                result = method(url)
-
-                # Si es exitoso y tiene más contenido, es mejor
-                if result.success and result.word_count > max_words:
-                    best_result = result
-                    max_words = result.word_count
-
-                    # Si encontramos contenido sustancial, no necesitamos más métodos
-                    if result.word_count > 100:
-                        break
-
+                result = self._measured(method, document.url, document=document)
             except Exception as e:
                 print(f"Error con método {method.__name__}: {e}")
                 continue
 
-        # Si no encontramos nada bueno, devolver el último resultado
+            # Si es exitoso y tiene más contenido, es mejor
+            if result.success and (best_result is None or result.word_count > best_result.word_count):
+                best_result = result
+                if result.word_count > 100:
+                    break
+
         if not best_result:
             best_result = ExtractedContent(
-                url=url, title="", content="", author="", publish_date="",
-                method_used="all_failed", success=False,
-                error_message="Todos los métodos fallaron"
+                url=document.url, title="", content="", author="", publish_date="",
+                method_used="all_parsers_failed", success=False,
+                error_message="Ningún parser obtuvo contenido"
             )
+        else:
+            # Las variantes (AMP, parámetros, redirecciones) comparten la URL canónica
+            # declarada por la página y la ingesta las fusiona por URL
+            best_result.url = document.canonical_url
 
         return best_result
 
@@ -423,13 +605,14 @@ class NewsContentExtractor:
             conn.execute('''
                 INSERT OR REPLACE INTO extracted_content 
                 (news_result_id, url, title, content, author, publish_date, 
-                 method_used, word_count, success, error_message, extraction_time)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 method_used, word_count, success, error_message, extraction_time, attempts)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                        COALESCE((SELECT attempts FROM extracted_content WHERE news_result_id = ?), 0) + 1)
             ''', (
                 news_id, content.url, content.title, content.content,
                 content.author, content.publish_date, content.method_used,
                 content.word_count, content.success, content.error_message,
-                content.extraction_time
+                content.extraction_time, news_id
             ))
             conn.commit()
 
@@ -451,7 +634,7 @@ class NewsContentExtractor:
 
         if not urls:
             print("No hay URLs pendientes para procesar")
-            return
+            return {'processed': 0, 'successful': 0}
 
         print(f"Procesando {len(urls)} URLs con {max_workers} workers...")
 
@@ -476,10 +659,100 @@ class NewsContentExtractor:
                 except Exception as e:
                     print(f"Error procesando {url}: {e}")
 
+        self._print_extraction_summary(len(urls), success_count, total_words)
+        self._maintain_http_cache()
+        return {'processed': len(urls), 'successful': success_count}
+
+    def process_all_urls_async(self, limit=None, max_concurrency=32, per_host_limit=4, parser_workers=4):
+        """
+        Procesar todas las URLs pendientes con el motor asíncrono.
+
+        Cada URL se descarga una sola vez (sesión compartida, límite global y
+        por host) y el HTML se parsea en un pool de procesos, de forma que el
+        parseo no compite con las descargas por el GIL. Las páginas que no
+        rinden contenido suficiente pasan al fallback de Selenium.
+        """
+        urls = self.get_unprocessed_urls(limit)
+
+        if not urls:
+            print("No hay URLs pendientes para procesar")
+            return {'processed': 0, 'successful': 0}
+
+        print(f"Procesando {len(urls)} URLs (asyncio: {max_concurrency} descargas, "
+              f"{per_host_limit} por host, {parser_workers} procesos de parseo)...")
+
+        start_time = time.time()
+        results = asyncio.run(self._process_urls_async(urls, max_concurrency, per_host_limit, parser_workers))
+        # None: URL cuyo procesamiento falló (ya se informó del error)
+        results = [r for r in results if r is not None]
+
+        success_count = sum(1 for r in results if r.success)
+        total_words = sum(r.word_count for r in results if r.success)
+        self._print_extraction_summary(len(urls), success_count, total_words)
+        print(f"Tiempo total: {time.time() - start_time:.1f}s")
+        self._maintain_http_cache()
+        return {'processed': len(urls), 'successful': success_count}
+
+    def _maintain_http_cache(self):
+        """Aplicar TTL y límite de tamaño a la caché HTTP tras una tanda de extracción"""
+        if not self.http_cache:
+            return
+        result = self.http_cache.evict()
+        stats = self.http_cache.stats()
+        print(f"🗄️ Caché HTTP: {stats['entries']} entradas, {stats['bytes'] / 1024 / 1024:.1f} MB "
+              f"({result['expired']} expiradas, {result['evicted']} expulsadas)")
+
+    async def _process_urls_async(self, urls, max_concurrency, per_host_limit, parser_workers) -> List[ExtractedContent]:
+        loop = asyncio.get_running_loop()
+        # Artículos ya vistos en esta tanda según su URL canónica
+        seen_articles: Dict[str, str] = {}
+
+        with ProcessPoolExecutor(max_workers=parser_workers, initializer=_init_parser_worker) as parser_pool:
+
+            async def handle(news_id, url, document: Optional[FetchedDocument], error: Optional[Exception]):
+                start_time = time.time()
+                if document is not None:
+                    key = dedup_key(document.canonical_url)
+                    if key in seen_articles:
+                        result = ExtractedContent(
+                            url=url, title="", content="", author="", publish_date="",
+                            method_used="duplicate", success=False,
+                            error_message=f"Duplicado de {seen_articles[key]}"
+                        )
+                        await loop.run_in_executor(None, self.save_extracted_content, news_id, result)
+                        print(f"↺ duplicado - {url}")
+                        return result
+                    seen_articles[key] = url
+                    result, samples = await loop.run_in_executor(parser_pool, _parse_in_worker, document)
+                    get_metrics_recorder().extend(samples)
+                else:
+                    result = ExtractedContent(
+                        url=url, title="", content="", author="", publish_date="",
+                        method_used="download", success=False, error_message=str(error)
+                    )
+
+                # Páginas con poco contenido o que no se pudieron descargar: probar con el navegador
+                if not result.success or result.word_count <= 100:
+                    selenium_result = await loop.run_in_executor(None, self._measured, self.extract_with_selenium, url)
+                    if selenium_result.success and selenium_result.word_count > result.word_count:
+                        result = selenium_result
+
+                result.extraction_time = time.time() - start_time
+                await loop.run_in_executor(None, self.save_extracted_content, news_id, result)
+
+                status = "✓" if result.success else "✗"
+                print(f"{status} {result.method_used} - {result.word_count} palabras - {url}")
+                return result
+
+            async with AsyncFetcher(self.fetch_document, max_concurrency, per_host_limit) as fetcher:
+                return await fetcher.map(urls, handle)
+
+    @staticmethod
+    def _print_extraction_summary(processed: int, success_count: int, total_words: int):
         print(f"\n=== Resumen de Extracción ===")
-        print(f"URLs procesadas: {len(urls)}")
+        print(f"URLs procesadas: {processed}")
         print(f"Extracciones exitosas: {success_count}")
-        print(f"Tasa de éxito: {success_count / len(urls) * 100:.1f}%")
+        print(f"Tasa de éxito: {success_count / processed * 100:.1f}%")
         print(f"Total de palabras extraídas: {total_words:,}")
 
     def get_extraction_stats(self):
@@ -511,6 +784,28 @@ class NewsContentExtractor:
             return stats, method_stats
 
 
+# Extractor por proceso para el pool de parseo (se crea al primer uso en cada worker)
+_worker_extractor: Optional[NewsContentExtractor] = None
+
+
+def _init_parser_worker():
+    # Con fork el worker hereda las muestras pendientes del padre: sin vaciarlas se devolverían duplicadas
+    get_metrics_recorder().drain()
+
+
+def _parse_in_worker(document: FetchedDocument) -> Tuple[ExtractedContent, list]:
+    """
+    Punto de entrada del pool de procesos: parsear un documento sin acceder a
+    la red. Devuelve también las métricas del worker, que el proceso
+    principal incorpora a su registro.
+    """
+    global _worker_extractor
+    if _worker_extractor is None:
+        _worker_extractor = NewsContentExtractor(db_path=None)
+    result = _worker_extractor.extract_from_document(document)
+    return result, get_metrics_recorder().drain()
+
+
 def main():
     # Crear extractor
     extractor = NewsContentExtractor(headless=True)
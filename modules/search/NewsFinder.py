@@ -4,7 +4,10 @@ Librería modular y desacoplada para scraping de noticias
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Protocol
+from typing import Callable, List, Dict, Optional, Protocol
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+import threading
 import time
 import random
 from urllib.parse import quote_plus, urljoin
@@ -17,6 +20,9 @@ from ddgs import DDGS
 from bs4 import BeautifulSoup
 import urllib.parse
 
+from modules.browser.WebDriverPool import WebDriverPool, browser_pool_name, get_shared_pool
+from services.metrics import get_metrics_recorder
+
 
 
 # ============================================================================
@@ -46,6 +52,11 @@ class NewsResult:
         }
 
 
+class SearchCancelledError(Exception):
+    """La búsqueda se canceló porque el motor superó su tiempo límite"""
+    pass
+
+
 class WebDriverProvider(Protocol):
     """Protocolo para proveedores de WebDriver"""
 
@@ -77,8 +88,10 @@ class NewsScraperInterface(ABC):
 class ChromeDriverProvider:
     """Proveedor de ChromeDriver con configuraciones específicas"""
 
-    def __init__(self, wait_timeout: int = 15):
+    def __init__(self, wait_timeout: int = 15, pool_options: Optional[Dict] = None):
         self.wait_timeout = wait_timeout
+        # Opciones del pool compartido (max_size, max_pages, idle_timeout)
+        self.pool_options = pool_options or {}
 
     def get_driver(self, headless: bool = True) -> webdriver.Chrome:
         """Crear y configurar una instancia de ChromeDriver"""
@@ -87,6 +100,10 @@ class ChromeDriverProvider:
         self._configure_anti_detection(driver)
         return driver
 
+    def get_pool(self, headless: bool = True) -> WebDriverPool:
+        """Pool de Chrome compartido con el resto de scrapers y el extractor"""
+        return get_shared_pool(browser_pool_name(headless), lambda: self.get_driver(headless), **self.pool_options)
+
     def configure_options(self, headless: bool = True) -> Options:
         """Configurar opciones básicas de Chrome"""
         chrome_options = Options()
@@ -153,26 +170,76 @@ class GoogleChromeDriverProvider(ChromeDriverProvider):
 class BaseNewsScraper(NewsScraperInterface):
     """Clase base para scrapers de noticias"""
 
-    def __init__(self, driver_provider: WebDriverProvider, headless: bool = True):
+    def __init__(self, driver_provider: WebDriverProvider, headless: bool = True, use_pool: bool = False):
         self.driver_provider = driver_provider
         self.headless = headless
+        self.use_pool = use_pool
         self.driver = None
         self.wait = None
+        self._pool = None
+        # Búsqueda concurrente: aviso al disponer de navegador y evento para cancelar la búsqueda
+        self.on_driver_ready: Optional[Callable[[], None]] = None
+        self.cancel_event: Optional[threading.Event] = None
         self._setup_driver()
 
     def _setup_driver(self):
-        """Configurar el driver usando el proveedor"""
+        """Configurar el driver usando el proveedor
+
+        Con use_pool el driver no se crea aquí: se toma prestado del pool
+        compartido solo mientras dura cada búsqueda.
+        """
+        if self.use_pool and hasattr(self.driver_provider, 'get_pool'):
+            self._pool = self.driver_provider.get_pool(self.headless)
+            return
         self.driver = self.driver_provider.get_driver(self.headless)
         self.wait = WebDriverWait(self.driver, getattr(self.driver_provider, 'wait_timeout', 15))
 
+    @contextmanager
+    def _leased_driver(self):
+        """Disponer de self.driver durante una búsqueda (prestado del pool si aplica)"""
+        if self._pool is None:
+            self._driver_ready()
+            yield self.driver
+            return
+
+        self.driver = self._pool.acquire()
+        self.wait = WebDriverWait(self.driver, getattr(self.driver_provider, 'wait_timeout', 15))
+        try:
+            # Si se canceló mientras esperaba un navegador del pool, lo devuelve sin usarlo
+            self._driver_ready()
+            yield self.driver
+        finally:
+            self._pool.release(self.driver)
+            self.driver = None
+            self.wait = None
+
+    def _driver_ready(self):
+        self._check_cancelled()
+        if self.on_driver_ready is not None:
+            self.on_driver_ready()
+
+    def _check_cancelled(self):
+        """Cortar la búsqueda entre pasos si el motor ya superó su tiempo"""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise SearchCancelledError(f"{type(self).__name__}: búsqueda cancelada por tiempo")
+
+    def pause(self, seconds: float):
+        """Esperar entre pasos; una cancelación interrumpe la espera"""
+        if self.cancel_event is None:
+            time.sleep(seconds)
+        else:
+            self.cancel_event.wait(seconds)
+        self._check_cancelled()
+
     def human_like_delay(self, min_delay: float = 1, max_delay: float = 3):
         """Añadir delays aleatorios para simular comportamiento humano"""
-        time.sleep(random.uniform(min_delay, max_delay))
+        self.pause(random.uniform(min_delay, max_delay))
 
     def close(self):
-        """Cerrar el driver"""
-        if self.driver:
+        """Cerrar el driver (los drivers del pool se quedan en el pool)"""
+        if self.driver and self._pool is None:
             self.driver.quit()
+            self.driver = None
 
     def __enter__(self):
         return self
@@ -190,29 +257,31 @@ class GoogleNewsScraper(BaseNewsScraper):
 
     def search_news(self, query: str, time_filter: str = "w", max_results: int = 20) -> List[NewsResult]:
         """Buscar noticias en Google News"""
-        try:
-            # Establecer sesión con Google
-            self.driver.get("https://www.google.com")
-            self.human_like_delay(2, 4)
+        with self._leased_driver():
+            try:
+                # Establecer sesión con Google
+                self.driver.get("https://www.google.com")
+                self.human_like_delay(2, 4)
 
-            # Construir URL
-            encoded_query = quote_plus(query)
-            url = f"https://www.google.com/search?q={encoded_query}&tbm=nws&tbs=qdr:{time_filter}"
+                # Construir URL
+                encoded_query = quote_plus(query)
+                url = f"https://www.google.com/search?q={encoded_query}&tbm=nws&tbs=qdr:{time_filter}"
+                self._check_cancelled()
 
-            self.driver.get(url)
-            self.wait.until(EC.presence_of_element_located((By.ID, "search")))
-            self.human_like_delay(3, 5)
+                self.driver.get(url)
+                self.wait.until(EC.presence_of_element_located((By.ID, "search")))
+                self.human_like_delay(3, 5)
 
-            # Scroll para cargar contenido
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            self.human_like_delay(1, 2)
+                # Scroll para cargar contenido
+                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
+                self.human_like_delay(1, 2)
 
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            return self._extract_google_results(soup, max_results)
+                soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+                return self._extract_google_results(soup, max_results)
 
-        except Exception as e:
-            print(f"Error en búsqueda de Google: {e}")
-            return []
+            except Exception as e:
+                print(f"Error en búsqueda de Google: {e}")
+                return []
 
     def _extract_google_results(self, soup: BeautifulSoup, max_results: int) -> List[NewsResult]:
         """Extraer resultados de Google News"""
@@ -323,20 +392,21 @@ class YahooNewsScraper(BaseNewsScraper):
 
     def search_news(self, query: str, **kwargs) -> List[NewsResult]:
         """Buscar noticias en Yahoo News"""
-        try:
-            encoded_query = quote_plus(query)
-            url = f"https://co.search.yahoo.com/search?p={encoded_query}&fr=uh3_news_web&fr2=time&btf=w&tsrc=uh3_news_web"
+        with self._leased_driver():
+            try:
+                encoded_query = quote_plus(query)
+                url = f"https://co.search.yahoo.com/search?p={encoded_query}&fr=uh3_news_web&fr2=time&btf=w&tsrc=uh3_news_web"
 
-            self.driver.get(url)
-            self.wait.until(EC.presence_of_element_located((By.ID, "web")))
-            time.sleep(5)
+                self.driver.get(url)
+                self.wait.until(EC.presence_of_element_located((By.ID, "web")))
+                self.pause(5)
 
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            return self._extract_yahoo_results(soup)
+                soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+                return self._extract_yahoo_results(soup)
 
-        except Exception as e:
-            print(f"Error en búsqueda de Yahoo: {e}")
-            return []
+            except Exception as e:
+                print(f"Error en búsqueda de Yahoo: {e}")
+                return []
 
     def _extract_yahoo_results(self, soup: BeautifulSoup) -> List[NewsResult]:
         """Extraer resultados de Yahoo News"""
@@ -428,20 +498,21 @@ class DuckDuckGoNewsScraper(BaseNewsScraper):
 
     def search_news(self, query: str, **kwargs) -> List[NewsResult]:
         """Buscar noticias en DuckDuckGo"""
-        try:
-            encoded_query = quote_plus(query)
-            url = f"https://duckduckgo.com/?q={encoded_query}&t=h_&iar=news&ndf=w"
+        with self._leased_driver():
+            try:
+                encoded_query = quote_plus(query)
+                url = f"https://duckduckgo.com/?q={encoded_query}&t=h_&iar=news&ndf=w"
 
-            self.driver.get(url)
-            self.wait.until(EC.presence_of_element_located((By.ID, "react-layout")))
-            time.sleep(3)
+                self.driver.get(url)
+                self.wait.until(EC.presence_of_element_located((By.ID, "react-layout")))
+                self.pause(3)
 
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            return self._extract_duckduckgo_results(soup)
+                soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+                return self._extract_duckduckgo_results(soup)
 
-        except Exception as e:
-            print(f"Error en búsqueda de DuckDuckGo: {e}")
-            return []
+            except Exception as e:
+                print(f"Error en búsqueda de DuckDuckGo: {e}")
+                return []
 
     def _extract_duckduckgo_results(self, soup: BeautifulSoup) -> List[NewsResult]:
         """Extraer resultados de DuckDuckGo News"""
@@ -529,17 +600,20 @@ class NewsScraperFactory:
         """Crear un scraper específico"""
         scraper_type = scraper_type.lower()
 
+        use_pool = kwargs.get('use_pool', False)
+        pool_options = kwargs.get('pool_options')
+
         if scraper_type == 'google':
-            driver_provider = GoogleChromeDriverProvider(kwargs.get('wait_timeout', 15))
-            return GoogleNewsScraper(driver_provider, headless)
+            driver_provider = GoogleChromeDriverProvider(kwargs.get('wait_timeout', 15), pool_options)
+            return GoogleNewsScraper(driver_provider, headless, use_pool)
 
         elif scraper_type == 'yahoo':
-            driver_provider = ChromeDriverProvider(kwargs.get('wait_timeout', 15))
-            return YahooNewsScraper(driver_provider, headless)
+            driver_provider = ChromeDriverProvider(kwargs.get('wait_timeout', 15), pool_options)
+            return YahooNewsScraper(driver_provider, headless, use_pool)
 
         elif scraper_type == 'duckduckgo':
-            driver_provider = ChromeDriverProvider(kwargs.get('wait_timeout', 10))
-            return DuckDuckGoNewsScraper(driver_provider, headless)
+            driver_provider = ChromeDriverProvider(kwargs.get('wait_timeout', 10), pool_options)
+            return DuckDuckGoNewsScraper(driver_provider, headless, use_pool)
 
         elif scraper_type == 'duckduckgo_api':
             return DDGApiScraper()
@@ -553,6 +627,8 @@ class NewsScraperManager:
 
     def __init__(self):
         self.scrapers: Dict[str, NewsScraperInterface] = {}
+        # Motores que no respondieron a tiempo en la última búsqueda
+        self.timed_out_engines: List[str] = []
 
     def add_scraper(self, name: str, scraper: NewsScraperInterface):
         """Agregar un scraper al gestor"""
@@ -569,21 +645,151 @@ class NewsScraperManager:
         if scraper_name not in self.scrapers:
             raise ValueError(f"Scraper '{scraper_name}' no encontrado")
 
-        return self.scrapers[scraper_name].search_news(query, **kwargs)
+        return self._measured_search(scraper_name, self.scrapers[scraper_name], query, **kwargs)
+
+    @staticmethod
+    def _measured_search(name: str, scraper: NewsScraperInterface, query: str, **kwargs) -> List[NewsResult]:
+        """search_news con registro de tiempo, CPU y resultados por motor"""
+        with get_metrics_recorder().measure("search", name, items_in=1) as sample:
+            results = scraper.search_news(query, **kwargs)
+            sample.items_out = len(results)
+        return results
+
+    def search_all(self, query: str, concurrent: bool = False, engine_timeout: Optional[float] = None,
+                   global_timeout: Optional[float] = None, **kwargs) -> Dict[str, List[NewsResult]]:
+        """Buscar usando todos los scrapers disponibles
+
+        Con concurrent=True cada motor se ejecuta en su propio hilo; ver
+        search_all_concurrent para la semántica de los timeouts.
+        """
+        if concurrent:
+            return self.search_all_concurrent(query, engine_timeout=engine_timeout,
+                                              global_timeout=global_timeout, **kwargs)
 
-    def search_all(self, query: str, **kwargs) -> Dict[str, List[NewsResult]]:
-        """Buscar usando todos los scrapers disponibles"""
         results = {}
+        self.timed_out_engines = []
 
         for name, scraper in self.scrapers.items():
             try:
-                results[name] = scraper.search_news(query, **kwargs)
+                results[name] = self._measured_search(name, scraper, query, **kwargs)
             except Exception as e:
                 print(f"Error en scraper {name}: {e}")
                 results[name] = []
 
         return results
 
+    def search_all_concurrent(self, query: str, engine_timeout: Optional[float] = None,
+                              global_timeout: Optional[float] = None, max_workers: Optional[int] = None,
+                              on_results: Optional[Callable[[str, List[NewsResult]], None]] = None,
+                              **kwargs) -> Dict[str, List[NewsResult]]:
+        """
+        Buscar en todos los scrapers en paralelo.
+
+        engine_timeout limita lo que puede tardar cada motor desde que dispone de
+        navegador (el tiempo esperando uno del pool compartido no cuenta) y
+        global_timeout limita la fase completa. Los motores que no terminan a
+        tiempo se registran en self.timed_out_engines y no aparecen en el
+        resultado; además se les pide cancelar, así que cortan la búsqueda en el
+        siguiente paso y devuelven su driver al pool. El resto devuelve sus
+        resultados parciales.
+
+        on_results(nombre, resultados) se llama en cuanto termina cada motor,
+        sin esperar a los demás (lo usa el pipeline en streaming).
+        """
+        self.timed_out_engines = []
+        results: Dict[str, List[NewsResult]] = {}
+
+        if not self.scrapers:
+            return results
+
+        start = time.monotonic()
+        global_deadline = start + global_timeout if global_timeout is not None else None
+        started_at: Dict[str, float] = {}
+        lock = threading.Lock()
+        cancel_events = {name: threading.Event() for name in self.scrapers}
+
+        def mark_started(name: str):
+            with lock:
+                started_at[name] = time.monotonic()
+
+        def run(name: str, scraper: NewsScraperInterface) -> List[NewsResult]:
+            if isinstance(scraper, BaseNewsScraper):
+                scraper.cancel_event = cancel_events[name]
+                # El reloj del motor arranca al tener navegador, no mientras espera uno del pool
+                scraper.on_driver_ready = lambda: mark_started(name)
+            else:
+                mark_started(name)
+            try:
+                return self._measured_search(name, scraper, query, **kwargs)
+            finally:
+                if isinstance(scraper, BaseNewsScraper):
+                    scraper.cancel_event = scraper.on_driver_ready = None
+
+        executor = ThreadPoolExecutor(max_workers=max_workers or len(self.scrapers),
+                                      thread_name_prefix="news-search")
+        pending = {executor.submit(run, name, scraper): name for name, scraper in self.scrapers.items()}
+
+        try:
+            while pending:
+                now = time.monotonic()
+
+                # Motores que ya agotaron su tiempo individual
+                if engine_timeout is not None:
+                    with lock:
+                        expired = [f for f, name in pending.items()
+                                   if name in started_at and now - started_at[name] >= engine_timeout]
+                    for future in expired:
+                        self._mark_timed_out(pending.pop(future), future, cancel_events)
+                    if not pending:
+                        break
+
+                if global_deadline is not None and now >= global_deadline:
+                    for future in list(pending):
+                        self._mark_timed_out(pending.pop(future), future, cancel_events)
+                    break
+
+                # Esperar hasta el siguiente vencimiento posible
+                wait_for = []
+                if global_deadline is not None:
+                    wait_for.append(global_deadline - now)
+                if engine_timeout is not None:
+                    with lock:
+                        wait_for.extend(started_at[name] + engine_timeout - now
+                                        for name in pending.values() if name in started_at)
+                    # Motores en cola o esperando navegador: revisar pronto por si empiezan
+                    if any(name not in started_at for name in pending.values()):
+                        wait_for.append(0.5)
+                timeout = max(0.0, min(wait_for)) if wait_for else None
+
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = pending.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        print(f"Error en scraper {name}: {e}")
+                        results[name] = []
+                    if on_results is not None and results[name]:
+                        on_results(name, results[name])
+        finally:
+            # No se espera a los hilos que siguen en el navegador: al estar cancelados, devuelven su driver
+            for future, name in pending.items():
+                cancel_events[name].set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        elapsed = time.monotonic() - start
+        if self.timed_out_engines:
+            print(f"⏱️ Motores sin respuesta a tiempo: {', '.join(self.timed_out_engines)}")
+        print(f"⚡ Búsqueda concurrente completada en {elapsed:.1f}s")
+
+        return results
+
+    def _mark_timed_out(self, name: str, future, cancel_events: Dict[str, threading.Event]):
+        """Registrar un motor que superó su tiempo límite y pedirle que pare"""
+        future.cancel()
+        cancel_events[name].set()
+        self.timed_out_engines.append(name)
+
     def search_with_fallback(self, query: str, preferred_order: List[str] = None, **kwargs) -> List[NewsResult]:
         """Buscar con estrategia de fallback"""
         if preferred_order is None:
@@ -592,7 +798,7 @@ class NewsScraperManager:
         for scraper_name in preferred_order:
             if scraper_name in self.scrapers:
                 try:
-                    results = self.scrapers[scraper_name].search_news(query, **kwargs)
+                    results = self._measured_search(scraper_name, self.scrapers[scraper_name], query, **kwargs)
                     if results:
                         return results
                 except Exception as e:
@@ -0,0 +1,180 @@
+"""
+Canonicalización y deduplicación de URLs de noticias
+Unifica las variantes que devuelven los distintos motores antes de guardarlas
+"""
+
+import base64
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+
+# Parámetros de seguimiento que no cambian el artículo
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid',
+    'igshid', 'ocid', 'cmpid', 'smid', 'smtyp', 'ref', 'ref_src', 'referrer',
+    'ito', 'ns_mchannel', 'ns_source', 'ns_campaign', 'ns_linkname', 'ns_fee',
+    'guccounter', 'guce_referrer', 'guce_referrer_sig', 'soc_src', 'soc_trk', '__twitter_impression',
+    'amp_js_v', 'usqp', 'ved', 'usg'
+}
+
+# Prefijos de parámetros de seguimiento (utm_source, utm_medium, ...)
+TRACKING_PREFIXES = ('utm_', 'at_', 'pk_', 'hsa_', 'vero_', 'oly_')
+
+# Valores que marcan la versión AMP en la query (?outputType=amp, ?amp=1)
+AMP_QUERY_VALUES = {'amp', '1', 'true'}
+
+# Host sin esquema al principio de la URL (example.com/ruta, www.example.com:8080)
+_BARE_HOST = re.compile(r'^[\w-]+(\.[\w-]+)+(:\d+)?(/|$)')
+
+
+def unwrap_redirect(url: str) -> str:
+    """Extraer la URL real de los envoltorios de redirección de los buscadores"""
+    for _ in range(3):  # Los envoltorios a veces van anidados
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        query = dict(parse_qsl(parts.query))
+        target = None
+
+        # Google: /url?q=<destino> o /url?url=<destino>
+        if ('google.' in host or not host) and parts.path == '/url':
+            target = query.get('q') or query.get('url')
+
+        # Yahoo: r.search.yahoo.com/_ylt=.../RU=<destino codificado>/RK=.../RS=...
+        elif host.startswith('r.search.yahoo.') or host.startswith('r.news.yahoo.'):
+            match = re.search(r'/RU=([^/]+)/R[KS]=', parts.path + '/RK=')
+            if match:
+                target = unquote(match.group(1))
+
+        # DuckDuckGo: /l/?uddg=<destino>
+        elif 'duckduckgo.com' in host and parts.path.startswith('/l/'):
+            target = query.get('uddg')
+
+        # Bing: /ck/a?...&u=a1<base64 urlsafe>
+        elif 'bing.com' in host and parts.path.startswith('/ck/'):
+            encoded = query.get('u', '')
+            if encoded.startswith('a1'):
+                try:
+                    padded = encoded[2:] + '=' * (-len(encoded[2:]) % 4)
+                    target = base64.urlsafe_b64decode(padded).decode('utf-8')
+                except (ValueError, UnicodeDecodeError):
+                    target = None
+
+        if not target or not target.startswith(('http://', 'https://')):
+            return url
+        url = target
+    return url
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _is_amp_marker(name: str, value: str) -> bool:
+    # Solo son marcadores AMP si su valor lo indica (?output=json es otra cosa)
+    return name.lower() in ('amp', 'outputtype', 'output') and value.lower() in AMP_QUERY_VALUES
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    URL canónica para descargar: sin redirecciones, sin parámetros de
+    seguimiento ni fragmento y con el host en minúsculas. No toca la ruta ni
+    la variante AMP, que sirven otra página (esas reglas solo van en
+    dedup_key). Las URLs relativas se devuelven tal cual.
+    """
+    if not url:
+        return url
+
+    url = unwrap_redirect(url.strip())
+    # Sin esquema, urlsplit tomaría "example.com:8080/a" por esquema y "example.com/a" por ruta
+    if '://' not in url and not url.startswith('//'):
+        if not _BARE_HOST.match(url):
+            return url
+        url = f"https://{url}"
+    parts = urlsplit(url)
+    scheme = (parts.scheme or 'https').lower()
+    host = parts.netloc.lower()
+
+    if (scheme == 'http' and host.endswith(':80')) or (scheme == 'https' and host.endswith(':443')):
+        host = host.rsplit(':', 1)[0]
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking_param(k)]
+
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+def dedup_key(url: str) -> str:
+    """
+    Clave de deduplicación: la URL canónica sin esquema ni 'www.', sin la
+    variante AMP (por host, ruta o query), sin barra final y con la query ordenada.
+    """
+    parts = urlsplit(canonicalize_url(url))
+    host = parts.netloc
+    path = parts.path
+
+    # AMP servido desde subdominio o caché de Google (amp.example.com, example-com.cdn.ampproject.org)
+    if host.startswith('amp.'):
+        host = host[len('amp.'):]
+    elif host.endswith('.cdn.ampproject.org'):
+        # /c/s/www.example.com/ruta -> www.example.com/ruta
+        match = re.match(r'^/[a-z]/(?:s/)?([^/]+)(/.*)?$', path)
+        if match:
+            host, path = match.group(1).lower(), match.group(2) or '/'
+
+    if host.startswith('www.'):
+        host = host[len('www.'):]
+    path = re.sub(r'/amp/?$', '/', path)
+    path = re.sub(r'\.amp(\.html?)?$', r'\1', path)
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_amp_marker(k, v)]
+    query = urlencode(sorted(query))
+    return f"{host}{path}" + (f"?{query}" if query else "")
+
+
+class NewsUrlDeduplicator:
+    """
+    Etapa entre search_all y el guardado: canonicaliza las URLs de todos los
+    motores y se queda con una sola aparición por artículo. Las claves vistas
+    se recuerdan entre llamadas, de modo que la misma instancia sirve para
+    deduplicar resultados que llegan en varias tandas.
+    """
+
+    def __init__(self, engine_priority: Optional[List[str]] = None):
+        # Motores preferidos cuando un artículo aparece en varios (mejores metadatos)
+        self.engine_priority = engine_priority or []
+        self.seen: Set[str] = set()
+
+    def deduplicate(self, results_by_engine: Dict[str, List]) -> Tuple[Dict[str, List], int]:
+        """Devolver (resultados únicos por motor, número de duplicados descartados)"""
+        ordered = sorted(results_by_engine.items(),
+                         key=lambda item: (self.engine_priority.index(item[0])
+                                           if item[0] in self.engine_priority else len(self.engine_priority)))
+
+        unique: Dict[str, List] = {engine: [] for engine in results_by_engine}
+        duplicates = 0
+
+        for engine, results in ordered:
+            for result in results:
+                if self.accept(result):
+                    unique[engine].append(result)
+                else:
+                    duplicates += 1
+
+        return unique, duplicates
+
+    def accept(self, result) -> bool:
+        """Canonicalizar la URL de un resultado y decir si es la primera vez que se ve"""
+        if not result.url:
+            return False
+        result.url = canonicalize_url(result.url)
+        key = dedup_key(result.url)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        return True
+
+    def reset(self):
+        self.seen.clear()
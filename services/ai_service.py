@@ -3,24 +3,42 @@
 # == SERVICIO DE INTERACCIÓN CON EL MODELO DE LENGUAJE (IA)
 # ==============================================================================
 
-import ollama
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pydantic import ValidationError
-from core.models import ImprovedQuery, NewsEvaluation, ScriptFragment
+from typing import Dict, Iterator, List, Optional
+from services.llm_client import (LLMClient, get_llm_client, PRIORITY_INTERACTIVE, PRIORITY_SCRIPT,
+                                 PRIORITY_EVALUATION, PRIORITY_BACKGROUND)
+from core.models import ImprovedQuery, NewsEvaluation, BatchNewsEvaluation, ScriptFragment
+
+# Estimación aproximada de caracteres por token para texto en español
+CHARS_PER_TOKEN = 3.5
+# Tokens reservados para las instrucciones del prompt de lote
+BATCH_PROMPT_TOKENS = 200
+# Tokens de salida que ocupa cada evaluación en el JSON de respuesta
+BATCH_OUTPUT_TOKENS_PER_ARTICLE = 30
+# Contexto por defecto si no se configura ni se puede consultar al modelo
+DEFAULT_CONTEXT_WINDOW = 4096
 
 
 class AIService:
-    def __init__(self, model_name: str):
+    def __init__(self, model_name: str, context_window: Optional[int] = None,
+                 llm_client: Optional[LLMClient] = None):
         self.model_name = model_name
+        self._context_window = context_window
+        self.llm = llm_client or get_llm_client()
 
     def improve_search_query(self, query: str) -> ImprovedQuery:
         prompt = f"""Mejora este título de búsqueda de noticias para que sea más efectivo y amplio: "{query}".
         Enfócate en términos que produzcan resultados de alta calidad y relevancia internacional, dando el resultado en español."""
         try:
-            response = ollama.chat(
+            response = self.llm.chat(
+                use_cache=True,
+                priority=PRIORITY_INTERACTIVE,
                 model=self.model_name,
                 messages=[{"role": "user", "content": prompt}],
-                format=ImprovedQuery.model_json_schema()
+                format=ImprovedQuery.model_json_schema(),
+                response_model=ImprovedQuery
             )
             return ImprovedQuery.model_validate_json(response['message']['content'])
         except (ValidationError, json.JSONDecodeError, KeyError) as e:
@@ -33,26 +51,139 @@ class AIService:
         Contenido: "{article.get('contenido', '')[:500]}..."
         Decide si debe 'mantener' o 'eliminar'. Si es relevante, asigna una calificación de 1 a 10."""
         try:
-            response = ollama.chat(
+            response = self.llm.chat(
+                use_cache=True,
+                priority=PRIORITY_EVALUATION,
                 model=self.model_name,
                 messages=[{"role": "user", "content": prompt}],
-                format=NewsEvaluation.model_json_schema()
+                format=NewsEvaluation.model_json_schema(),
+                response_model=NewsEvaluation
             )
             return NewsEvaluation.model_validate_json(response['message']['content'])
         except (ValidationError, json.JSONDecodeError, KeyError) as e:
             print(f"Error en la evaluación: {e}. Por defecto: 'mantener', calificación 5.")
             return NewsEvaluation(accion="mantener", calificacion=5)
 
+    # ==========================================================================
+    # == EVALUACIÓN POR LOTES
+    # ==========================================================================
+
+    @property
+    def context_window(self) -> int:
+        """Ventana de contexto (configurada o, si no, la que declara el modelo)"""
+        if self._context_window is None:
+            self._context_window = DEFAULT_CONTEXT_WINDOW
+            try:
+                modelinfo = self.llm.show(self.model_name).modelinfo or {}
+                for key, value in modelinfo.items():
+                    if key.endswith('.context_length'):
+                        self._context_window = int(value)
+                        break
+            except Exception as e:
+                print(f"⚠️ No se pudo consultar el contexto del modelo: {e}. Usando {DEFAULT_CONTEXT_WINDOW}.")
+        return self._context_window
+
+    @staticmethod
+    def _batch_entry(number: int, article: dict) -> str:
+        return (f"[{number}] Título: \"{article.get('titulo', '')}\"\n"
+                f"Contenido: \"{(article.get('contenido') or '')[:500]}...\"")
+
+    def batch_size_for(self, articles: List[dict], max_batch_size: int = 16) -> int:
+        """Número de artículos que caben en un prompt según la ventana de contexto"""
+        if not articles:
+            return 0
+        longest = max(len(self._batch_entry(0, article)) for article in articles)
+        per_article = longest / CHARS_PER_TOKEN + BATCH_OUTPUT_TOKENS_PER_ARTICLE
+        available = self.context_window - BATCH_PROMPT_TOKENS
+        return max(1, min(max_batch_size, int(available // per_article)))
+
+    def evaluate_news_batch(self, articles: List[dict], target_search: str,
+                            max_batch_size: int = 16) -> Dict[int, NewsEvaluation]:
+        """
+        Evaluar varias noticias con una llamada por lote.
+        Devuelve {id de la noticia: evaluación} para todos los artículos recibidos.
+        """
+        batch_size = self.batch_size_for(articles, max_batch_size)
+        batches = [articles[start:start + batch_size] for start in range(0, len(articles), batch_size)]
+        print(f"🧮 Evaluando {len(articles)} noticias en {len(batches)} lotes de hasta {batch_size}")
+
+        # Los lotes se envían a la vez; el cliente limita cuántos llegan al servidor
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, self.llm.max_parallel)) as executor:
+            for partial in executor.map(lambda batch: self._evaluate_batch(batch, target_search), batches):
+                results.update(partial)
+        return results
+
+    def evaluate_news_articles(self, articles: List[dict], target_search: str) -> Dict[int, NewsEvaluation]:
+        """Evaluar noticias de una en una pero en paralelo; devuelve {id: evaluación}"""
+        with ThreadPoolExecutor(max_workers=max(1, self.llm.max_parallel)) as executor:
+            evaluations = executor.map(lambda article: self.evaluate_news_article(article, target_search), articles)
+            return {article['id']: evaluation for article, evaluation in zip(articles, evaluations)}
+
+    def generate_script_fragments(self, articles: List[tuple]) -> Iterator[ScriptFragment]:
+        """
+        Generar en paralelo los guiones de varias noticias (título, contenido).
+        Los guiones se entregan en el mismo orden a medida que están listos.
+        """
+        with ThreadPoolExecutor(max_workers=max(1, self.llm.max_parallel)) as executor:
+            yield from executor.map(lambda article: self.generate_script_fragment(*article), articles)
+
+    def _evaluate_batch(self, batch: List[dict], target_search: str) -> Dict[int, NewsEvaluation]:
+        """Evaluar un lote; si la respuesta no es válida o incompleta se divide en dos"""
+        if len(batch) == 1:
+            return {batch[0]['id']: self.evaluate_news_article(batch[0], target_search)}
+
+        entries = "\n\n".join(self._batch_entry(number, article) for number, article in enumerate(batch, 1))
+        prompt = f"""Eres un analista de noticias. Evalúa la relevancia de cada uno de los siguientes {len(batch)} artículos en relación con la búsqueda objetivo "{target_search}" y su importancia internacional.
+        {entries}
+        Para cada artículo, indicando su número en 'id', decide si debe 'mantener' o 'eliminar'. Si es relevante, asigna una calificación de 1 a 10."""
+
+        # Pedir solo el contexto necesario (redondeado a 1024) para no inflar la caché KV
+        needed = len(prompt) / CHARS_PER_TOKEN + BATCH_OUTPUT_TOKENS_PER_ARTICLE * len(batch) + BATCH_PROMPT_TOKENS
+        num_ctx = min(self.context_window, (int(needed) // 1024 + 1) * 1024)
+
+        results = {}
+        try:
+            response = self.llm.chat(
+                use_cache=True,
+                priority=PRIORITY_EVALUATION,
+                model=self.model_name,
+                messages=[{"role": "user", "content": prompt}],
+                format=BatchNewsEvaluation.model_json_schema(),
+                response_model=BatchNewsEvaluation,
+                options={"num_ctx": num_ctx}
+            )
+            parsed = BatchNewsEvaluation.model_validate_json(response['message']['content'])
+            for item in parsed.evaluaciones:
+                if 1 <= item.id <= len(batch):
+                    results.setdefault(batch[item.id - 1]['id'],
+                                       NewsEvaluation(accion=item.accion, calificacion=item.calificacion))
+        except (ValidationError, json.JSONDecodeError, KeyError) as e:
+            print(f"Error en la evaluación por lote: {e}. Dividiendo el lote de {len(batch)}.")
+
+        missing = [article for article in batch if article['id'] not in results]
+        if missing:
+            if len(missing) == len(batch):
+                middle = len(batch) // 2
+                results.update(self._evaluate_batch(batch[:middle], target_search))
+                results.update(self._evaluate_batch(batch[middle:], target_search))
+            else:
+                results.update(self._evaluate_batch(missing, target_search))
+        return results
+
     def generate_script_fragment(self, title: str, content: str) -> ScriptFragment:
         prompt = f"""Genera un fragmento de guion para un video de noticias a partir de este artículo:
         Título: "{title}"
         Contenido: "{content}"
         El guion debe ser corto, directo, en minúsculas y en un solo párrafo. Reemplaza siglas como NASA por N A S A."""
         try:
-            response = ollama.chat(
+            response = self.llm.chat(
+                use_cache=True,
+                priority=PRIORITY_SCRIPT,
                 model=self.model_name,
                 messages=[{'role': 'user', 'content': prompt}],
-                format=ScriptFragment.model_json_schema()
+                format=ScriptFragment.model_json_schema(),
+                response_model=ScriptFragment
             )
             return ScriptFragment.model_validate_json(response['message']['content'])
         except (ValidationError, json.JSONDecodeError, KeyError) as e:
@@ -62,7 +193,8 @@ class AIService:
         resumenes = "\n---\n".join([f"Título: {t}\nFuente: {f}\nContenido: {c[:300]}..." for t, f, c in articles])
         prompt = f"Genera un resumen conciso de los puntos más importantes de estas noticias:\n{resumenes}"
         try:
-            response = ollama.chat(model=self.model_name, messages=[{"role": "user", "content": prompt}])
+            response = self.llm.chat(use_cache=True, priority=PRIORITY_BACKGROUND, model=self.model_name,
+                                     messages=[{"role": "user", "content": prompt}])
             return response['message']['content']
         except Exception as e:
             return f"❌ Error al generar resumen: {e}"
\ No newline at end of file
@@ -0,0 +1,102 @@
+# services/audio_assembly.py
+# ==============================================================================
+# == UNIÓN DE WAV EN STREAMING: SILENCIO O FUNDIDO ENTRE FRAGMENTOS
+# ==============================================================================
+
+import wave
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Frames que se copian por bloque (unos segundos de audio a 24 kHz)
+BLOCK_FRAMES = 1 << 16
+
+# Tipo de muestra de NumPy según el ancho en bytes del WAV (8 bits es sin signo)
+_SAMPLE_DTYPES = {1: np.uint8, 2: np.dtype("<i2"), 4: np.dtype("<i4")}
+
+
+def concatenate_wav_files(input_files: Sequence[str], output_file: str,
+                          gap_seconds: float = 0.0, crossfade_seconds: float = 0.0) -> float:
+    """
+    Une varios WAV PCM con el mismo formato en output_file copiando los frames
+    por bloques: tiempo proporcional al audio total y memoria de un bloque
+    (más el fundido), sin cargar ningún fichero entero. Entre fragmentos se
+    puede insertar silencio (gap_seconds) o un fundido cruzado
+    (crossfade_seconds), no ambos. Devuelve la duración resultante en segundos.
+    """
+    if not input_files:
+        raise ValueError("No hay ficheros de audio que unir")
+    if gap_seconds > 0 and crossfade_seconds > 0:
+        raise ValueError("Se puede usar silencio o fundido entre fragmentos, no ambos")
+
+    with wave.open(input_files[0], "rb") as first:
+        params = first.getparams()
+    frame_size = params.nchannels * params.sampwidth
+    crossfade_frames = int(crossfade_seconds * params.framerate)
+    if crossfade_frames and params.sampwidth not in _SAMPLE_DTYPES:
+        raise ValueError(f"El fundido no admite muestras de {params.sampwidth} bytes")
+    silence = b"\x80" * params.nchannels if params.sampwidth == 1 else b"\x00" * frame_size
+    gap = silence * int(gap_seconds * params.framerate)
+
+    with wave.open(output_file, "wb") as output:
+        output.setnchannels(params.nchannels)
+        output.setsampwidth(params.sampwidth)
+        output.setframerate(params.framerate)
+
+        tail: Optional[bytes] = None  # Últimos frames del fichero anterior, a la espera del fundido
+        for index, path in enumerate(input_files):
+            with wave.open(path, "rb") as reader:
+                _check_format(path, reader.getparams(), params)
+                remaining = reader.getnframes()
+
+                if index and gap:
+                    output.writeframes(gap)
+                if tail is not None:
+                    head = reader.readframes(min(crossfade_frames, remaining))
+                    remaining -= len(head) // frame_size
+                    output.writeframes(_crossfade(tail, head, params.sampwidth, params.nchannels))
+                    tail = None
+
+                # Con fundido, el final de cada fichero se reserva para mezclarlo con el siguiente
+                held = min(crossfade_frames, remaining) if index < len(input_files) - 1 else 0
+                _copy_frames(reader, output, remaining - held)
+                if held:
+                    tail = reader.readframes(held)
+
+        return output.getnframes() / params.framerate
+
+
+def _copy_frames(reader, output, frames: int):
+    while frames > 0:
+        block = reader.readframes(min(BLOCK_FRAMES, frames))
+        if not block:
+            break
+        output.writeframes(block)
+        frames -= len(block) // (reader.getsampwidth() * reader.getnchannels())
+
+
+def _check_format(path: str, found, expected):
+    if (found.nchannels, found.sampwidth, found.framerate) != (expected.nchannels, expected.sampwidth,
+                                                               expected.framerate):
+        raise ValueError(f"'{path}' tiene un formato distinto ({found.nchannels} canales, "
+                         f"{found.sampwidth * 8} bits, {found.framerate} Hz) al del primer fichero")
+
+
+def _crossfade(tail: bytes, head: bytes, sampwidth: int, nchannels: int) -> bytes:
+    """Mezclar el final de un fragmento con el principio del siguiente con rampas lineales"""
+    dtype = _SAMPLE_DTYPES[sampwidth]
+    offset = 128.0 if sampwidth == 1 else 0.0
+    a = np.frombuffer(tail, dtype=dtype).reshape(-1, nchannels).astype(np.float64) - offset
+    b = np.frombuffer(head, dtype=dtype).reshape(-1, nchannels).astype(np.float64) - offset
+    overlap = min(len(a), len(b))
+    if overlap == 0:
+        return tail + head
+
+    fade_in = np.linspace(0.0, 1.0, overlap, endpoint=False)[:, None]
+    mixed = a[len(a) - overlap:] * (1.0 - fade_in) + b[:overlap] * fade_in
+    info = np.iinfo(dtype)
+    mixed = np.clip(np.rint(mixed + offset), info.min, info.max).astype(dtype)
+    # Lo que no se solapa (si un fichero es más corto que el fundido) se conserva tal cual
+    frame_size = sampwidth * nchannels
+    return tail[:(len(a) - overlap) * frame_size] + mixed.tobytes() + head[overlap * frame_size:]
+
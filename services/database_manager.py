@@ -5,167 +5,627 @@
 
 import sqlite3
 import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Pragmas aplicados una vez al abrir la conexión persistente
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",   # 256 MB
+    "PRAGMA cache_size=-65536",     # 64 MB
+)
+
+# ==============================================================================
+# == MIGRACIONES DEL ESQUEMA
+# ==============================================================================
+# Cada migración es (versión, descripción, sentencias). La versión aplicada se
+# guarda en PRAGMA user_version; solo se ejecutan las posteriores a ella.
+# Las sentencias de la versión 1 usan IF NOT EXISTS para adoptar bases de datos
+# creadas antes de que existiera el versionado.
+
+MIGRATIONS = [
+    (1, "esquema inicial", [
+        # Tabla de búsquedas
+        '''
+        CREATE TABLE IF NOT EXISTS searches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            query TEXT NOT NULL,
+            search_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            time_filter TEXT,
+            max_results INTEGER
+        )
+        ''',
+        # Tabla de resultados de noticias (crudo)
+        '''
+        CREATE TABLE IF NOT EXISTS news_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            search_id INTEGER,
+            engine TEXT NOT NULL,
+            title TEXT,
+            url TEXT UNIQUE,
+            snippet TEXT,
+            date TEXT,
+            source TEXT,
+            raw_data TEXT,
+            FOREIGN KEY (search_id) REFERENCES searches (id)
+        )
+        ''',
+        # Tabla de contenido extraído
+        '''
+        CREATE TABLE IF NOT EXISTS extracted_content (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            news_result_id INTEGER UNIQUE,
+            url TEXT,
+            title TEXT,
+            content TEXT,
+            author TEXT,
+            publish_date TEXT,
+            method_used TEXT,
+            word_count INTEGER,
+            success BOOLEAN,
+            error_message TEXT,
+            extraction_time REAL,
+            FOREIGN KEY (news_result_id) REFERENCES news_results(id)
+        )
+        ''',
+        # Tabla de noticias curadas y evaluadas
+        """
+        CREATE TABLE IF NOT EXISTS noticias (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            titulo TEXT,
+            fuente TEXT,
+            fecha TEXT,
+            url TEXT UNIQUE,
+            contenido TEXT,
+            calificacion INTEGER DEFAULT 0
+        )
+        """,
+        # Tabla para los guiones generados
+        """
+        CREATE TABLE IF NOT EXISTS scripts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            titulo TEXT UNIQUE,
+            guion TEXT
+        )
+        """,
+    ]),
+    (2, "índices secundarios", [
+        # Noticias pendientes de evaluar: índice parcial, solo contiene las filas con calificacion = 0
+        "CREATE INDEX IF NOT EXISTS idx_noticias_pendientes ON noticias(id) WHERE calificacion = 0",
+        # Ranking de noticias (get_top_rated_news)
+        "CREATE INDEX IF NOT EXISTS idx_noticias_calificacion ON noticias(calificacion)",
+        # Filtro de ingesta (success, word_count)
+        "CREATE INDEX IF NOT EXISTS idx_extracted_success_words ON extracted_content(success, word_count)",
+        "CREATE INDEX IF NOT EXISTS idx_news_results_search ON news_results(search_id)",
+        "CREATE INDEX IF NOT EXISTS idx_news_results_engine ON news_results(engine)",
+        "ANALYZE",
+    ]),
+    (3, "marcas de agua del modo incremental", [
+        """
+        CREATE TABLE IF NOT EXISTS watermarks (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ]),
+    (4, "ejecuciones y checkpoints del pipeline", [
+        """
+        CREATE TABLE IF NOT EXISTS pipeline_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            search_query TEXT,
+            target_search TEXT,
+            options TEXT,
+            status TEXT NOT NULL DEFAULT 'running',
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS pipeline_checkpoints (
+            run_id INTEGER NOT NULL,
+            stage TEXT NOT NULL,
+            status TEXT NOT NULL,
+            items_in INTEGER DEFAULT 0,
+            items_out INTEGER DEFAULT 0,
+            last_row_id INTEGER,
+            started_at REAL,
+            finished_at REAL,
+            duration REAL,
+            error_message TEXT,
+            PRIMARY KEY (run_id, stage),
+            FOREIGN KEY (run_id) REFERENCES pipeline_runs(id)
+        )
+        """,
+    ]),
+    (5, "métricas de rendimiento por ejecución", [
+        """
+        CREATE TABLE IF NOT EXISTS metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id INTEGER,
+            category TEXT NOT NULL,
+            name TEXT NOT NULL,
+            started_at REAL,
+            wall_time REAL,
+            cpu_time REAL,
+            peak_rss_mb REAL,
+            items_in INTEGER DEFAULT 0,
+            items_out INTEGER DEFAULT 0,
+            tokens_in INTEGER DEFAULT 0,
+            tokens_out INTEGER DEFAULT 0,
+            success BOOLEAN DEFAULT 1,
+            error_message TEXT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_metrics_run ON metrics(run_id, category, name)",
+    ]),
+    (6, "intentos de extracción por URL", [
+        # Las filas existentes cuentan como un intento
+        "ALTER TABLE extracted_content ADD COLUMN attempts INTEGER NOT NULL DEFAULT 1",
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# ==============================================================================
+# == CONSULTAS
+# ==============================================================================
+
+SQL_INSERT_SEARCH = 'INSERT INTO searches (query, time_filter, max_results) VALUES (?, ?, ?)'
+
+SQL_INSERT_NEWS_RESULT = '''
+    INSERT OR IGNORE INTO news_results (search_id, engine, title, url, snippet, date, source, raw_data)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SQL_SELECT_ARTICLES_FOR_INGESTION = """
+    SELECT nr.title, nr.source, nr.date, ec.url, ec.content
+    FROM extracted_content ec
+    JOIN news_results nr ON ec.news_result_id = nr.id
+    WHERE ec.success = 1 AND ec.word_count > ?
+"""
+
+SQL_COUNT_INGESTION_CANDIDATES = """
+    SELECT COUNT(*)
+    FROM extracted_content ec
+    JOIN news_results nr ON ec.news_result_id = nr.id
+    WHERE ec.success = 1 AND ec.word_count > ?
+"""
+
+SQL_INGEST_EXTRACTED = """
+    INSERT OR IGNORE INTO noticias (titulo, fuente, fecha, url, contenido, calificacion)
+    SELECT nr.title, nr.source, nr.date, ec.url, ec.content, 0
+    FROM extracted_content ec
+    JOIN news_results nr ON ec.news_result_id = nr.id
+    WHERE ec.success = 1 AND ec.word_count > ?
+      AND NOT EXISTS (SELECT 1 FROM noticias n WHERE n.url = ec.url)
+"""
+
+# Ingesta de un único artículo (pipeline en streaming)
+SQL_INGEST_EXTRACTED_ONE = """
+    INSERT OR IGNORE INTO noticias (titulo, fuente, fecha, url, contenido, calificacion)
+    SELECT nr.title, nr.source, nr.date, ec.url, ec.content, 0
+    FROM extracted_content ec
+    JOIN news_results nr ON ec.news_result_id = nr.id
+    WHERE ec.news_result_id = ? AND ec.success = 1 AND ec.word_count > ?
+"""
+
+SQL_SELECT_INGESTED_ARTICLE = """
+    SELECT n.id, n.titulo, n.contenido FROM noticias n
+    JOIN extracted_content ec ON n.url = ec.url
+    WHERE ec.news_result_id = ? AND n.calificacion = 0
+"""
+
+# Pendiente = sin extracción o con una extracción fallida que no ha agotado sus intentos
+# (los duplicados ya están cubiertos por su original)
+SQL_SELECT_PENDING_RESULT_BY_URL = """
+    SELECT nr.id, nr.url FROM news_results nr
+    LEFT JOIN extracted_content ec ON nr.id = ec.news_result_id
+    WHERE nr.url = ?
+      AND (ec.id IS NULL OR (ec.success = 0 AND ec.method_used != 'duplicate' AND ec.attempts < ?))
+"""
+
+SQL_INSERT_CURATED_NEWS = """
+    INSERT OR IGNORE INTO noticias (titulo, fuente, fecha, url, contenido, calificacion)
+    VALUES (?, ?, ?, ?, ?, 0)
+"""
+
+SQL_SELECT_UNEVALUATED = "SELECT id, titulo, contenido FROM noticias WHERE calificacion = 0"
+
+SQL_UPDATE_EVALUATION = "UPDATE noticias SET calificacion=? WHERE id=?"
+
+# Las noticias descartadas se conservan con esta calificación: si se borrasen, la
+# ingesta incremental las volvería a insertar y se evaluarían en cada ejecución
+REJECTED_RATING = -1
+
+SQL_REJECT_NEWS = f"UPDATE noticias SET calificacion={REJECTED_RATING} WHERE id=?"
+
+SQL_SELECT_TOP_RATED = (
+    "SELECT titulo, fuente, contenido FROM noticias WHERE calificacion >= ? ORDER BY calificacion DESC LIMIT ?"
+)
+
+# Noticias destacadas que todavía no tienen guion (modo incremental)
+SQL_SELECT_TOP_RATED_WITHOUT_SCRIPT = """
+    SELECT n.titulo, n.fuente, n.contenido FROM noticias n
+    WHERE n.calificacion >= ? AND NOT EXISTS (SELECT 1 FROM scripts s WHERE s.titulo = n.titulo)
+    ORDER BY n.calificacion DESC LIMIT ?
+"""
+
+SQL_SELECT_MAX_SCRIPT_ID = "SELECT COALESCE(MAX(id), 0) FROM scripts"
+
+SQL_SELECT_SCRIPT_IDS_AFTER = "SELECT id FROM scripts WHERE id > ? ORDER BY id"
+
+SQL_SELECT_WATERMARK = "SELECT value FROM watermarks WHERE name = ?"
+
+SQL_UPSERT_WATERMARK = """
+    INSERT INTO watermarks (name, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(name) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+"""
+
+# --- Ejecuciones y checkpoints ---
+
+SQL_INSERT_RUN = "INSERT INTO pipeline_runs (search_query, target_search, options) VALUES (?, ?, ?)"
+
+SQL_FINISH_RUN = "UPDATE pipeline_runs SET status = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?"
+
+SQL_SELECT_RUN = "SELECT id, search_query, target_search, options, status FROM pipeline_runs WHERE id = ?"
+
+SQL_SELECT_LAST_UNFINISHED_RUN = (
+    "SELECT id, search_query, target_search, options, status FROM pipeline_runs "
+    "WHERE status != 'completed' ORDER BY id DESC LIMIT 1"
+)
+
+SQL_START_STAGE = """
+    INSERT INTO pipeline_checkpoints (run_id, stage, status, started_at) VALUES (?, ?, 'running', ?)
+    ON CONFLICT(run_id, stage) DO UPDATE SET status = 'running', started_at = excluded.started_at, error_message = NULL
+"""
+
+SQL_UPDATE_STAGE_PROGRESS = """
+    UPDATE pipeline_checkpoints SET items_in = ?, items_out = ?, last_row_id = ?
+    WHERE run_id = ? AND stage = ?
+"""
+
+SQL_FINISH_STAGE = """
+    UPDATE pipeline_checkpoints
+    SET status = ?, items_in = COALESCE(?, items_in), items_out = COALESCE(?, items_out),
+        finished_at = ?, duration = ? - started_at, error_message = ?
+    WHERE run_id = ? AND stage = ?
+"""
+
+SQL_SELECT_CHECKPOINTS = """
+    SELECT stage, status, items_in, items_out, last_row_id, duration
+    FROM pipeline_checkpoints WHERE run_id = ?
+"""
+
+SQL_INSERT_METRIC = """
+    INSERT INTO metrics (run_id, category, name, started_at, wall_time, cpu_time, peak_rss_mb,
+                         items_in, items_out, tokens_in, tokens_out, success, error_message)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_SELECT_METRICS_SUMMARY = """
+    SELECT category, name, COUNT(*), SUM(wall_time), SUM(cpu_time), MAX(peak_rss_mb),
+           SUM(items_in), SUM(items_out), SUM(tokens_in), SUM(tokens_out), SUM(NOT success)
+    FROM metrics WHERE run_id IS ?
+    GROUP BY category, name
+"""
+
+# Usamos INSERT OR REPLACE para actualizar el guion si ya existe uno para ese título.
+SQL_UPSERT_SCRIPT = "INSERT OR REPLACE INTO scripts (titulo, guion) VALUES (?, ?)"
+
+# Consultas revisadas por explain(), con parámetros de ejemplo
+BUILTIN_QUERIES = {
+    'save_search': (SQL_INSERT_SEARCH, ('consulta', None, 25)),
+    'save_news_results': (SQL_INSERT_NEWS_RESULT, (1, 'google', 't', 'u', 's', 'd', 'f', '{}')),
+    'get_extracted_articles_for_ingestion': (SQL_SELECT_ARTICLES_FOR_INGESTION, (50,)),
+    'ingest_extracted_news (recuento)': (SQL_COUNT_INGESTION_CANDIDATES, (50,)),
+    'ingest_extracted_news': (SQL_INGEST_EXTRACTED, (50,)),
+    'ingest_extracted_article': (SQL_INGEST_EXTRACTED_ONE, (1, 50)),
+    'get_pending_news_results': (SQL_SELECT_PENDING_RESULT_BY_URL, ('u', 3)),
+    'save_curated_news': (SQL_INSERT_CURATED_NEWS, ('t', 'f', 'd', 'u', 'c')),
+    'get_unevaluated_news': (SQL_SELECT_UNEVALUATED, ()),
+    'update_news_evaluation': (SQL_UPDATE_EVALUATION, (5, 1)),
+    'reject_news': (SQL_REJECT_NEWS, (1,)),
+    'get_top_rated_news': (SQL_SELECT_TOP_RATED, (8, 5)),
+    'get_top_rated_news (solo nuevas)': (SQL_SELECT_TOP_RATED_WITHOUT_SCRIPT, (8, 5)),
+    'save_script': (SQL_UPSERT_SCRIPT, ('t', 'g')),
+    'get_watermark': (SQL_SELECT_WATERMARK, ('scripts_audio',)),
+    'get_metrics_summary': (SQL_SELECT_METRICS_SUMMARY, (1,)),
+}
+
 
 class DatabaseManager:
-    """Gestiona todas las operaciones de la base de datos única del pipeline."""
+    """
+    Gestiona todas las operaciones de la base de datos única del pipeline.
+
+    Mantiene una sola conexión abierta (en modo WAL) compartida entre hilos y
+    protegida por un lock. Cada método es una unidad de trabajo; varias
+    llamadas dentro de `with db.transaction():` se confirman juntas con un
+    único commit.
+    """
 
     # CAMBIO: El constructor ahora solo necesita una ruta de base de datos.
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, busy_timeout: float = 30.0):
         self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self._conn = None
+        self._lock = threading.RLock()
+        self._tx_depth = 0
         print(f"DatabaseManager inicializado para operar en '{self.db_path}'")
 
     def _get_connection(self):
-        """Devuelve una conexión a la base de datos única."""
-        return sqlite3.connect(self.db_path)
+        """Devuelve la conexión persistente a la base de datos única (la abre si hace falta)."""
+        with self._lock:
+            if self._conn is None:
+                if os.path.dirname(self.db_path):
+                    os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+                # isolation_level=None: las transacciones se abren explícitamente en transaction()
+                self._conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout,
+                                             check_same_thread=False, isolation_level=None)
+                for pragma in CONNECTION_PRAGMAS:
+                    self._conn.execute(pragma)
+            return self._conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unidad de trabajo: todo lo escrito dentro del bloque se confirma con un
+        solo commit al salir, o se deshace si hay una excepción. Se puede anidar.
+        """
+        with self._lock:
+            conn = self._get_connection()
+            if self._tx_depth == 0:
+                conn.execute("BEGIN")
+            self._tx_depth += 1
+            try:
+                yield conn
+            except BaseException:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    conn.execute("ROLLBACK")
+                raise
+            else:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    conn.execute("COMMIT")
+
+    def close(self):
+        """Cierra la conexión persistente (se reabrirá si se vuelve a usar)."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     # CAMBIO: Este método ahora crea TODAS las tablas en la misma base de datos.
     def initialize_databases(self):
-        """Crea todas las tablas necesarias en la base de datos si no existen."""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
+        """Aplica las migraciones pendientes para dejar el esquema en la última versión."""
+        with self.transaction() as conn:
+            current = conn.execute("PRAGMA user_version").fetchone()[0]
+            for version, description, statements in MIGRATIONS:
+                if version <= current:
+                    continue
+                print(f"🛠️ Aplicando migración {version}: {description}")
+                for statement in statements:
+                    try:
+                        conn.execute(statement)
+                    except sqlite3.OperationalError as e:
+                        # Columna ya creada por el esquema local de un módulo (p. ej. NewsContentExtractor)
+                        if "duplicate column name" not in str(e):
+                            raise
+                # PRAGMA no admite parámetros; version es un entero de MIGRATIONS
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+        print(f"✅ Esquema de base de datos en '{self.db_path}' asegurado (versión {SCHEMA_VERSION}).")
 
-            # Tabla de búsquedas
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS searches (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    query TEXT NOT NULL,
-                    search_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    time_filter TEXT,
-                    max_results INTEGER
-                )
-            ''')
-            # Tabla de resultados de noticias (crudo)
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS news_results (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    search_id INTEGER,
-                    engine TEXT NOT NULL,
-                    title TEXT,
-                    url TEXT UNIQUE,
-                    snippet TEXT,
-                    date TEXT,
-                    source TEXT,
-                    raw_data TEXT,
-                    FOREIGN KEY (search_id) REFERENCES searches (id)
-                )
-            ''')
-            # Tabla de contenido extraído
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS extracted_content (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    news_result_id INTEGER UNIQUE,
-                    url TEXT,
-                    title TEXT,
-                    content TEXT,
-                    author TEXT,
-                    publish_date TEXT,
-                    method_used TEXT,
-                    word_count INTEGER,
-                    success BOOLEAN,
-                    error_message TEXT,
-                    extraction_time REAL,
-                    FOREIGN KEY (news_result_id) REFERENCES news_results(id)
-                )
-            ''')
-            # Tabla de noticias curadas y evaluadas
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS noticias (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    titulo TEXT,
-                    fuente TEXT,
-                    fecha TEXT,
-                    url TEXT UNIQUE,
-                    contenido TEXT,
-                    calificacion INTEGER DEFAULT 0
-                )
-            """)
-            # Tabla para los guiones generados
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS scripts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    titulo TEXT UNIQUE,
-                    guion TEXT
-                )
-            """)
-            conn.commit()
-        print(f"✅ Esquema de base de datos en '{self.db_path}' asegurado.")
+    def schema_version(self) -> int:
+        with self.transaction() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def explain(self):
+        """Imprime el plan de ejecución (EXPLAIN QUERY PLAN) de cada consulta del gestor."""
+        print(f"\n🔎 Planes de consulta para '{self.db_path}' (esquema v{self.schema_version()}):")
+        with self.transaction() as conn:
+            for name, (sql, params) in BUILTIN_QUERIES.items():
+                print(f"\n▶ {name}")
+                plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+                # Columnas: id, parent, notused, detail
+                for row in plan:
+                    print(f"   {row[3]}")
+                if not plan:
+                    print("   (inserción directa, sin búsqueda)")
 
     # CAMBIO: Limpia todas las tablas de la base de datos única.
     def clear_all_databases(self):
         """Limpia todas las tablas en la base de datos."""
-        with self._get_connection() as conn:
+        with self.transaction() as conn:
             cursor = conn.cursor()
-            tables = ["searches", "news_results", "extracted_content", "noticias", "scripts"]
+            # Las marcas de agua y las ejecuciones se reinician con los datos a los que apuntan
+            tables = ["searches", "news_results", "extracted_content", "noticias", "scripts", "watermarks",
+                      "pipeline_checkpoints", "pipeline_runs", "metrics"]
             for table in tables:
                 cursor.execute(f"DELETE FROM {table}")
                 cursor.execute(f"DELETE FROM sqlite_sequence WHERE name='{table}'") # Resetea autoincrement
-            conn.commit()
         print(f"🧹 Todas las tablas en '{self.db_path}' han sido limpiadas.")
 
     # --- Métodos de escritura y lectura (adaptados a la conexión única) ---
 
     def save_search(self, query, time_filter=None, max_results=None) -> int:
-        with self._get_connection() as conn:
+        with self.transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute('INSERT INTO searches (query, time_filter, max_results) VALUES (?, ?, ?)',
-                           (query, time_filter, max_results))
-            conn.commit()
+            cursor.execute(SQL_INSERT_SEARCH, (query, time_filter, max_results))
             return cursor.lastrowid
 
-    def save_news_results(self, search_id, engine, results):
-        with self._get_connection() as conn:
+    def save_news_results(self, search_id, engine, results) -> int:
+        """Guarda los resultados y devuelve cuántos eran URLs nuevas."""
+        with self.transaction() as conn:
             news_data = [
                 (search_id, engine, r.title, r.url, r.snippet, r.date, r.source, json.dumps(r.to_dict()))
                 for r in results
             ]
-            conn.executemany('''
-                INSERT OR IGNORE INTO news_results (search_id, engine, title, url, snippet, date, source, raw_data)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', news_data)
-            conn.commit()
-
-    def get_extracted_articles_for_ingestion(self):
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT nr.title, nr.source, nr.date, ec.url, ec.content
-                FROM extracted_content ec
-                JOIN news_results nr ON ec.news_result_id = nr.id
-                WHERE ec.success = 1 AND ec.word_count > 50
-            """)
-            return cursor.fetchall()
+            return conn.executemany(SQL_INSERT_NEWS_RESULT, news_data).rowcount
+
+    def get_extracted_articles_for_ingestion(self, min_words: int = 50):
+        with self.transaction() as conn:
+            return conn.execute(SQL_SELECT_ARTICLES_FOR_INGESTION, (min_words,)).fetchall()
+
+    def ingest_extracted_news(self, min_words: int = 50) -> dict:
+        """
+        Copia a 'noticias' los artículos extraídos con éxito usando una sola
+        sentencia INSERT ... SELECT, sin pasar el contenido por Python.
+        Devuelve {'candidates', 'inserted', 'skipped'}.
+        """
+        with self.transaction() as conn:
+            candidates = conn.execute(SQL_COUNT_INGESTION_CANDIDATES, (min_words,)).fetchone()[0]
+            inserted = conn.execute(SQL_INGEST_EXTRACTED, (min_words,)).rowcount
+        return {'candidates': candidates, 'inserted': inserted, 'skipped': candidates - inserted}
+
+    def ingest_extracted_article(self, news_result_id, min_words: int = 50):
+        """
+        Pasa un artículo extraído a 'noticias' y devuelve (id, titulo, contenido)
+        si quedó pendiente de evaluar, o None si no cumple el filtro o ya existía.
+        """
+        with self.transaction() as conn:
+            if conn.execute(SQL_INGEST_EXTRACTED_ONE, (news_result_id, min_words)).rowcount == 0:
+                return None
+            return conn.execute(SQL_SELECT_INGESTED_ARTICLE, (news_result_id,)).fetchone()
+
+    def get_pending_news_results(self, urls, max_attempts: int = 3):
+        """(id, url) de los resultados con esas URLs sin extraer o con menos de max_attempts intentos fallidos."""
+        with self.transaction() as conn:
+            pending = []
+            for url in urls:
+                pending.extend(conn.execute(SQL_SELECT_PENDING_RESULT_BY_URL, (url, max_attempts)).fetchall())
+            return pending
 
     def save_curated_news(self, title, source, date, url, content):
-        with self._get_connection() as conn:
-            conn.execute("""
-                INSERT OR IGNORE INTO noticias (titulo, fuente, fecha, url, contenido, calificacion)
-                VALUES (?, ?, ?, ?, ?, 0)
-            """, (title, source, date, url, content))
-            conn.commit()
+        with self.transaction() as conn:
+            conn.execute(SQL_INSERT_CURATED_NEWS, (title, source, date, url, content))
+
+    def save_curated_news_many(self, articles):
+        """Inserta varias noticias (titulo, fuente, fecha, url, contenido) en una sola transacción."""
+        with self.transaction() as conn:
+            conn.executemany(SQL_INSERT_CURATED_NEWS, articles)
 
     def get_unevaluated_news(self):
-        with self._get_connection() as conn:
-            return conn.execute("SELECT id, titulo, contenido FROM noticias WHERE calificacion = 0").fetchall()
+        with self.transaction() as conn:
+            return conn.execute(SQL_SELECT_UNEVALUATED).fetchall()
 
     def update_news_evaluation(self, news_id, rating):
-        with self._get_connection() as conn:
-            conn.execute("UPDATE noticias SET calificacion=? WHERE id=?", (rating, news_id))
-            conn.commit()
-
-    def delete_news(self, news_id):
-        with self._get_connection() as conn:
-            conn.execute("DELETE FROM noticias WHERE id=?", (news_id,))
-            conn.commit()
-
-    def get_top_rated_news(self, min_rating, limit):
-        with self._get_connection() as conn:
-            return conn.execute(
-                "SELECT titulo, fuente, contenido FROM noticias WHERE calificacion >= ? ORDER BY calificacion DESC LIMIT ?",
-                (min_rating, limit)
-            ).fetchall()
+        with self.transaction() as conn:
+            conn.execute(SQL_UPDATE_EVALUATION, (rating, news_id))
+
+    def reject_news(self, news_id):
+        """Marca una noticia como descartada por la evaluación (no se vuelve a ingerir ni evaluar)."""
+        with self.transaction() as conn:
+            conn.execute(SQL_REJECT_NEWS, (news_id,))
+
+    def update_news_evaluations(self, ratings):
+        """Guarda varias calificaciones (id, calificacion) en una sola transacción."""
+        with self.transaction() as conn:
+            conn.executemany(SQL_UPDATE_EVALUATION, [(rating, news_id) for news_id, rating in ratings])
+
+    def reject_news_many(self, news_ids):
+        with self.transaction() as conn:
+            conn.executemany(SQL_REJECT_NEWS, [(news_id,) for news_id in news_ids])
+
+    def get_top_rated_news(self, min_rating, limit, only_without_script=False):
+        """Noticias mejor calificadas; only_without_script omite las que ya tienen guion."""
+        sql = SQL_SELECT_TOP_RATED_WITHOUT_SCRIPT if only_without_script else SQL_SELECT_TOP_RATED
+        with self.transaction() as conn:
+            return conn.execute(sql, (min_rating, limit)).fetchall()
 
     def save_script(self, title, script):
-        with self._get_connection() as conn:
-            # Usamos INSERT OR REPLACE para actualizar el guion si ya existe uno para ese título.
-            conn.execute("INSERT OR REPLACE INTO scripts (titulo, guion) VALUES (?, ?)", (title, script))
-            conn.commit()
\ No newline at end of file
+        with self.transaction() as conn:
+            conn.execute(SQL_UPSERT_SCRIPT, (title, script))
+
+    def get_max_script_id(self) -> int:
+        with self.transaction() as conn:
+            return conn.execute(SQL_SELECT_MAX_SCRIPT_ID).fetchone()[0]
+
+    def get_script_ids_after(self, min_script_id: int) -> list:
+        with self.transaction() as conn:
+            return [row[0] for row in conn.execute(SQL_SELECT_SCRIPT_IDS_AFTER, (min_script_id,))]
+
+    # --- Ejecuciones y checkpoints del pipeline ---
+
+    def create_pipeline_run(self, search_query, target_search, options=None) -> int:
+        with self.transaction() as conn:
+            return conn.execute(SQL_INSERT_RUN, (search_query, target_search, json.dumps(options or {}))).lastrowid
+
+    def finish_pipeline_run(self, run_id, status="completed"):
+        with self.transaction() as conn:
+            conn.execute(SQL_FINISH_RUN, (status, run_id))
+
+    def get_pipeline_run(self, run_id=None):
+        """Datos de la ejecución indicada o, sin run_id, de la última sin completar."""
+        with self.transaction() as conn:
+            if run_id is None:
+                row = conn.execute(SQL_SELECT_LAST_UNFINISHED_RUN).fetchone()
+            else:
+                row = conn.execute(SQL_SELECT_RUN, (run_id,)).fetchone()
+        if row is None:
+            return None
+        return {'id': row[0], 'search_query': row[1], 'target_search': row[2],
+                'options': json.loads(row[3] or '{}'), 'status': row[4]}
+
+    def start_stage(self, run_id, stage):
+        with self.transaction() as conn:
+            conn.execute(SQL_START_STAGE, (run_id, stage, time.time()))
+
+    def update_stage_progress(self, run_id, stage, items_in, items_out, last_row_id=None):
+        """Registra el avance dentro de una fase (se confirma junto con la transacción en curso)."""
+        with self.transaction() as conn:
+            conn.execute(SQL_UPDATE_STAGE_PROGRESS, (items_in, items_out, last_row_id, run_id, stage))
+
+    def finish_stage(self, run_id, stage, status="completed", items_in=None, items_out=None, error_message=None):
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(SQL_FINISH_STAGE, (status, items_in, items_out, now, now, error_message, run_id, stage))
+
+    def get_stage_checkpoints(self, run_id) -> dict:
+        """{fase: {'status', 'items_in', 'items_out', 'last_row_id', 'duration'}} de una ejecución."""
+        with self.transaction() as conn:
+            rows = conn.execute(SQL_SELECT_CHECKPOINTS, (run_id,)).fetchall()
+        return {stage: {'status': status, 'items_in': items_in, 'items_out': items_out,
+                        'last_row_id': last_row_id, 'duration': duration}
+                for stage, status, items_in, items_out, last_row_id, duration in rows}
+
+    # --- Métricas de rendimiento ---
+
+    def save_metrics(self, run_id, samples):
+        """Guarda las muestras de MetricsRecorder asociadas a una ejecución."""
+        with self.transaction() as conn:
+            conn.executemany(SQL_INSERT_METRIC, [
+                (run_id, s.category, s.name, s.started_at, s.wall_time, s.cpu_time, s.peak_rss_mb,
+                 s.items_in, s.items_out, s.tokens_in, s.tokens_out, s.success, s.error)
+                for s in samples
+            ])
+
+    def get_metrics_summary(self, run_id) -> list:
+        """Totales por (categoría, operación) de una ejecución, para print_metrics_report()."""
+        with self.transaction() as conn:
+            rows = conn.execute(SQL_SELECT_METRICS_SUMMARY, (run_id,)).fetchall()
+        keys = ('category', 'name', 'calls', 'wall_time', 'cpu_time', 'peak_rss_mb',
+                'items_in', 'items_out', 'tokens_in', 'tokens_out', 'errors')
+        return [dict(zip(keys, row)) for row in rows]
+
+    # --- Marcas de agua del modo incremental ---
+
+    def get_watermark(self, name, default=0) -> int:
+        """Último valor procesado para la etapa 'name' (p. ej. el último id de guion con audio)."""
+        with self.transaction() as conn:
+            row = conn.execute(SQL_SELECT_WATERMARK, (name,)).fetchone()
+            return row[0] if row else default
+
+    def set_watermark(self, name, value):
+        with self.transaction() as conn:
+            conn.execute(SQL_UPSERT_WATERMARK, (name, value))
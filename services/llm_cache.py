@@ -0,0 +1,118 @@
+# services/llm_cache.py
+# ==============================================================================
+# == CACHÉ PERSISTENTE DE RESPUESTAS DEL MODELO DE LENGUAJE
+# ==============================================================================
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class LLMResponseCache:
+    """
+    Caché en SQLite de respuestas de chat direccionada por contenido.
+
+    La clave es el hash de la petición completa (modelo, mensajes, esquema de
+    salida y opciones), de modo que cualquier cambio en el prompt o en el
+    esquema produce una entrada nueva.
+
+    - ttl: segundos que una respuesta se considera válida.
+    - max_entries: al superarse se eliminan las entradas usadas hace más tiempo.
+    """
+
+    EVICT_EVERY = 100  # Escrituras entre dos limpiezas automáticas
+
+    def __init__(self, db_path: str = "data/llm_cache.db", ttl: float = 30 * 24 * 3600, max_entries: int = 20000):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = self.misses = 0
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                request_hash TEXT PRIMARY KEY,
+                model TEXT,
+                content TEXT,
+                created_at REAL,
+                last_access REAL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)')
+        self._conn.commit()
+
+    @staticmethod
+    def request_key(model: str, messages: list, format=None, options: Optional[dict] = None) -> str:
+        """Hash estable de los parámetros que determinan la respuesta"""
+        payload = json.dumps({'model': model, 'messages': messages, 'format': format, 'options': options or {}},
+                             sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Contenido de la respuesta guardada o None si no existe o expiró"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT content, created_at FROM responses WHERE request_hash = ?',
+                                     (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute('DELETE FROM responses WHERE request_hash = ?', (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute('UPDATE responses SET last_access = ? WHERE request_hash = ?', (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, content: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute('''
+                INSERT OR REPLACE INTO responses (request_hash, model, content, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (key, model, content, now, now))
+            self._conn.commit()
+            self._writes += 1
+            if self._writes % self.EVICT_EVERY == 0:
+                self._evict_locked()
+
+    def invalidate(self, key: str):
+        """Eliminar una respuesta guardada (p. ej. si ya no valida contra su esquema)"""
+        with self._lock:
+            self._conn.execute('DELETE FROM responses WHERE request_hash = ?', (key,))
+            self._conn.commit()
+
+    def evict(self) -> Dict[str, int]:
+        """Eliminar entradas expiradas y las más antiguas por encima de max_entries"""
+        with self._lock:
+            return self._evict_locked()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        return {'entries': entries, 'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _evict_locked(self) -> Dict[str, int]:
+        expired = self._conn.execute('DELETE FROM responses WHERE created_at < ?',
+                                     (time.time() - self.ttl,)).rowcount
+        evicted = self._conn.execute('''
+            DELETE FROM responses WHERE request_hash IN (
+                SELECT request_hash FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+        ''', (self.max_entries,)).rowcount
+        self._conn.commit()
+        return {'expired': expired, 'evicted': evicted}
@@ -0,0 +1,225 @@
+# services/llm_client.py
+# ==============================================================================
+# == CLIENTE COMPARTIDO DE OLLAMA CON COLA DE PRIORIDADES
+# ==============================================================================
+
+import itertools
+import json
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Dict, Optional
+
+from services.llm_cache import LLMResponseCache
+from services.metrics import get_metrics_recorder
+
+# Prioridades de la cola: un número menor se atiende antes
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SCRIPT = 10
+PRIORITY_EVALUATION = 20
+PRIORITY_BACKGROUND = 30
+
+if TYPE_CHECKING:
+    import ollama
+
+# Códigos HTTP de Ollama que merece la pena reintentar
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class LLMClient:
+    """
+    Punto único de acceso a Ollama para todo el proyecto.
+
+    - max_parallel: peticiones simultáneas al servidor (ajustar a OLLAMA_NUM_PARALLEL).
+    - timeout: segundos por petición; cada llamada puede indicar el suyo.
+    - max_retries / backoff: reintentos con espera exponencial ante errores
+      de red, timeouts o respuestas 5xx/429.
+    - cache: LLMResponseCache opcional para las llamadas con use_cache=True.
+
+    Las peticiones esperan en una cola de prioridades; cuando hay más trabajo
+    que huecos se atienden primero las de menor prioridad numérica (por
+    ejemplo, guiones antes que evaluaciones).
+    """
+
+    def __init__(self, host: Optional[str] = None, max_parallel: int = 2, timeout: float = 180,
+                 max_retries: int = 2, backoff: float = 2.0, cache: Optional[LLMResponseCache] = None):
+        self.host = host
+        self.max_parallel = max_parallel
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.cache = cache
+
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._clients: Dict[float, "ollama.Client"] = {}
+        self._lock = threading.Lock()
+        self._workers = []
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def submit(self, priority: int = PRIORITY_BACKGROUND, timeout: Optional[float] = None, **chat_kwargs) -> Future:
+        """Encolar una llamada a chat y devolver un Future con la respuesta"""
+        self._ensure_workers()
+        future = Future()
+        # El contador mantiene el orden de llegada entre peticiones de igual prioridad
+        self._queue.put((priority, next(self._sequence), future, timeout or self.timeout, chat_kwargs))
+        return future
+
+    def chat(self, priority: int = PRIORITY_BACKGROUND, timeout: Optional[float] = None, use_cache: bool = False,
+             response_model=None, **chat_kwargs):
+        """
+        Llamada bloqueante a chat a través de la cola. Con use_cache=True una
+        petición idéntica a otra ya respondida se sirve desde la caché sin
+        llegar al modelo. response_model es el modelo de pydantic que espera
+        quien llama: solo se cachean (y se sirven de la caché) respuestas que
+        lo validan.
+        """
+        if not (use_cache and self.cache is not None):
+            return self.submit(priority=priority, timeout=timeout, **chat_kwargs).result()
+
+        key = LLMResponseCache.request_key(chat_kwargs.get('model'), chat_kwargs.get('messages'),
+                                           chat_kwargs.get('format'), chat_kwargs.get('options'))
+        content = self.cache.get(key)
+        if content is not None and not self._is_valid_content(content, chat_kwargs.get('format'), response_model):
+            # Entrada guardada antes de validar contra el esquema: se descarta y se vuelve a pedir
+            self.cache.invalidate(key)
+            content = None
+        if content is not None:
+            import ollama
+            get_metrics_recorder().record("llm", f"{chat_kwargs.get('model')} (caché)", items_in=1, items_out=1)
+            return ollama.ChatResponse(model=chat_kwargs.get('model'), done=True,
+                                       message=ollama.Message(role='assistant', content=content))
+
+        response = self.submit(priority=priority, timeout=timeout, **chat_kwargs).result()
+        if self._is_cacheable(response, chat_kwargs.get('format'), response_model):
+            self.cache.put(key, chat_kwargs.get('model'), response['message']['content'])
+        return response
+
+    def show(self, model: str):
+        return self._client_for(self.timeout).show(model)
+
+    def shutdown(self):
+        """Detener los hilos de trabajo cuando terminen lo que tienen en curso"""
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._queue.put((float('inf'), next(self._sequence), None, None, None))
+        for worker in workers:
+            worker.join()
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _ensure_workers(self):
+        with self._lock:
+            while len(self._workers) < self.max_parallel:
+                worker = threading.Thread(target=self._worker_loop, name=f"llm-{len(self._workers)}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _client_for(self, timeout: float) -> "ollama.Client":
+        # ollama (y con él httpx) se importa al crear el primer cliente
+        import ollama
+        with self._lock:
+            if timeout not in self._clients:
+                self._clients[timeout] = ollama.Client(host=self.host, timeout=timeout)
+            return self._clients[timeout]
+
+    def _worker_loop(self):
+        while True:
+            _, _, future, timeout, chat_kwargs = self._queue.get()
+            if future is None:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._call_with_retries(timeout, chat_kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def _call_with_retries(self, timeout: float, chat_kwargs: dict):
+        client = self._client_for(timeout)
+        attempt = 0
+        while True:
+            try:
+                with get_metrics_recorder().measure("llm", str(chat_kwargs.get('model')), items_in=1) as sample:
+                    response = client.chat(**chat_kwargs)
+                    sample.items_out = 1
+                    # Ollama informa de los tokens del prompt y de la respuesta
+                    sample.tokens_in = response.get('prompt_eval_count') or 0
+                    sample.tokens_out = response.get('eval_count') or 0
+                return response
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                delay = self.backoff * (2 ** attempt) * (1 + random.random() * 0.25)
+                attempt += 1
+                print(f"⚠️ Error en la llamada al modelo ({e}). Reintento {attempt}/{self.max_retries} "
+                      f"en {delay:.1f}s")
+                time.sleep(delay)
+
+    @classmethod
+    def _is_cacheable(cls, response, format, response_model=None) -> bool:
+        """Solo se guardan respuestas completas y, si se pidió un formato, que lo cumplan"""
+        try:
+            content = response['message']['content']
+        except (KeyError, TypeError):
+            return False
+        if response.get('done') is False:
+            return False
+        return cls._is_valid_content(content, format, response_model)
+
+    @staticmethod
+    def _is_valid_content(content: str, format, response_model=None) -> bool:
+        if not content:
+            return False
+        try:
+            if response_model is not None:
+                # ValidationError de pydantic deriva de ValueError
+                response_model.model_validate_json(content)
+            elif format is not None:
+                json.loads(content)
+        except ValueError:
+            return False
+        return True
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        import httpx
+        import ollama
+        if isinstance(error, ollama.ResponseError):
+            return error.status_code in RETRYABLE_STATUS
+        return isinstance(error, (ConnectionError, httpx.TransportError))
+
+
+# ============================================================================
+# CLIENTE COMPARTIDO
+# ============================================================================
+
+_shared_client: Optional[LLMClient] = None
+_shared_lock = threading.Lock()
+
+
+def configure_llm_client(**kwargs) -> LLMClient:
+    """Crear el cliente compartido con la configuración indicada"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is not None:
+            _shared_client.shutdown()
+        _shared_client = LLMClient(**kwargs)
+        return _shared_client
+
+
+def get_llm_client() -> LLMClient:
+    """Obtener el cliente compartido (con valores por defecto si no se configuró)"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = LLMClient()
+        return _shared_client
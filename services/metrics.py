@@ -0,0 +1,179 @@
+# services/metrics.py
+# ==============================================================================
+# == INSTRUMENTACIÓN: TIEMPO, CPU, MEMORIA Y VOLUMEN POR OPERACIÓN
+# ==============================================================================
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: sin getrusage, la memoria y la CPU de subprocesos no se miden
+    resource = None
+
+# Orden de las categorías en el informe
+CATEGORY_ORDER = ("stage", "search", "extraction", "llm", "tts", "ffmpeg")
+
+
+@dataclass
+class MetricSample:
+    """Una operación medida. Quien la mide puede completar items_out y los tokens."""
+    category: str
+    name: str
+    started_at: float
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    peak_rss_mb: Optional[float] = None
+    items_in: int = 0
+    items_out: int = 0
+    tokens_in: int = 0
+    tokens_out: int = 0
+    success: bool = True
+    error: Optional[str] = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Pico de memoria residente del proceso en MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB y macOS en bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _children_cpu_time() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+_CPU_CLOCKS = {
+    # CPU del hilo que ejecuta la operación (llamadas concurrentes no se mezclan)
+    'thread': time.thread_time,
+    # CPU de todo el proceso (fases que reparten trabajo entre hilos)
+    'process': time.process_time,
+    # CPU de los subprocesos terminados (ffmpeg)
+    'children': _children_cpu_time,
+}
+
+
+class MetricsRecorder:
+    """
+    Acumula muestras de tiempo de pared, CPU, pico de RSS, elementos y tokens
+    por operación. Las muestras quedan en memoria hasta flush(), que las
+    guarda en la tabla metrics asociadas a una ejecución del pipeline.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._samples: List[MetricSample] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, category: str, name: str, items_in: int = 0, cpu: str = 'thread'):
+        """
+        Medir el bloque. Devuelve la muestra para que el bloque anote
+        items_out o tokens; si el bloque lanza una excepción se marca como fallida.
+        """
+        sample = MetricSample(category, name, time.time(), items_in=items_in)
+        if not self.enabled:
+            yield sample
+            return
+
+        cpu_clock = _CPU_CLOCKS[cpu]
+        wall_start, cpu_start = time.perf_counter(), cpu_clock()
+        try:
+            yield sample
+        except BaseException as e:
+            sample.success = False
+            sample.error = str(e)[:500]
+            raise
+        finally:
+            sample.wall_time = time.perf_counter() - wall_start
+            sample.cpu_time = cpu_clock() - cpu_start
+            sample.peak_rss_mb = peak_rss_mb()
+            self._append(sample)
+
+    def record(self, category: str, name: str, **fields) -> Optional[MetricSample]:
+        """Registrar una muestra ya medida (p. ej. un acierto de caché o una fase en streaming)"""
+        if not self.enabled:
+            return None
+        sample = MetricSample(category, name, time.time(), peak_rss_mb=peak_rss_mb(), **fields)
+        self._append(sample)
+        return sample
+
+    def extend(self, samples: List[MetricSample]):
+        """Incorporar muestras tomadas en otro proceso (p. ej. el pool de parseo)"""
+        if self.enabled and samples:
+            with self._lock:
+                self._samples.extend(samples)
+
+    def drain(self) -> List[MetricSample]:
+        """Devolver y olvidar las muestras pendientes"""
+        with self._lock:
+            samples, self._samples = self._samples, []
+        return samples
+
+    def flush(self, db_manager, run_id) -> int:
+        """Guardar las muestras pendientes en la base de datos"""
+        samples = self.drain()
+        if samples:
+            db_manager.save_metrics(run_id, samples)
+        return len(samples)
+
+    def _append(self, sample: MetricSample):
+        with self._lock:
+            self._samples.append(sample)
+
+
+def print_metrics_report(rows: List[Dict], title: str = "MÉTRICAS DE LA EJECUCIÓN"):
+    """
+    Imprime el resumen por operación devuelto por
+    DatabaseManager.get_metrics_summary().
+    """
+    if not rows:
+        print("📊 No hay métricas registradas.")
+        return
+
+    rows = sorted(rows, key=lambda r: (CATEGORY_ORDER.index(r['category']) if r['category'] in CATEGORY_ORDER
+                                       else len(CATEGORY_ORDER), -r['wall_time']))
+    stage_total = sum(r['wall_time'] for r in rows if r['category'] == "stage")
+
+    print(f"\n==== {title} ====")
+    print(f"{'operación':<34}{'llamadas':>9}{'pared s':>10}{'%':>6}{'CPU s':>9}{'RSS MB':>9}"
+          f"{'entrada':>9}{'salida':>9}{'salida/s':>10}{'tokens':>14}{'errores':>8}")
+    category = None
+    for row in rows:
+        if row['category'] != category:
+            category = row['category']
+            print(f"-- {category}")
+        share = f"{100 * row['wall_time'] / stage_total:.0f}" if category == "stage" and stage_total else ""
+        throughput = row['items_out'] / row['wall_time'] if row['wall_time'] else 0
+        tokens = f"{row['tokens_in']}/{row['tokens_out']}" if row['tokens_in'] or row['tokens_out'] else ""
+        rss = f"{row['peak_rss_mb']:.0f}" if row['peak_rss_mb'] is not None else ""
+        print(f"   {row['name'][:31]:<31}{row['calls']:>9}{row['wall_time']:>10.1f}{share:>6}"
+              f"{row['cpu_time']:>9.1f}{rss:>9}{row['items_in']:>9}{row['items_out']:>9}"
+              f"{throughput:>10.2f}{tokens:>14}{row['errors']:>8}")
+    print("ℹ️ Los tiempos se suman por llamada: con operaciones en paralelo pueden superar la duración real.")
+
+
+# ============================================================================
+# REGISTRO COMPARTIDO
+# ============================================================================
+
+_shared_recorder: Optional[MetricsRecorder] = None
+_shared_lock = threading.Lock()
+
+
+def get_metrics_recorder() -> MetricsRecorder:
+    """Obtener el registro de métricas compartido por todo el proceso"""
+    global _shared_recorder
+    with _shared_lock:
+        if _shared_recorder is None:
+            _shared_recorder = MetricsRecorder()
+        return _shared_recorder
@@ -0,0 +1,141 @@
+# services/near_duplicates.py
+# ==============================================================================
+# == DETECCIÓN DE NOTICIAS CASI DUPLICADAS (MINHASH + LSH)
+# ==============================================================================
+
+import random
+import re
+import zlib
+from typing import Dict, Hashable, List, Optional, Tuple
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class NearDuplicateIndex:
+    """
+    Índice MinHash con LSH por bandas para agrupar artículos casi idénticos
+    (p. ej. la misma nota de agencia publicada por varios medios).
+
+    - threshold: similitud de Jaccard estimada a partir de la cual dos textos
+      se consideran duplicados.
+    - num_perm: tamaño de la firma MinHash.
+    - bands: bandas LSH; num_perm debe ser múltiplo de bands.
+    - shingle_size: palabras por shingle.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 5, seed: int = 42):
+        if num_perm % bands:
+            raise ValueError("num_perm debe ser múltiplo de bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = random.Random(seed)
+        self._permutations = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                              for _ in range(num_perm)]
+
+        self._signatures: Dict[Hashable, Tuple[int, ...]] = {}
+        self._buckets: List[Dict[Tuple[int, ...], List[Hashable]]] = [{} for _ in range(bands)]
+
+    def _shingles(self, text: str) -> set:
+        words = re.findall(r'\w+', (text or "").lower())
+        if len(words) < self.shingle_size:
+            return {' '.join(words)} if words else set()
+        return {' '.join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """Firma MinHash del texto"""
+        hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in self._shingles(text)]
+        if not hashes:
+            return tuple([_MAX_HASH] * self.num_perm)
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._permutations
+        )
+
+    def add(self, doc_id: Hashable, text: str):
+        """Indexar un documento"""
+        signature = self.signature(text)
+        self._signatures[doc_id] = signature
+        for band in range(self.bands):
+            key = signature[band * self.rows:(band + 1) * self.rows]
+            self._buckets[band].setdefault(key, []).append(doc_id)
+
+    def add_or_match(self, doc_id: Hashable, text: str) -> Optional[Hashable]:
+        """
+        Indexar un documento y devolver el id de un documento ya indexado del
+        que es casi duplicado (o None). Sirve para deduplicar en streaming.
+        """
+        self.add(doc_id, text)
+        signature = self._signatures[doc_id]
+        candidates = set()
+        for band in range(self.bands):
+            key = signature[band * self.rows:(band + 1) * self.rows]
+            candidates.update(self._buckets[band][key])
+        candidates.discard(doc_id)
+        for candidate in sorted(candidates, key=lambda c: -self.similarity(doc_id, c)):
+            if self.similarity(doc_id, candidate) >= self.threshold:
+                return candidate
+        return None
+
+    def similarity(self, id_a: Hashable, id_b: Hashable) -> float:
+        """Jaccard estimado entre dos documentos indexados"""
+        sig_a, sig_b = self._signatures[id_a], self._signatures[id_b]
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / self.num_perm
+
+    def clusters(self) -> List[List[Hashable]]:
+        """Agrupar los documentos; cada grupo contiene los ids en orden de inserción"""
+        parent = {doc_id: doc_id for doc_id in self._signatures}
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        checked = set()
+        for buckets in self._buckets:
+            for members in buckets.values():
+                if len(members) < 2:
+                    continue
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        if (a, b) in checked:
+                            continue
+                        checked.add((a, b))
+                        # Los candidatos de LSH se confirman con la similitud estimada
+                        if self.similarity(a, b) >= self.threshold:
+                            parent[find(b)] = find(a)
+
+        groups: Dict[Hashable, List[Hashable]] = {}
+        for doc_id in self._signatures:
+            groups.setdefault(find(doc_id), []).append(doc_id)
+        return list(groups.values())
+
+
+def cluster_news(news_list: List[Tuple], threshold: float = 0.8, num_perm: int = 64,
+                 bands: int = 16) -> List[Tuple[Tuple, List[Tuple]]]:
+    """
+    Agrupar filas (id, titulo, contenido) casi duplicadas.
+
+    Devuelve una lista de (representante, miembros): el representante es el
+    artículo con más contenido del grupo y miembros incluye a todos, también
+    al representante.
+    """
+    index = NearDuplicateIndex(threshold=threshold, num_perm=num_perm, bands=bands)
+    rows_by_id = {}
+    for row in news_list:
+        news_id, title, content = row[0], row[1], row[2]
+        rows_by_id[news_id] = row
+        index.add(news_id, f"{title or ''} {content or ''}")
+
+    result = []
+    for ids in index.clusters():
+        members = [rows_by_id[news_id] for news_id in ids]
+        representative = max(members, key=lambda row: len(row[2] or ""))
+        result.append((representative, members))
+    return result
@@ -0,0 +1,153 @@
+# services/nltk_resources.py
+# ==============================================================================
+# == TOKENIZADOR DE FRASES SIN RED: DATOS DE NLTK Y ALTERNATIVA POR REGEX
+# ==============================================================================
+
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Callable, List, Optional
+
+# Paquetes de NLTK que usa sent_tokenize (punkt_tab en NLTK >= 3.8.2, punkt en versiones anteriores)
+NLTK_RESOURCES = ("punkt", "punkt_tab")
+# Directorio local donde se guardan los datos de NLTK
+DEFAULT_NLTK_DATA_DIR = "data/nltk_data"
+
+_data_dir = DEFAULT_NLTK_DATA_DIR
+_lock = threading.Lock()
+
+
+def configure_nltk_data_dir(data_dir: Optional[str]):
+    """Fijar el directorio local de datos de NLTK (antes de pedir el tokenizador)"""
+    global _data_dir
+    with _lock:
+        _data_dir = data_dir or DEFAULT_NLTK_DATA_DIR
+    get_sentence_splitter.cache_clear()
+
+
+def provision_nltk_resources(data_dir: Optional[str] = None) -> bool:
+    """
+    Descargar una sola vez los datos del tokenizador al directorio local.
+    Es el único punto que accede a la red; devuelve True si quedaron disponibles.
+    """
+    try:
+        import nltk
+    except ImportError:
+        print("⚠️ NLTK no está instalado: se usará el separador de frases por regex.")
+        return False
+
+    data_dir = data_dir or _data_dir
+    os.makedirs(data_dir, exist_ok=True)
+    _add_search_path(nltk, data_dir)
+    for resource in NLTK_RESOURCES:
+        if _find_resource(nltk, resource):
+            print(f"✅ Recurso NLTK '{resource}' ya disponible.")
+            continue
+        print(f"⬇️ Descargando recurso NLTK '{resource}' en '{data_dir}'...")
+        if not nltk.download(resource, download_dir=data_dir, quiet=True):
+            print(f"⚠️ No se pudo descargar '{resource}'.")
+
+    get_sentence_splitter.cache_clear()
+    return _load_nltk_splitter("spanish") is not None
+
+
+@lru_cache(maxsize=None)
+def get_sentence_splitter(language: str = "spanish") -> Callable[[str], List[str]]:
+    """
+    Devuelve el separador de frases: sent_tokenize si los datos de NLTK ya
+    están en disco, o el separador por regex si no. Nunca descarga nada.
+    """
+    splitter = _load_nltk_splitter(language)
+    if splitter is None:
+        print("ℹ️ Datos de NLTK no disponibles: se usa el separador de frases por regex "
+              "(python -m services.nltk_resources para descargarlos).")
+        return regex_split_sentences
+    return splitter
+
+
+def split_sentences(text: str, language: str = "spanish") -> List[str]:
+    """Separar un texto en frases con el mejor tokenizador disponible sin red"""
+    return get_sentence_splitter(language)(text)
+
+
+# ============================================================================
+# SEPARADOR POR REGEX
+# ============================================================================
+
+# Abreviaturas frecuentes en español tras las que un punto no cierra la frase
+_ABBREVIATIONS = {
+    "sr", "sra", "srta", "sres", "dr", "dra", "lic", "ing", "prof", "arq", "gral", "cap", "tte",
+    "ud", "uds", "vd", "vds", "etc", "aprox", "pág", "págs", "núm", "art", "vol",
+    "fig", "ej", "av", "avda", "c", "pto", "dpto", "depto", "admón", "cía", "hnos", "ee.uu", "a.c", "d.c",
+}
+# Abreviaturas que también son palabras ("No."): solo lo son si les sigue un número ("No. 5")
+_NUMBER_ABBREVIATIONS = {"no"}
+# Fin de frase: . ! ? o … (con comillas o paréntesis de cierre) seguido de espacio y
+# de una mayúscula, un dígito, ¿, ¡ o comillas de apertura
+_SENTENCE_END = re.compile(r'([.!?…]+["»”’)]*)\s+(?=[¿¡"«“‘(]?[A-ZÁÉÍÓÚÑÜ0-9])')
+
+
+def regex_split_sentences(text: str) -> List[str]:
+    """Separador de frases en español sin dependencias, para cuando faltan los datos de NLTK"""
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        candidate = text[start:match.end(1)]
+        if match.group(1) == "." and _ends_with_abbreviation(candidate, text[match.end():]):
+            continue
+        sentences.append(candidate.strip())
+        start = match.end()
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return [sentence for sentence in sentences if sentence]
+
+
+def _ends_with_abbreviation(candidate: str, following: str) -> bool:
+    words = candidate[:-1].split()
+    if not words:
+        return False
+    word = words[-1].lstrip('¿¡"«“(').lower()
+    if word in _NUMBER_ABBREVIATIONS:
+        return following[:1].isdigit()
+    # Iniciales sueltas ("J. Pérez") y abreviaturas conocidas
+    return len(word) == 1 and word.isalpha() or word in _ABBREVIATIONS
+
+
+# ============================================================================
+# CARGA DE NLTK
+# ============================================================================
+
+def _load_nltk_splitter(language: str) -> Optional[Callable[[str], List[str]]]:
+    try:
+        import nltk
+        from nltk.tokenize import sent_tokenize
+    except ImportError:
+        return None
+
+    _add_search_path(nltk, _data_dir)
+    try:
+        # Comprobar con una frase real: cada versión de NLTK busca un recurso distinto
+        sent_tokenize("Hola. Adiós.", language=language)
+    except LookupError:
+        return None
+    return lambda text: sent_tokenize(text, language=language)
+
+
+def _find_resource(nltk, resource: str) -> bool:
+    try:
+        nltk.data.find(f"tokenizers/{resource}")
+        return True
+    except LookupError:
+        return False
+
+
+def _add_search_path(nltk, data_dir: str):
+    path = os.path.abspath(data_dir)
+    if path not in nltk.data.path:
+        nltk.data.path.insert(0, path)
+
+
+if __name__ == "__main__":
+    provision_nltk_resources()
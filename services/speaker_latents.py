@@ -0,0 +1,130 @@
+# services/speaker_latents.py
+# ==============================================================================
+# == CACHÉ DE LATENTES DE VOZ DE XTTS POR FICHERO DE REFERENCIA
+# ==============================================================================
+
+import hashlib
+import os
+import threading
+from typing import Dict, List, Sequence, Tuple, Union
+
+from services.metrics import get_metrics_recorder
+
+# Versión del formato en disco: cambiarla invalida las latentes guardadas
+LATENTS_FORMAT_VERSION = 1
+
+SpeakerWav = Union[str, Sequence[str]]
+
+
+def supports_speaker_latents(tts) -> bool:
+    """Si el modelo cargado en TTS.api.TTS es XTTS y permite sintetizar con latentes precalculadas"""
+    model = getattr(getattr(tts, "synthesizer", None), "tts_model", None)
+    return hasattr(model, "get_conditioning_latents") and hasattr(model, "inference")
+
+
+class SpeakerLatentsCache:
+    """
+    XTTS calcula en cada llamada a tts_to_file las latentes de condicionamiento
+    (gpt_cond_latent) y el embedding del hablante a partir de los WAV de
+    referencia. Esta caché las calcula una vez por voz (o conjunto de voces),
+    las indexa por el hash del contenido de los ficheros y los parámetros de
+    condicionamiento del modelo, y las guarda en disco como .pt.
+    """
+
+    def __init__(self, tts, cache_dir: str = "data/speaker_latents"):
+        self.model = tts.synthesizer.tts_model
+        self.cache_dir = cache_dir
+        self._memory: Dict[str, Tuple] = {}
+        self._file_hashes: Dict[Tuple[str, float, int], bytes] = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, speaker_wav: SpeakerWav) -> Tuple:
+        """Devolver (gpt_cond_latent, speaker_embedding) para una voz o conjunto de voces"""
+        paths = [speaker_wav] if isinstance(speaker_wav, str) else list(speaker_wav)
+        # El lock cubre también el cálculo: dos hilos con la misma voz no la calculan dos veces
+        with self._lock:
+            key = self._key(paths)
+            latents = self._memory.get(key)
+            if latents is None:
+                latents = self._load(key) or self._compute(key, paths)
+                self._memory[key] = latents
+        return latents
+
+    def synthesize(self, text: str, speaker_wav: SpeakerWav, language: str = "es"):
+        """Sintetizar con las latentes cacheadas; devuelve las muestras del audio"""
+        gpt_cond_latent, speaker_embedding = self.get(speaker_wav)
+        config = self.model.config
+        # Mismos parámetros de muestreo que usa Xtts.synthesize
+        output = self.model.inference(
+            text,
+            language,
+            gpt_cond_latent,
+            speaker_embedding,
+            temperature=config.temperature,
+            length_penalty=config.length_penalty,
+            repetition_penalty=config.repetition_penalty,
+            top_k=config.top_k,
+            top_p=config.top_p,
+        )
+        return output["wav"]
+
+    def _conditioning_kwargs(self) -> Dict:
+        config = self.model.config
+        return {
+            "gpt_cond_len": config.gpt_cond_len,
+            "gpt_cond_chunk_len": config.gpt_cond_chunk_len,
+            "max_ref_length": config.max_ref_len,
+            "sound_norm_refs": config.sound_norm_refs,
+        }
+
+    def _key(self, paths: List[str]) -> str:
+        digest = hashlib.sha256(f"v{LATENTS_FORMAT_VERSION}".encode())
+        digest.update(repr(sorted(self._conditioning_kwargs().items())).encode())
+        # El orden de las referencias cambia el resultado, así que se conserva
+        for path in paths:
+            digest.update(self._file_hash(path))
+        return digest.hexdigest()
+
+    def _file_hash(self, path: str) -> bytes:
+        # Cada fragmento pide su voz: el fichero solo se vuelve a leer si cambia
+        stat = os.stat(path)
+        signature = (os.path.abspath(path), stat.st_mtime, stat.st_size)
+        file_hash = self._file_hashes.get(signature)
+        if file_hash is None:
+            with open(path, "rb") as f:
+                file_hash = hashlib.sha256(f.read()).digest()
+            self._file_hashes[signature] = file_hash
+        return file_hash
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pt")
+
+    def _load(self, key: str):
+        import torch
+
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            data = torch.load(path, map_location=next(self.model.parameters()).device)
+        except Exception as e:
+            print(f"⚠️ Latentes de voz ilegibles en '{path}', se recalculan: {e}")
+            return None
+        get_metrics_recorder().record("tts", "speaker_latents (caché)")
+        return data["gpt_cond_latent"], data["speaker_embedding"]
+
+    def _compute(self, key: str, paths: List[str]) -> Tuple:
+        import torch
+
+        print(f"🎙️ Calculando latentes de voz para {', '.join(os.path.basename(p) for p in paths)}...")
+        with get_metrics_recorder().measure("tts", "speaker_latents", items_in=len(paths), cpu='process'):
+            gpt_cond_latent, speaker_embedding = self.model.get_conditioning_latents(
+                audio_path=paths, **self._conditioning_kwargs()
+            )
+        # Escritura atómica: otro proceso puede estar leyendo la misma voz
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        torch.save({"gpt_cond_latent": gpt_cond_latent.cpu(), "speaker_embedding": speaker_embedding.cpu()},
+                   tmp_path)
+        os.replace(tmp_path, self._path(key))
+        return gpt_cond_latent, speaker_embedding
@@ -0,0 +1,257 @@
+# services/tts_daemon.py
+# ==============================================================================
+# == DAEMON DE TTS: MODELO CARGADO PERMANENTEMENTE Y SÍNTESIS POR HTTP LOCAL
+# ==============================================================================
+
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import requests
+from urllib3.exceptions import ProtocolError
+
+from services.metrics import get_metrics_recorder
+from services.speaker_latents import SpeakerLatentsCache, supports_speaker_latents
+from services.tts_engine import TTSEngine, load_tts_model
+
+DEFAULT_MODEL = "tts_models/multilingual/multi-dataset/xtts_v2"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5002
+# Las muestras viajan en float32 little-endian, tal como salen del modelo
+SAMPLE_FORMAT = "f32le"
+
+SpeakerWav = Union[str, Sequence[str]]
+
+
+# ============================================================================
+# SERVIDOR
+# ============================================================================
+
+class TTSDaemon:
+    """
+    Mantiene el modelo y las latentes de voz cargados entre ejecuciones y
+    atiende trabajos de síntesis por HTTP en localhost. Cada trabajo es una
+    lista de fragmentos de un guion; el audio de cada fragmento se envía en
+    cuanto se sintetiza (transferencia chunked), en PCM float32 mono.
+    """
+
+    def __init__(self, model: str = DEFAULT_MODEL, voices_dir: str = "voice_sources",
+                 speaker_latents_dir: Optional[str] = "data/speaker_latents", tts=None):
+        self.model_name = model
+        self.voices_dir = voices_dir
+        # Un proceso que no termina no debe acumular muestras que nadie guarda
+        get_metrics_recorder().enabled = False
+        self.tts = tts or load_tts_model(model)
+        speaker_latents = None
+        if speaker_latents_dir and supports_speaker_latents(self.tts):
+            speaker_latents = SpeakerLatentsCache(self.tts, speaker_latents_dir)
+        self.engine = TTSEngine(self.tts, speaker_latents)
+        # Un solo modelo: los trabajos se sintetizan de uno en uno
+        self._model_lock = threading.Lock()
+        self.jobs_done = 0
+        self.started_at = time.time()
+        self._warm_voices(speaker_latents)
+
+    def _warm_voices(self, speaker_latents: Optional[SpeakerLatentsCache]):
+        if speaker_latents is None or not os.path.isdir(self.voices_dir):
+            return
+        for name in sorted(os.listdir(self.voices_dir)):
+            if name.lower().endswith(".wav"):
+                speaker_latents.get(os.path.join(self.voices_dir, name))
+
+    def resolve_voice(self, voice: SpeakerWav) -> SpeakerWav:
+        """Una voz es un id del directorio de voces ("vocal_1") o la ruta a un WAV de referencia"""
+        if not isinstance(voice, str):
+            return [self.resolve_voice(v) for v in voice]
+        candidate = os.path.join(self.voices_dir, f"{voice}.wav")
+        if os.path.isfile(candidate):
+            return candidate
+        if os.path.isfile(voice) and voice.lower().endswith(".wav"):
+            return voice
+        raise ValueError(f"Voz desconocida: '{voice}'")
+
+    def synthesize_stream(self, chunks: List[str], voice: SpeakerWav, language: str) -> Iterator[np.ndarray]:
+        speaker_wav = self.resolve_voice(voice)
+        with self._model_lock:
+            self.engine.language = language
+            for chunk in chunks:
+                yield self.engine.synthesize(chunk, speaker_wav)
+            self.jobs_done += 1
+
+    def health(self) -> dict:
+        return {
+            "model": self.model_name,
+            "sample_rate": self.engine.sample_rate,
+            "sample_format": SAMPLE_FORMAT,
+            "jobs_done": self.jobs_done,
+            "busy": self._model_lock.locked(),
+            "uptime": round(time.time() - self.started_at, 1),
+        }
+
+    def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        server = ThreadingHTTPServer((host, port), _handler_for(self))
+        print(f"🔊 Daemon de TTS escuchando en http://{host}:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Daemon de TTS detenido.")
+        finally:
+            server.server_close()
+
+
+def _handler_for(daemon: TTSDaemon):
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 para poder enviar el audio por partes a medida que se sintetiza
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if self.path != "/health":
+                return self._send_json(404, {"error": "not found"})
+            self._send_json(200, daemon.health())
+
+        def do_POST(self):
+            if self.path != "/synthesize":
+                return self._send_json(404, {"error": "not found"})
+            try:
+                job = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                chunks = job["chunks"]
+                stream = daemon.synthesize_stream(chunks, job["voice"], job.get("language", "es"))
+                # El primer fragmento se sintetiza antes de responder para poder devolver un error limpio
+                first = next(stream, None)
+            except (ValueError, KeyError, TypeError, json.JSONDecodeError) as e:
+                return self._send_json(400, {"error": str(e)})
+            except Exception as e:
+                return self._send_json(500, {"error": str(e)})
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.send_header("X-Sample-Rate", str(daemon.engine.sample_rate))
+            self.send_header("X-Sample-Format", SAMPLE_FORMAT)
+            self.end_headers()
+            try:
+                if first is not None:
+                    self._write_chunk(first)
+                for waveform in stream:
+                    self._write_chunk(waveform)
+                self.wfile.write(b"0\r\n\r\n")
+            except Exception as e:
+                # El estado ya se envió: sin el fragmento final de cierre, el cliente ve una respuesta incompleta
+                print(f"❌ Síntesis interrumpida tras enviar la respuesta: {e}")
+                self.close_connection = True
+            finally:
+                stream.close()  # Libera el modelo aunque el cliente se desconecte a mitad
+
+        def _write_chunk(self, waveform: np.ndarray):
+            data = waveform.astype("<f4").tobytes()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def _send_json(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Sin una línea de log por petición
+
+    return Handler
+
+
+# ============================================================================
+# CLIENTE
+# ============================================================================
+
+class TTSDaemonClient:
+    """
+    Backend de síntesis que delega en el daemon. Ofrece la misma interfaz que
+    TTSEngine (sample_rate, synthesize_chunks, synthesize_scripts), así que
+    ScriptAudioGenerator lo usa sin cambios cuando hay un daemon configurado.
+    """
+
+    def __init__(self, url: str = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", language: str = "es",
+                 timeout: float = 600.0):
+        self.url = url.rstrip("/")
+        self.language = language
+        self.timeout = timeout
+        self._sample_rate: Optional[int] = None
+
+    def health(self, timeout: float = 2.0) -> Optional[dict]:
+        """Estado del daemon, o None si no responde"""
+        try:
+            response = requests.get(f"{self.url}/health", timeout=timeout)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException:
+            return None
+
+    @property
+    def sample_rate(self) -> int:
+        if self._sample_rate is None:
+            status = self.health(timeout=self.timeout)
+            if status is None:
+                raise ConnectionError(f"El daemon de TTS no responde en {self.url}")
+            self._sample_rate = status["sample_rate"]
+        return self._sample_rate
+
+    def stream(self, chunks: List[str], speaker_wav: SpeakerWav) -> Iterator[np.ndarray]:
+        """Recibir el audio de cada fragmento a medida que el daemon lo sintetiza"""
+        voice = _voice_reference(speaker_wav) if isinstance(speaker_wav, str) else [
+            _voice_reference(path) for path in speaker_wav]
+        with requests.post(f"{self.url}/synthesize", json={"chunks": chunks, "voice": voice,
+                                                           "language": self.language},
+                           stream=True, timeout=self.timeout) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"Error del daemon de TTS ({response.status_code}): {response.text[:300]}")
+            self._sample_rate = int(response.headers["X-Sample-Rate"])
+            pending = b""
+            try:
+                for data in response.iter_content(chunk_size=None):
+                    pending += data
+                    usable = len(pending) - len(pending) % 4
+                    if usable:
+                        yield np.frombuffer(pending[:usable], dtype="<f4")
+                        pending = pending[usable:]
+            except (requests.exceptions.ChunkedEncodingError, ProtocolError) as e:
+                # El daemon corta la conexión si la síntesis falla a mitad del guion
+                raise RuntimeError(f"Respuesta incompleta del daemon de TTS ({self.url}): {e}") from e
+
+    def synthesize_chunks(self, chunks: List[str], speaker_wav: SpeakerWav) -> np.ndarray:
+        characters = sum(len(chunk) for chunk in chunks)
+        with get_metrics_recorder().measure("tts", "daemon", items_in=characters) as sample:
+            parts = list(self.stream(chunks, speaker_wav))
+            sample.items_out = characters
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+
+    def synthesize_scripts(self, jobs) -> Iterator[Tuple]:
+        for key, chunks, speaker_wav in jobs:
+            yield key, self.synthesize_chunks(chunks, speaker_wav)
+
+
+def _voice_reference(voice: str) -> str:
+    # Las rutas locales van absolutas (el daemon puede haberse arrancado en otro directorio); los ids, tal cual
+    return os.path.abspath(voice) if os.path.isfile(voice) else voice
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daemon local de TTS con el modelo siempre cargado.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--voices-dir", default="voice_sources",
+                        help="Directorio de voces de referencia (se precalculan sus latentes al arrancar).")
+    parser.add_argument("--latents-dir", default="data/speaker_latents")
+    args = parser.parse_args()
+    TTSDaemon(args.model, args.voices_dir, args.latents_dir or None).serve(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
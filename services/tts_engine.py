@@ -0,0 +1,116 @@
+# services/tts_engine.py
+# ==============================================================================
+# == MOTOR DE SÍNTESIS: FRAGMENTOS EN MEMORIA Y UN WAV POR GUION
+# ==============================================================================
+
+import wave
+from contextlib import nullcontext
+from typing import Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from services.metrics import get_metrics_recorder
+
+SpeakerWav = Union[str, Sequence[str]]
+# (clave del guion, fragmentos de texto, voz de referencia)
+ScriptJob = Tuple[Hashable, List[str], SpeakerWav]
+
+
+class TTSEngine:
+    """
+    Sintetiza los fragmentos de uno o varios guiones seguidos con el modelo
+    ya cargado y devuelve cada guion como un único array de NumPy, sin
+    escribir un WAV por fragmento ni pausas entre llamadas. Si hay latentes
+    de voz cacheadas (SpeakerLatentsCache) se usan; si no, TTS.api.TTS.tts().
+    """
+
+    def __init__(self, tts, speaker_latents=None, language: str = "es", pause_seconds: float = 0.0):
+        self.tts = tts
+        self.speaker_latents = speaker_latents
+        self.language = language
+        self.pause_seconds = pause_seconds
+
+    @property
+    def sample_rate(self) -> int:
+        return self.tts.synthesizer.output_sample_rate
+
+    def synthesize(self, text: str, speaker_wav: SpeakerWav) -> np.ndarray:
+        """Sintetizar un fragmento; devuelve las muestras en float32"""
+        # torch reparte la inferencia entre varios hilos, así que se mide la CPU de todo el proceso
+        with get_metrics_recorder().measure("tts", "chunk", items_in=len(text), cpu='process') as sample:
+            if self.speaker_latents is not None:
+                wav = self.speaker_latents.synthesize(text, speaker_wav, language=self.language)
+            else:
+                wav = self.tts.tts(text=text, speaker_wav=speaker_wav, language=self.language)
+            sample.items_out = len(text)
+        return np.asarray(wav, dtype=np.float32).reshape(-1)
+
+    def synthesize_chunks(self, chunks: List[str], speaker_wav: SpeakerWav) -> np.ndarray:
+        """Sintetizar todos los fragmentos de un guion y unirlos en un solo audio"""
+        with self._inference_mode():
+            return self._join([self.synthesize(chunk, speaker_wav) for chunk in chunks])
+
+    def synthesize_scripts(self, jobs: Iterable[ScriptJob]) -> Iterator[Tuple[Hashable, np.ndarray]]:
+        """
+        Sintetizar varios guiones en una sola sesión del modelo. Entrega cada
+        guion en cuanto termina, para que quien llama lo escriba y libere la memoria.
+        """
+        with self._inference_mode():
+            for key, chunks, speaker_wav in jobs:
+                yield key, self._join([self.synthesize(chunk, speaker_wav) for chunk in chunks])
+
+    def _join(self, waveforms: List[np.ndarray]) -> np.ndarray:
+        if not waveforms:
+            return np.zeros(0, dtype=np.float32)
+        if self.pause_seconds > 0:
+            silence = np.zeros(int(self.pause_seconds * self.sample_rate), dtype=np.float32)
+            waveforms = [part for waveform in waveforms for part in (waveform, silence)][:-1]
+        return np.concatenate(waveforms)
+
+    @staticmethod
+    def _inference_mode():
+        # Sin torch (p. ej. con un TTS simulado) no hay grafo que desactivar
+        try:
+            import torch
+        except ImportError:
+            return nullcontext()
+        return torch.inference_mode()
+
+
+def load_tts_model(model_name: str):
+    """Cargar un modelo de Coqui TTS en GPU si hay, o en CPU"""
+    print(f"⏳ Cargando el modelo de TTS {model_name}...")
+    # torch y TTS tardan varios segundos en importarse, así que solo se cargan aquí
+    import torch
+    from TTS.api import TTS
+
+    # Los checkpoints de XTTS no cargan con weights_only=True (por defecto desde torch 2.6)
+    torch_load = torch.load
+
+    def safe_torch_load(*args, **kwargs):
+        kwargs["weights_only"] = False
+        return torch_load(*args, **kwargs)
+
+    torch.load = safe_torch_load
+    try:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        print(f"🖥️ Dispositivo: {device}")
+        tts = TTS(model_name).to(device)
+    finally:
+        torch.load = torch_load
+    print("✅ Modelo de TTS cargado.")
+    return tts
+
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int, peak: Optional[float] = None):
+    """Escribir muestras float (-1..1) como WAV PCM de 16 bits mono"""
+    samples = np.asarray(samples, dtype=np.float32)
+    if peak:
+        # Normalizar al pico indicado, como hace Coqui en save_wav
+        samples = samples * (peak / max(1e-2, float(np.max(np.abs(samples), initial=0.0))))
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
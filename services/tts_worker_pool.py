@@ -0,0 +1,94 @@
+# services/tts_worker_pool.py
+# ==============================================================================
+# == POOL DE PROCESOS DE SÍNTESIS: UN MODELO POR WORKER
+# ==============================================================================
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from services.metrics import get_metrics_recorder
+
+
+def default_threads_per_worker(num_workers: int) -> int:
+    """Repartir los núcleos entre los workers para que torch no los sobresuscriba"""
+    return max(1, (os.cpu_count() or 1) // max(1, num_workers))
+
+
+class TTSWorkerPool:
+    """
+    Reparte trabajos de síntesis entre N procesos. Cada worker crea una vez su
+    propio objeto con factory(**factory_kwargs) (que carga el modelo al primer
+    uso) y limita los hilos de torch para que los N procesos quepan en la
+    máquina. map() entrega los resultados en el orden de los trabajos, sea
+    cual sea el worker que termine antes.
+    """
+
+    def __init__(self, factory: Callable, factory_kwargs: Optional[Dict] = None, num_workers: int = 2,
+                 threads_per_worker: Optional[int] = None):
+        self.factory = factory
+        self.factory_kwargs = factory_kwargs or {}
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker or default_threads_per_worker(num_workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(cancel=exc_type is not None)
+
+    def start(self):
+        if self._executor is None:
+            print(f"🧵 Iniciando {self.num_workers} workers de TTS con {self.threads_per_worker} hilos cada uno...")
+            # spawn: torch no es seguro tras fork y cada worker debe cargar su propio modelo
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.factory, self.factory_kwargs, self.threads_per_worker),
+            )
+
+    def map(self, method: str, jobs: Iterable[Tuple]) -> Iterator[Any]:
+        """Llamar a método(*trabajo) en los workers; los resultados salen en orden"""
+        self.start()
+        futures = [self._executor.submit(_call_in_worker, method, tuple(job)) for job in jobs]
+        for future in futures:
+            result, samples = future.result()
+            get_metrics_recorder().extend(samples)
+            yield result
+
+    def close(self, cancel: bool = False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=cancel)
+            self._executor = None
+
+
+# Objeto de síntesis de cada worker (lo crea _init_worker al arrancar el proceso)
+_worker_target = None
+
+
+def _init_worker(factory: Callable, factory_kwargs: Dict, threads: int):
+    global _worker_target
+    # Antes de importar torch, para que OpenMP y MKL arranquen ya con el límite
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    except ImportError:
+        pass
+    _worker_target = factory(**factory_kwargs)
+
+
+def _call_in_worker(method: str, args: Tuple) -> Tuple[Any, list]:
+    """
+    Punto de entrada del pool: ejecutar un trabajo en el objeto del worker.
+    Devuelve también las métricas del worker, que el proceso principal
+    incorpora a su registro.
+    """
+    result = getattr(_worker_target, method)(*args)
+    return result, get_metrics_recorder().drain()
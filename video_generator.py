@@ -10,7 +10,8 @@ from datetime import datetime
 from PIL import Image, ImageDraw, ImageFont
 from duckduckgo_search import DDGS
 from io import BytesIO
-import ollama
+from services.llm_client import get_llm_client, PRIORITY_BACKGROUND
+from services.metrics import get_metrics_recorder
 
 
 class VideoGenerator:
@@ -23,6 +24,7 @@ class VideoGenerator:
         self.audio_dir = audio_dir
         self.images_dir = images_dir
         self.model_name = model
+        self.llm = get_llm_client()
 
         # Create necessary directories if they don't exist
         for directory in [output_dir, images_dir]:
@@ -50,11 +52,11 @@ class VideoGenerator:
             print(f"⚠️ Font loading error: {e}. Will use default font.")
             self.font_path = None
 
-    def _fetch_scripts_with_audio(self):
-        """Fetch scripts that have corresponding audio files."""
+    def _fetch_scripts_with_audio(self, min_script_id=0):
+        """Fetch scripts (id > min_script_id) that have corresponding audio files."""
         conn = sqlite3.connect(self.db_name)
         cursor = conn.cursor()
-        cursor.execute("SELECT id, titulo, guion FROM scripts")
+        cursor.execute("SELECT id, titulo, guion FROM scripts WHERE id > ? ORDER BY id", (min_script_id,))
         scripts = cursor.fetchall()
         conn.close()
 
@@ -188,7 +190,8 @@ class VideoGenerator:
         """
 
         try:
-            response = ollama.chat(model=self.model_name, messages=[{"role": "user", "content": prompt}])
+            response = self.llm.chat(priority=PRIORITY_BACKGROUND, model=self.model_name,
+                                     messages=[{"role": "user", "content": prompt}])
             data = json.loads(response['message']['content'])
 
             main_term = data.get("termino_principal", "")
@@ -281,6 +284,13 @@ class VideoGenerator:
             print(f"⚠️ Error adding title to image: {e}")
             return img_path  # Return original image if failed
 
+    @staticmethod
+    def _run_ffmpeg(name, args):
+        """Run an ffmpeg command, recording its wall time and the CPU used by the subprocess."""
+        with get_metrics_recorder().measure("ffmpeg", name, items_in=1, cpu='children') as sample:
+            subprocess.run(args, check=True)
+            sample.items_out = 1
+
     def _create_video(self, script_id, title, text, audio_path, output_file):
         """Create a video with the script audio and related images using ffmpeg."""
         print(f"\n🎬 Creating video for script {script_id}: {title}")
@@ -346,14 +356,15 @@ class VideoGenerator:
 
             # Create a concatenated audio file
             concat_audio_path = os.path.join(temp_dir, "concat_audio.wav")
-            subprocess.run([
+            self._run_ffmpeg("concat_audio", [
                 'ffmpeg', '-f', 'concat', '-safe', '0',
                 '-i', audio_concat_list, '-c', 'copy', concat_audio_path
-            ], check=True)
+            ])
             audio_path = concat_audio_path
 
         # Get audio duration
-        probe = ffmpeg.probe(audio_path)
+        with get_metrics_recorder().measure("ffmpeg", "probe", items_in=1, cpu='children'):
+            probe = ffmpeg.probe(audio_path)
         audio_duration = float(probe['format']['duration'])
         print(f"⏱️ Audio duration: {audio_duration:.2f} seconds")
 
@@ -382,16 +393,16 @@ class VideoGenerator:
             temp_video = os.path.join(temp_dir, "temp_video.mp4")
 
             # Use ffmpeg to create video from images
-            subprocess.run([
+            self._run_ffmpeg("images_to_video", [
                 'ffmpeg', '-y', '-f', 'concat', '-safe', '0',
                 '-i', list_file, '-vsync', 'vfr',
                 '-vf', 'fps=24,format=yuv420p',
                 '-c:v', 'libx264', temp_video
-            ], check=True)
+            ])
 
             # Add audio to the video
             print("🔊 Adding audio to video...")
-            subprocess.run([
+            self._run_ffmpeg("mux_audio", [
                 'ffmpeg', '-y',
                 '-i', temp_video,
                 '-i', audio_path,
@@ -399,7 +410,7 @@ class VideoGenerator:
                 '-c:a', 'aac',
                 '-shortest',  # End when the shortest input ends
                 output_file
-            ], check=True)
+            ])
 
             print(f"✅ Video saved to: {output_file}")
             return output_file
@@ -414,9 +425,11 @@ class VideoGenerator:
             # shutil.rmtree(temp_dir)
             pass
 
-    def process_scripts_to_videos(self):
-        """Process all scripts with audio files and create videos for each."""
-        scripts = self._fetch_scripts_with_audio()
+    def process_scripts_to_videos(self, min_script_id=0):
+        """Process the scripts with audio files (id > min_script_id) and create videos for each."""
+        scripts = self._fetch_scripts_with_audio(min_script_id)
+        # Ids of the scripts whose video was created, so callers can tell which ones still need a retry
+        self.completed_script_ids = []
 
         if not scripts:
             print("⚠️ No scripts with audio found")
@@ -446,6 +459,7 @@ class VideoGenerator:
                 if result:
                     log.write(f"✅ Video created: {result}\n")
                     videos_created.append(result)
+                    self.completed_script_ids.append(script_id)
                 else:
                     log.write(f"❌ Failed to create video\n")
 
@@ -480,12 +494,12 @@ class VideoGenerator:
                     f.write(f"file '{os.path.abspath(video)}'\n")
 
             # Use ffmpeg to concatenate the videos
-            subprocess.run([
+            self._run_ffmpeg("concat_videos", [
                 'ffmpeg', '-y', '-f', 'concat', '-safe', '0',
                 '-i', concat_list,
                 '-c', 'copy',  # Copy codecs without re-encoding
                 output_file
-            ], check=True)
+            ])
 
             print(f"✅ Combined video saved to: {output_file}")
             return output_file